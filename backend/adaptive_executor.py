@@ -0,0 +1,212 @@
+"""
+AdaptiveExecutor - AIMD concurrency control for bulk DynamoDB requests
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# Bulk clients retry throttles only once themselves, so the executor sees
+# the throttling and backs off instead of botocore retrying it silently
+BULK_CLIENT_CONFIG = Config(retries={'mode': 'standard', 'max_attempts': 2})
+
+THROTTLE_ERRORS = ('ProvisionedThroughputExceededException', 'ThrottlingException',
+                   'RequestLimitExceeded', 'InternalServerError', 'ServiceUnavailable')
+
+BATCH_WRITE_SIZE = 25  # BatchWriteItem limit
+
+
+class Retry:
+    """Returned by a task function: part of the work was throttled (e.g. UnprocessedItems)"""
+
+    def __init__(self, task):
+        self.task = task
+
+
+class Continue:
+    """Returned by a task function: more work follows (e.g. the next page), no penalty"""
+
+    def __init__(self, task):
+        self.task = task
+
+
+class AdaptiveExecutor:
+    """Runs bulk requests with a concurrency limit adjusted by AIMD
+
+    The limit grows additively (about +1 per limit completed requests)
+    while requests succeed within latency_target seconds. It is halved on
+    throttling (an error from THROTTLE_ERRORS or a Retry result) and cut by
+    a quarter when latency exceeds the target, at most once per cooldown so
+    one burst of throttles counts once. Throttled work is retried after a
+    jittered exponential backoff, up to max_attempts times.
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=32, latency_target=1.0,
+                 backoff_base=0.05, backoff_cap=5.0, max_attempts=10, cooldown=0.5):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_attempts = max_attempts
+        self.cooldown = cooldown
+        self.requests = 0
+        self.throttles = 0
+        self.retries = 0
+        self.peak = self.limit
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, fn, tasks):
+        """Call fn(task) for every task, at most limit at a time
+
+        fn returns None when the task is done, Retry(rest) when part of it
+        was throttled, or Continue(next_task) to chain more work. Returns a
+        list of (task, exception) for tasks that failed or ran out of
+        attempts.
+
+        tasks may be a generator: it is advanced only when a slot is free,
+        so a large input is read as fast as it is written, not up front.
+        """
+        tasks = iter(tasks)
+        exhausted = False
+        pending = deque()  # Retried and chained tasks: (task, attempt, not_before)
+        delayed = []  # Backing-off tasks: (task, attempt, not_before)
+        in_flight = {}
+        failures = []
+
+        with ThreadPoolExecutor(max_workers=self.max_limit) as pool:
+            while True:
+                now = time.monotonic()
+                ready = [entry for entry in delayed if entry[2] <= now]
+                if ready:
+                    delayed = [entry for entry in delayed if entry[2] > now]
+                    pending.extendleft(reversed(ready))
+
+                while len(in_flight) < int(self.limit):
+                    if pending:
+                        task, attempt, _ = pending.popleft()
+                    elif not exhausted:
+                        try:
+                            task, attempt = next(tasks), 0
+                        except StopIteration:
+                            exhausted = True
+                            break
+                    else:
+                        break
+                    future = pool.submit(self._timed, fn, task)
+                    in_flight[future] = (task, attempt)
+
+                if not in_flight:
+                    if not delayed:
+                        break
+                    time.sleep(max(0.0, min(entry[2] for entry in delayed) - time.monotonic()))
+                    continue
+
+                timeout = None
+                if delayed:
+                    timeout = max(0.0, min(entry[2] for entry in delayed) - time.monotonic())
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    task, attempt = in_flight.pop(future)
+                    try:
+                        result, latency = future.result()
+                    except ClientError as e:
+                        if e.response['Error']['Code'] in THROTTLE_ERRORS:
+                            self._on_throttle()
+                            self._schedule_retry(task, attempt, delayed, failures, e)
+                        else:
+                            failures.append((task, e))
+                        continue
+                    except Exception as e:
+                        failures.append((task, e))
+                        continue
+
+                    if isinstance(result, Retry):
+                        self._on_throttle()
+                        self._schedule_retry(result.task, attempt, delayed, failures,
+                                             RuntimeError('Still unprocessed after retries'))
+                    else:
+                        self._on_success(latency)
+                        if isinstance(result, Continue):
+                            pending.append((result.task, 0, 0.0))
+
+        return failures
+
+    def _timed(self, fn, task):
+        start = time.monotonic()
+        result = fn(task)
+        return result, time.monotonic() - start
+
+    def _schedule_retry(self, task, attempt, delayed, failures, error):
+        attempt += 1
+        if attempt >= self.max_attempts:
+            failures.append((task, error))
+            return
+        self.retries += 1
+        # Full jitter: spread retries so throttled workers do not return in lockstep
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        delayed.append((task, attempt, time.monotonic() + delay))
+
+    def _on_success(self, latency):
+        with self._lock:
+            self.requests += 1
+            if latency > self.latency_target:
+                self._decrease(0.75)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self.peak = max(self.peak, self.limit)
+
+    def _on_throttle(self):
+        with self._lock:
+            self.requests += 1
+            self.throttles += 1
+            self._decrease(0.5)
+
+    def _decrease(self, factor):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(self.min_limit, self.limit * factor)
+            self._last_decrease = now
+
+    def batch_write(self, client, table_name, requests):
+        """Write PutRequest/DeleteRequest dicts with BatchWriteItem, 25 per call
+
+        UnprocessedItems are retried with backoff. requests may be a
+        generator; it is read as calls complete. Returns the list of
+        requests that could not be written.
+        """
+        def write(chunk):
+            response = client.batch_write_item(RequestItems={table_name: chunk})
+            unprocessed = response.get('UnprocessedItems', {}).get(table_name)
+            return Retry(unprocessed) if unprocessed else None
+
+        return [request for chunk, _ in self.run(write, batches(requests)) for request in chunk]
+
+    def stats(self):
+        """Request, throttle and retry counts plus the concurrency reached"""
+        return {
+            'requests': self.requests,
+            'throttles': self.throttles,
+            'retries': self.retries,
+            'limit': round(self.limit, 1),
+            'peak': round(self.peak, 1)
+        }
+
+
+def batches(requests, size=BATCH_WRITE_SIZE):
+    """Yield lists of up to size requests from any iterable"""
+    batch = []
+    for request in requests:
+        batch.append(request)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,185 @@
+"""
+CapacityTracker - DynamoDB call and capacity accounting for CLI sessions
+"""
+
+import builtins
+import functools
+import inspect
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Operations that accept ReturnConsumedCapacity, by the capacity they consume
+READ_OPERATIONS = ('Scan', 'Query', 'GetItem', 'BatchGetItem', 'TransactGetItems')
+WRITE_OPERATIONS = ('PutItem', 'UpdateItem', 'DeleteItem', 'BatchWriteItem', 'TransactWriteItems')
+
+
+class Usage:
+    """Totals for one action or a whole session"""
+
+    def __init__(self):
+        self.calls = Counter()  # operation -> number of requests
+        self.scanned = 0  # Items examined by Scan/Query (ScannedCount)
+        self.returned = 0  # Items returned by reads
+        self.read_units = 0.0
+        self.write_units = 0.0
+        self.wall = 0.0  # Seconds, excluding time spent waiting for input
+        self.waiting = 0.0  # Seconds spent waiting for input
+
+    def add(self, other):
+        self.calls.update(other.calls)
+        self.scanned += other.scanned
+        self.returned += other.returned
+        self.read_units += other.read_units
+        self.write_units += other.write_units
+        self.wall += other.wall
+        self.waiting += other.waiting
+
+    def summary(self):
+        calls = sum(self.calls.values())
+        breakdown = ', '.join(f"{op} x{n}" for op, n in self.calls.most_common())
+        line = (f"{self.wall:.2f}s | {calls} DynamoDB calls{f' ({breakdown})' if breakdown else ''} | "
+                f"{self.scanned} items scanned, {self.returned} returned | "
+                f"{self.read_units:.1f} RCU, {self.write_units:.1f} WCU")
+        if self.waiting >= 0.05:
+            line += f" | {self.waiting:.1f}s waiting for input (not counted)"
+        return line
+
+
+class CapacityTracker:
+    """Counts DynamoDB requests, scanned items and consumed capacity
+
+    attach() registers botocore event handlers on a boto3 session, so every
+    client created from it afterwards (including per-thread clients) asks
+    for ReturnConsumedCapacity=TOTAL and reports its usage here.
+    instrument() wraps an object's public methods so each top-level call
+    prints its usage; calls made while an action is running, on any thread
+    (such as the executor's workers), are counted in that action. A
+    method returning a generator is measured until its iteration ends,
+    since that is when its requests are made.
+    """
+
+    def __init__(self):
+        self.session_usage = Usage()
+        self._current = None  # Usage of the running action
+        self._lock = threading.Lock()
+
+    def attach(self, session):
+        session.events.register('provide-client-params.dynamodb.*', self._add_capacity_param)
+        session.events.register('after-call.dynamodb.*', self._record_call)
+
+    @staticmethod
+    def _add_capacity_param(params, model, **kwargs):
+        if model.name in READ_OPERATIONS + WRITE_OPERATIONS:
+            params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+    def _record_call(self, parsed, model, **kwargs):
+        usage = self._current
+        if usage is None:
+            return
+
+        capacity = parsed.get('ConsumedCapacity') or []
+        if isinstance(capacity, dict):
+            capacity = [capacity]
+        units = sum(entry.get('CapacityUnits', 0) for entry in capacity)
+
+        returned = parsed.get('Count', 0)
+        if model.name == 'GetItem':
+            returned = 1 if 'Item' in parsed else 0
+        elif model.name == 'BatchGetItem':
+            returned = sum(len(items) for items in parsed.get('Responses', {}).values())
+
+        with self._lock:
+            usage.calls[model.name] += 1
+            usage.scanned += parsed.get('ScannedCount', 0)
+            if model.name in READ_OPERATIONS:
+                usage.returned += returned
+                usage.read_units += units
+            else:
+                usage.write_units += units
+
+    @contextmanager
+    def measure(self, label, report=True):
+        """Account everything inside the block to one action and print it
+
+        Yields the action's Usage, or None while another action is running
+        (on this or any other thread). With report=False the caller reports
+        it (see _report).
+        """
+        with self._lock:
+            nested = self._current is not None
+            if not nested:
+                usage = self._current = Usage()
+        if nested:
+            yield
+            return
+
+        original_input = builtins.input
+
+        def timed_input(*args):
+            start = time.perf_counter()
+            try:
+                return original_input(*args)
+            finally:
+                usage.waiting += time.perf_counter() - start
+
+        builtins.input = timed_input
+        start = time.perf_counter()
+        try:
+            yield usage
+        finally:
+            builtins.input = original_input
+            usage.wall = time.perf_counter() - start - usage.waiting
+            with self._lock:
+                self._current = None
+            if report:
+                self._report(label, usage)
+
+    def _report(self, label, usage):
+        if usage is None:
+            return
+        self.session_usage.add(usage)
+        print(f"\n[TIMINGS] {label}: {usage.summary()}")
+
+    def instrument(self, obj):
+        """Wrap every public method of obj so each call is measured"""
+        name = type(obj).__name__
+        for attr in dir(obj):
+            method = getattr(obj, attr)
+            if attr.startswith('_') or not inspect.ismethod(method):
+                continue
+            setattr(obj, attr, self._wrap(f"{name}.{attr}", method))
+        return obj
+
+    def _wrap(self, label, method):
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            usage = None
+            try:
+                with self.measure(label, report=False) as usage:
+                    result = method(*args, **kwargs)
+            except BaseException:
+                self._report(label, usage)
+                raise
+
+            if inspect.isgenerator(result):
+                # Nothing has been read yet; the requests run as the caller iterates
+                return self._measure_iteration(label, result, usage)
+            self._report(label, usage)
+            return result
+        return measured
+
+    def _measure_iteration(self, label, generator, created):
+        """Yield from generator, measured as one action from the first item to the end"""
+        usage = None
+        try:
+            with self.measure(label, report=False) as usage:
+                yield from generator
+        finally:
+            if usage is not None and created is not None:
+                usage.add(created)
+            self._report(label, usage)
+
+    def print_session(self):
+        print(f"\n[TIMINGS] Session total: {self.session_usage.summary()}")
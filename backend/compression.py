@@ -0,0 +1,93 @@
+"""
+Response compression - gzip/brotli negotiation for large JSON responses
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli  # Optional, preferred when the client accepts it
+except ImportError:
+    brotli = None
+
+
+def accepted_encodings(header):
+    """Parse Accept-Encoding into the set of encodings with a non-zero q value"""
+    encodings = set()
+    for part in (header or '').split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        params = params.strip().replace(' ', '')
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            quality = 1.0
+        if name and quality > 0:
+            encodings.add(name)
+    return encodings
+
+
+class ResponseCompressor:
+    """Compresses responses above min_size with the best encoding the client accepts
+
+    Identical bodies (e.g. /students while the cached snapshot is
+    unchanged) are compressed once: the last few results are kept, keyed
+    by the encoding and a digest of the body.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5, cache_size=8):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (encoding, digest) -> compressed bytes
+        self._lock = threading.Lock()
+
+    def choose_encoding(self, accept_encoding):
+        encodings = accepted_encodings(accept_encoding)
+        if brotli is not None and 'br' in encodings:
+            return 'br'
+        if 'gzip' in encodings:
+            return 'gzip'
+        return None
+
+    def compress(self, body, encoding):
+        """Return body compressed with encoding, reusing a recent identical result"""
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def __call__(self, response, accept_encoding):
+        """after_request hook body: compress response in place when worthwhile"""
+        response.vary.add('Accept-Encoding')
+
+        if (response.direct_passthrough or response.status_code != 200
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        encoding = self.choose_encoding(accept_encoding)
+        if encoding is None:
+            return response
+
+        response.set_data(self.compress(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -3,8 +3,14 @@ CSVExporter - Handles CSV export operations
 """
 
 import csv
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from collections import Counter
 from datetime import datetime
 
+# Columns of the student export (the format users already consume)
+EXPORT_FIELDS = ('idn', 'nama', 'jurusan', 'university', 'year', 'provinsi', 'created_at', 'updated_at')
+
 
 class CSVExporter:
     """Handles CSV export operations"""
@@ -13,23 +19,34 @@ class CSVExporter:
         self.manager = manager
 
     def export_to_csv(self):
-        """Export students to CSV - all or by province"""
+        """Export students to CSV - all or by province
+
+        Rows are written as their pages arrive (Query returns them in IDN
+        order), so the export never holds the table in memory. Exporting a
+        province first streams just the province column to list the choices,
+        then pushes the selected province down as a filter.
+        """
         print("\n=== GENERATE CSV EXPORT ===")
         print("1. Export all students")
         print("2. Export by province")
 
         choice = input("\nSelect option (1-2): ").strip()
 
-        students = self.manager.get_all_students()
+        province_filter = None
         filename_suffix = "_all"
 
         if choice == '2':
-            provinces = sorted(set(s.get('provinsi', 'Not specified') for s in students))
+            try:
+                counts = Counter(s.get('provinsi', 'Not specified')
+                                 for s in self.manager.iter_students(fields=['provinsi']))
+            except ClientError as e:
+                print(f"[ERROR] {e}")
+                return
+            provinces = sorted(counts)
 
             print("\n=== AVAILABLE PROVINCES ===")
             for i, prov in enumerate(provinces, 1):
-                count = sum(1 for s in students if s.get('provinsi', 'Not specified') == prov)
-                print(f"{i}. {prov} ({count} students)")
+                print(f"{i}. {prov} ({counts[prov]} students)")
 
             prov_choice = input(f"\nSelect province (1-{len(provinces)}): ").strip()
 
@@ -37,7 +54,9 @@ class CSVExporter:
                 prov_idx = int(prov_choice) - 1
                 if 0 <= prov_idx < len(provinces):
                     selected_province = provinces[prov_idx]
-                    students = [s for s in students if s.get('provinsi', 'Not specified') == selected_province]
+                    province_filter = Attr('provinsi').eq(selected_province)
+                    if selected_province == 'Not specified':
+                        province_filter = province_filter | Attr('provinsi').not_exists()
                     filename_suffix = f"_{selected_province.replace(' ', '_')}"
                 else:
                     print("[ERROR] Invalid selection")
@@ -46,27 +65,35 @@ class CSVExporter:
                 print("[ERROR] Invalid selection")
                 return
 
-        students.sort(key=lambda x: int(x['idn']))
-
         filename = f"students_export{filename_suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 
         try:
+            exported = 0
             with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=['idn', 'nama', 'jurusan', 'university', 'year', 'provinsi', 'created_at', 'updated_at'])
+                writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
                 writer.writeheader()
 
-                for student in students:
-                    writer.writerow({
-                        'idn': int(student['idn']),
-                        'nama': student.get('nama', ''),
-                        'jurusan': student.get('jurusan', ''),
-                        'university': student.get('university', ''),
-                        'year': student.get('year', ''),
-                        'provinsi': student.get('provinsi', ''),
-                        'created_at': student.get('created_at', ''),
-                        'updated_at': student.get('updated_at', '')
-                    })
-
-            print(f"\n[SUCCESS] Exported {len(students)} students to {filename}")
+                for student in self.manager.iter_students(fields=EXPORT_FIELDS, filter=province_filter):
+                    writer.writerow({field: student.get(field, '') for field in EXPORT_FIELDS})
+                    exported += 1
+
+            print(f"\n[SUCCESS] Exported {exported} students to {filename}")
+        except Exception as e:
+            print(f"[ERROR] {e}")
+
+    def export_pivot(self, pivot, labels=None):
+        """Export pivot table counts to CSV (one row per non-empty group)"""
+        labels = labels or pivot.fields
+        filename = f"students_pivot_{'_'.join(pivot.fields)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(list(labels) + ['count'])
+
+                for key, count in pivot.rows():
+                    writer.writerow(list(key) + [count])
+
+            print(f"\n[SUCCESS] Exported pivot to {filename}")
         except Exception as e:
             print(f"[ERROR] {e}")
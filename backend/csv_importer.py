@@ -0,0 +1,216 @@
+"""
+CSVImporter - Bulk import of students from CSV (counterpart to CSVExporter)
+"""
+
+import csv
+import os
+from datetime import datetime
+from adaptive_executor import AdaptiveExecutor
+from student import Student, name_key, normalize_submission
+
+# Columns a CSV row may set; anything else in the header is ignored
+IMPORT_FIELDS = ('nama', 'jurusan', 'university', 'year', 'provinsi')
+
+
+class CSVImporter:
+    """Imports a CSV of students as adds and updates
+
+    Rows are streamed and cleaned like API submissions. A row with an idn
+    column updates that student; otherwise it is matched by name (first +
+    last name, then exact name) against an in-memory index of the table,
+    and unmatched rows become new students. Blank cells keep the current
+    value. Nothing is written until the dry-run diff has been confirmed.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def import_from_csv(self):
+        """Prompt for a CSV file, show the dry-run diff and apply it on confirmation"""
+        print("\n=== IMPORT CSV ===")
+        path = input("CSV file path: ").strip()
+
+        if not os.path.exists(path):
+            print(f"[ERROR] File not found: {path}")
+            return
+
+        students = self.manager.get_all_students()
+        self._build_index(students)
+
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                if 'nama' not in (reader.fieldnames or []):
+                    print("[ERROR] CSV must have a 'nama' column")
+                    return
+                plan = self._plan(reader, max(self._by_idn, default=0) + 1)
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            print(f"[ERROR] {e}")
+            return
+
+        adds, updates, unchanged, rejected, diff = plan
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        print(f"\nNew students: {len(adds)}")
+        print(f"Updated students: {len(updates)}")
+        print(f"Unchanged rows: {unchanged}")
+        print(f"Rejected rows: {len(rejected)}")
+
+        if diff:
+            self._write_diff(diff, f"import_diff_{timestamp}.csv")
+        if rejected:
+            self._write_rejected(rejected, f"import_rejected_{timestamp}.csv")
+
+        if not adds and not updates:
+            print("\n[INFO] Nothing to import")
+            return
+
+        confirm = input(f"\nApply {len(adds) + len(updates)} changes? (yes/no): ").strip().lower()
+        if confirm not in ['yes', 'y']:
+            print("[INFO] Dry run only, nothing written")
+            return
+
+        # Planned IDNs are provisional: new students go through the inserter, which
+        # gives them IDNs from the university's sequence and reserves their names
+        executor = AdaptiveExecutor()
+        inserted, taken, add_failures = self.manager.insert_students(adds, executor)
+        written, failed = self.manager.put_students(updates, executor) if updates else (0, [])
+
+        print(f"\n[SUCCESS] Imported {len(inserted) + written} students ({len(inserted)} new, {written} updated)")
+        stats = executor.stats()
+        print(f"[INFO] {stats['requests']} write requests, {stats['throttles']} throttled, "
+              f"peak concurrency {stats['peak']}")
+        if taken:
+            print(f"[WARNING] {len(taken)} new students were not added, their names already belong to:")
+            for student, owner_idn in taken[:20]:
+                print(f"  {student.nama}: IDN {owner_idn}")
+        for student, e in add_failures[:20]:
+            print(f"[ERROR] Failed to add {student.nama}: {e}")
+        if failed:
+            print(f"[ERROR] Failed to write {len(failed)} students: {sorted(failed)[:20]}")
+
+    def _build_index(self, students):
+        """Index existing students by IDN, first + last name and full name"""
+        self._by_idn = {}
+        self._by_name_key = {}
+        self._by_name = {}
+
+        for student in sorted(students, key=lambda s: s.idn):
+            self._add_to_index(student)
+
+    def _add_to_index(self, student):
+        # Sorted insertion keeps the lowest IDN for duplicate names (as find_student does)
+        self._by_idn[student.idn] = student
+        key = name_key(student.nama)
+        if key:
+            self._by_name_key.setdefault(key, student)
+        if student.nama:
+            self._by_name.setdefault(student.nama.lower(), student)
+
+    def _match(self, nama):
+        key = name_key(nama)
+        if key and key in self._by_name_key:
+            return self._by_name_key[key]
+        return self._by_name.get(nama.lower())
+
+    def _plan(self, reader, next_idn):
+        """Single pass over the rows: validate, match and collect the changes
+
+        Returns (adds, updates, unchanged_count, rejected, diff). Rows that
+        match a student added or updated earlier in the same file are merged
+        into that change.
+        """
+        adds = {}
+        updates = {}
+        unchanged = 0
+        rejected = []
+        diff = []
+        columns = [field for field in IMPORT_FIELDS if field in reader.fieldnames]
+        now = datetime.now(self.manager.timezone).isoformat()
+
+        for row in reader:
+            line = reader.line_num
+
+            if None in row:
+                rejected.append((line, 'Too many columns', row))
+                continue
+
+            fields = normalize_submission(row)
+            idn_value = (row.get('idn') or '').strip()
+
+            if idn_value:
+                if not idn_value.isdigit():
+                    rejected.append((line, f"Invalid IDN: {idn_value}", row))
+                    continue
+                student = self._by_idn.get(int(idn_value))
+                if student is None:
+                    rejected.append((line, f"Unknown IDN: {idn_value}", row))
+                    continue
+            elif not fields['nama']:
+                rejected.append((line, 'Name is required', row))
+                continue
+            else:
+                student = self._match(fields['nama'])
+
+            if student is None:
+                student = Student(next_idn, fields['nama'], fields['jurusan'], fields['university'],
+                                  fields['year'], fields['provinsi'], now, now, version=1)
+                next_idn += 1
+                adds[student.idn] = student.apply_status()
+                self._add_to_index(student)
+                diff.append(('add', student.idn, student.nama, '', '', ''))
+                continue
+
+            # Existing names are kept (as in update_or_add_student); blank cells keep the value
+            changes = [(field, student.get(field, ''), fields[field]) for field in columns
+                       if field != 'nama' and fields[field] and fields[field] != student.get(field, '')]
+
+            if not changes:
+                unchanged += 1
+                continue
+
+            for field, old, new in changes:
+                setattr(student, field, new)
+                diff.append(('update', student.idn, student.nama, field, old, new))
+
+            student.updated_at = now
+            student.apply_status()
+            if student.idn not in adds and student.idn not in updates:
+                # Batch writes are unconditional; the bump still flags the change to open editors
+                student.version = (student.version or 0) + 1
+                updates[student.idn] = student
+
+        return list(adds.values()), list(updates.values()), unchanged, rejected, diff
+
+    def _write_diff(self, diff, filename):
+        """Write the dry-run diff (one row per added student or changed field)"""
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['action', 'idn', 'nama', 'field', 'old', 'new'])
+                writer.writerows(diff)
+            print(f"[INFO] Diff written to {filename}")
+        except OSError as e:
+            print(f"[ERROR] {e}")
+            return
+
+        print(f"\n{'ACTION':<8} {'IDN':<6} {'NAME':<30} CHANGE")
+        print("="*80)
+        for action, idn, nama, field, old, new in diff[:20]:
+            change = f"{field}: {old or '-'} -> {new}" if field else ''
+            print(f"{action:<8} {idn:<6} {nama[:29]:<30} {change}")
+        if len(diff) > 20:
+            print(f"... and {len(diff) - 20} more (see {filename})")
+
+    def _write_rejected(self, rejected, filename):
+        """Write rejected rows with their CSV line number and reason"""
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'reason', 'idn'] + list(IMPORT_FIELDS))
+                for line, reason, row in rejected:
+                    writer.writerow([line, reason, row.get('idn') or ''] +
+                                    [row.get(field) or '' for field in IMPORT_FIELDS])
+            print(f"[INFO] Rejected rows written to {filename}")
+        except OSError as e:
+            print(f"[ERROR] {e}")
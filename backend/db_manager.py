@@ -1,40 +1,89 @@
 #!/usr/bin/env python3
 """
 DynamoDB Table Manager - View and manage student data
-Usage: python backend/db_manager.py
+Usage: python backend/db_manager.py [--university ID] [--timings] [--offline]
+
+--university picks the university (tenant) to manage; every read and
+write stays inside that university's partition.
+
+--timings prints wall time, DynamoDB calls, items scanned and consumed
+capacity after every action, and a session total on exit.
+--offline works on a local snapshot: adds, edits and deletes go to an
+append-only journal and are pushed with "Sync offline changes".
 
 This is the main entry point for the WMU Students Database Manager.
 All classes are modularized in separate files for better organization.
 """
 
+import argparse
+import boto3
 from zoneinfo import ZoneInfo
+from capacity_tracker import CapacityTracker
 from student_manager import StudentManager
+from offline_journal import OfflineManager
 from student_viewer import StudentViewer
 from student_editor import StudentEditor
 from csv_exporter import CSVExporter
+from csv_importer import CSVImporter
+from duplicate_finder import DuplicateFinder
 from menu_system import MenuSystem
+from tenant import DEFAULT_UNIVERSITY_ID, UNIVERSITIES
 
 # Configuration
-DYNAMODB_TABLE = 'wmu-students'
+DYNAMODB_TABLE = 'university-students'
+META_TABLE = 'university-students-meta'
 REGION = 'us-east-1'
 TIMEZONE = ZoneInfo('America/Detroit')
 
 
 def main():
     """Main application entry point"""
+    parser = argparse.ArgumentParser(description='WMU Students Database Manager')
+    parser.add_argument('--university', default=DEFAULT_UNIVERSITY_ID, choices=sorted(UNIVERSITIES),
+                        help=f"university to manage (default {DEFAULT_UNIVERSITY_ID})")
+    parser.add_argument('--timings', action='store_true',
+                        help='print time, DynamoDB calls and consumed capacity per action')
+    parser.add_argument('--offline', action='store_true',
+                        help='edit a local snapshot and journal the changes until they are synced')
+    args = parser.parse_args()
+
+    # Must hook the session before any DynamoDB client is created
+    tracker = None
+    if args.timings:
+        tracker = CapacityTracker()
+        boto3.setup_default_session()
+        tracker.attach(boto3.DEFAULT_SESSION)
+
     # Initialize core manager
-    manager = StudentManager(DYNAMODB_TABLE, REGION, TIMEZONE)
+    if args.offline:
+        try:
+            manager = OfflineManager(DYNAMODB_TABLE, REGION, TIMEZONE, META_TABLE, args.university)
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            return
+    else:
+        manager = StudentManager(DYNAMODB_TABLE, REGION, TIMEZONE, META_TABLE, args.university)
 
     # Initialize feature modules
     viewer = StudentViewer(manager)
     editor = StudentEditor(manager)
     exporter = CSVExporter(manager)
+    importer = CSVImporter(manager)
+    duplicate_finder = DuplicateFinder(manager)
+
+    if tracker:
+        for module in (manager, viewer, editor, exporter, importer, duplicate_finder):
+            tracker.instrument(module)
 
     # Initialize menu system
-    menu_system = MenuSystem(manager, viewer, editor, exporter)
+    menu_system = MenuSystem(manager, viewer, editor, exporter, importer, duplicate_finder)
 
     # Start application
-    menu_system.main_menu()
+    try:
+        menu_system.main_menu()
+    finally:
+        if tracker:
+            tracker.print_session()
 
 
 if __name__ == '__main__':
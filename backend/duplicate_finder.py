@@ -0,0 +1,368 @@
+"""
+DuplicateFinder - Duplicate student detection (blocking + sorted neighborhood)
+"""
+
+import csv
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from botocore.exceptions import ClientError
+
+MISSING = 'Not specified'
+COMPARED_FIELDS = ('jurusan', 'university', 'provinsi')  # Agreement nudges the name score
+MERGE_FIELDS = ('jurusan', 'university', 'year', 'provinsi')  # Filled into the kept record
+REPORT_FIELDS = ('nama', 'jurusan', 'university', 'year', 'provinsi')
+
+DEFAULT_THRESHOLD = 0.88
+DEFAULT_WINDOW = 8
+PARALLEL_MIN = 5000  # Below this many students the comparison runs in-process
+
+
+class DuplicateFinder:
+    """Finds clusters of students that are probably the same person
+
+    Comparing every pair is O(n^2), so students are first split into
+    blocks that share a key: the normalized last name, or its Soundex code
+    to also catch spelling variants ("Mabel" / "Mabell"). Inside a block
+    the records are sorted by name and each one is compared only with the
+    next window - 1 records (sorted neighborhood), so a block of a common
+    last name costs O(n * window). Blocks are compared in parallel on a
+    process pool. Pairs scoring at least the threshold are joined into
+    clusters; the merge plan keeps the lowest IDN of every cluster.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def find_duplicates(self):
+        """Prompt for the options, report the clusters and optionally apply the merge plan"""
+        print("\n=== FIND DUPLICATES ===")
+        print("Block candidates by:")
+        print("1. Last name (fast)")
+        print("2. Phonetic last name (also catches spelling variants)")
+        blocking = 'phonetic' if input("Select option (1-2, default 2): ").strip() != '1' else 'last'
+
+        threshold = input(f"Minimum similarity (0-1, default {DEFAULT_THRESHOLD}): ").strip()
+        try:
+            threshold = float(threshold) if threshold else DEFAULT_THRESHOLD
+        except ValueError:
+            print("[ERROR] Similarity must be a number")
+            return
+
+        try:
+            students = self.manager.get_all_students()
+        except ClientError as e:
+            print(f"[ERROR] {e}")
+            return
+
+        start = time.perf_counter()
+        clusters, stats = find_clusters(students, blocking, threshold)
+        print(f"\nCompared {stats['comparisons']} pairs in {stats['blocks']} blocks "
+              f"of {len(students)} students ({time.perf_counter() - start:.2f}s)")
+
+        if not clusters:
+            print("[INFO] No duplicates found")
+            return
+
+        print(f"Found {len(clusters)} cluster(s) covering {sum(len(members) for members, _, _ in clusters)} students")
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._print_clusters(clusters)
+        self._write_clusters(clusters, f"duplicates_{timestamp}.csv")
+
+        plan = merge_plan(clusters)
+        if input("\nWrite merge plan (keeps the lowest IDN)? (yes/no): ").strip().lower() not in ['yes', 'y']:
+            return
+        self._write_plan(plan, f"merge_plan_{timestamp}.csv")
+
+        removed = sum(len(remove) for _, remove, _, _ in plan)
+        review = sum(len(review) for _, _, review, _ in plan)
+        if review:
+            print(f"[INFO] {review} student(s) only match through another duplicate; they are kept for review")
+        confirm = input(f"\nApply the merge plan and delete {removed} student(s)? "
+                        f"This cannot be undone! (yes/no): ").strip().lower()
+        if confirm in ['yes', 'y']:
+            self._apply(plan)
+        else:
+            print("[INFO] Merge plan not applied")
+
+    def _apply(self, plan):
+        """Fill each kept record, then delete the records that matched it"""
+        to_delete = []
+        merged = 0
+        for keep, remove, _, fills in plan:
+            if fills:
+                try:
+                    self.manager.update_fields(keep, fills)
+                except ClientError as e:
+                    # Someone changed the kept record since it was read: leave the whole cluster
+                    print(f"[ERROR] IDN {keep.idn} not merged: {e}")
+                    continue
+            merged += 1
+            to_delete.extend(student.idn for student in remove)
+
+        deleted, failed_idns = self.manager.delete_students(to_delete)
+        if deleted:
+            self.manager.counter.add(-deleted)
+        for idn in failed_idns:
+            print(f"Failed to delete IDN {idn}")
+        print(f"\n[SUCCESS] Merged {merged} cluster(s), deleted {deleted}/{len(to_delete)} student(s)")
+
+    def _print_clusters(self, clusters, limit=10):
+        for number, (members, score, _) in enumerate(clusters[:limit], 1):
+            print(f"\nCluster {number} (similarity {score:.2f})")
+            for student in members:
+                print(f"  {student.idn:<6} {student.get('nama', '')[:29]:<30} {student.get('jurusan', '')[:19]:<20} "
+                      f"{student.get('year', '')[:14]:<15} {student.get('provinsi', '')}")
+        if len(clusters) > limit:
+            print(f"\n... and {len(clusters) - limit} more")
+
+    def _write_clusters(self, clusters, filename):
+        """One row per student in a cluster, with its best match inside the cluster"""
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['cluster', 'cluster_similarity', 'idn'] + list(REPORT_FIELDS) +
+                                ['best_match_idn', 'best_match_similarity'])
+                for number, (members, score, pairs) in enumerate(clusters, 1):
+                    for student in members:
+                        match, match_score = max(((b if a == student.idn else a, s) for a, b, s in pairs
+                                                  if student.idn in (a, b)), key=lambda pair: pair[1])
+                        writer.writerow([number, f"{score:.3f}", student.idn] +
+                                        [student.get(field, '') for field in REPORT_FIELDS] +
+                                        [match, f"{match_score:.3f}"])
+            print(f"\n[INFO] Clusters written to {filename}")
+        except OSError as e:
+            print(f"[ERROR] {e}")
+
+    def _write_plan(self, plan, filename):
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['keep_idn', 'keep_nama', 'remove_idns', 'remove_names', 'review_idns', 'filled_fields'])
+                for keep, remove, review, fills in plan:
+                    writer.writerow([keep.idn, keep.get('nama', ''),
+                                     ';'.join(str(student.idn) for student in remove),
+                                     ';'.join(student.get('nama', '') for student in remove),
+                                     ';'.join(str(student.idn) for student in review),
+                                     '; '.join(f"{field}={value}" for field, value in fills.items())])
+            print(f"[INFO] Merge plan written to {filename}")
+        except OSError as e:
+            print(f"[ERROR] {e}")
+
+
+def find_clusters(students, blocking='phonetic', threshold=DEFAULT_THRESHOLD, window=DEFAULT_WINDOW, workers=None):
+    """Return (clusters, stats) for students
+
+    Each cluster is (members sorted by IDN, weakest pair similarity,
+    [(idn_a, idn_b, similarity)]); clusters are ordered by similarity,
+    highest first.
+    """
+    students = [student for student in students if student.get('nama')]
+    by_idn = {student.idn: student for student in students}
+
+    blocks = {}
+    for student in students:
+        record = (student.idn, name_tokens(student.nama),
+                  tuple(normalize(student.get(field)) for field in COMPARED_FIELDS))
+        if record[1]:
+            blocks.setdefault(block_key(record[1], blocking), []).append(record)
+    blocks = [block for block in blocks.values() if len(block) > 1]
+
+    if workers == 1 or len(students) < PARALLEL_MIN:
+        results = [compare_blocks(blocks, window, threshold)]
+    else:
+        # Largest blocks first, dealt round-robin, so the chunks carry similar work
+        blocks.sort(key=len, reverse=True)
+        workers = workers or os.cpu_count() or 1
+        chunks = [blocks[i::workers * 4] for i in range(workers * 4)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(compare_blocks, chunks, [window] * len(chunks), [threshold] * len(chunks)))
+
+    pairs = [pair for found, _ in results for pair in found]
+    stats = {'blocks': len(blocks), 'comparisons': sum(count for _, count in results), 'pairs': len(pairs)}
+    return _cluster(pairs, by_idn), stats
+
+
+def compare_blocks(blocks, window, threshold):
+    """Sorted-neighborhood comparison inside each block, returns (pairs, comparisons)
+
+    Runs in worker processes, so it takes and returns plain tuples.
+    """
+    pairs = []
+    comparisons = 0
+    for block in blocks:
+        block = sorted(block, key=lambda record: record[1])
+        for i, (idn, tokens, fields) in enumerate(block):
+            for other_idn, other_tokens, other_fields in block[i + 1:i + window]:
+                comparisons += 1
+                score = similarity(tokens, fields, other_tokens, other_fields)
+                if score >= threshold:
+                    pairs.append((min(idn, other_idn), max(idn, other_idn), score))
+    return pairs, comparisons
+
+
+def _cluster(pairs, by_idn):
+    """Join matching pairs into clusters (union-find)"""
+    parent = {}
+
+    def root(idn):
+        parent.setdefault(idn, idn)
+        while parent[idn] != idn:
+            parent[idn] = parent[parent[idn]]
+            idn = parent[idn]
+        return idn
+
+    for a, b, _ in pairs:
+        parent[root(a)] = root(b)
+
+    grouped = {}
+    for pair in pairs:
+        grouped.setdefault(root(pair[0]), []).append(pair)
+
+    clusters = []
+    for cluster_pairs in grouped.values():
+        idns = sorted({idn for a, b, _ in cluster_pairs for idn in (a, b)})
+        clusters.append(([by_idn[idn] for idn in idns], min(score for _, _, score in cluster_pairs), cluster_pairs))
+    clusters.sort(key=lambda cluster: (-cluster[1], cluster[0][0].idn))
+    return clusters
+
+
+def merge_plan(clusters):
+    """Return [(keep, remove, review, fills)] keeping the lowest IDN of every cluster
+
+    Only members that matched the kept record directly are removed; members
+    linked to it only through other members (A ~ B ~ C) are listed for
+    review instead. fills holds the MERGE_FIELDS the kept record lacks,
+    taken from the most recently updated removed record that has them.
+    """
+    plan = []
+    for members, _, pairs in clusters:
+        keep = members[0]
+        matched = {b for a, b, _ in pairs if a == keep.idn}  # Pairs are (lower IDN, higher IDN)
+        remove = [student for student in members[1:] if student.idn in matched]
+        review = [student for student in members[1:] if student.idn not in matched]
+        fills = {}
+        for student in sorted(remove, key=lambda student: student.get('updated_at') or '', reverse=True):
+            for field in MERGE_FIELDS:
+                if field not in fills and not normalize(keep.get(field)) and normalize(student.get(field)):
+                    fills[field] = student.get(field)
+        plan.append((keep, remove, review, fills))
+    return plan
+
+
+def normalize(value):
+    """Casefolded value, '' for blank and 'Not specified'"""
+    value = ' '.join(str(value or '').casefold().split())
+    return '' if value == MISSING.casefold() else value
+
+
+def name_tokens(nama):
+    """Lowercase ASCII name words: "Aprilia W. Mabel" -> ('aprilia', 'w', 'mabel')"""
+    text = unicodedata.normalize('NFKD', nama or '')
+    text = ''.join(c if c.isalnum() else ' ' for c in text if not unicodedata.combining(c))
+    return tuple(text.casefold().split())
+
+
+def block_key(tokens, blocking='phonetic'):
+    last = tokens[-1]
+    return soundex(last) if blocking == 'phonetic' else last
+
+
+SOUNDEX_CODES = {c: str(code) for code, letters in enumerate(('bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r'), 1)
+                 for c in letters}
+
+
+def soundex(word):
+    """American Soundex code: "Mabel" and "Mabell" -> 'M140'"""
+    letters = [c for c in word.lower() if c.isalpha()]
+    if not letters:
+        return word
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0])
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c)
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if c not in 'hw':  # h and w do not separate equal codes
+            previous = digit
+    return code.ljust(4, '0')
+
+
+@lru_cache(maxsize=65536)  # Name words repeat a lot (common first and last names)
+def jaro_winkler(a, b):
+    """Jaro-Winkler similarity of two strings (1.0 = equal)"""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+
+    reach = max(len(a), len(b)) // 2 - 1
+    a_matched = [False] * len(a)
+    b_matched = [False] * len(b)
+    matches = 0
+    for i, c in enumerate(a):
+        for j in range(max(0, i - reach), min(len(b), i + reach + 1)):
+            if not b_matched[j] and b[j] == c:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    a_chars = [c for c, matched in zip(a, a_matched) if matched]
+    b_chars = [c for c, matched in zip(b, b_matched) if matched]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def name_similarity(a, b):
+    """Similarity of two name token tuples
+
+    First and last names weigh 40% each, middle names 20%. A missing
+    middle name or an initial ("W" for "Weni") is treated as compatible,
+    slightly below an exact match.
+    """
+    if a == b:
+        return 1.0
+    if len(a) == 1 or len(b) == 1:
+        return jaro_winkler(' '.join(a), ' '.join(b))
+
+    middle_a, middle_b = a[1:-1], b[1:-1]
+    if not middle_a and not middle_b:
+        middle = 1.0
+    elif not middle_a or not middle_b:
+        middle = 0.9
+    else:
+        shorter, longer = sorted((middle_a, middle_b), key=len)
+        middle = sum(max(_middle_match(token, other) for other in longer) for token in shorter) / len(shorter)
+
+    return 0.4 * jaro_winkler(a[0], b[0]) + 0.4 * jaro_winkler(a[-1], b[-1]) + 0.2 * middle
+
+
+def _middle_match(a, b):
+    if a == b:
+        return 1.0
+    if (len(a) == 1 or len(b) == 1) and a[0] == b[0]:
+        return 0.9
+    return jaro_winkler(a, b)
+
+
+def similarity(tokens_a, fields_a, tokens_b, fields_b):
+    """Name similarity, adjusted by agreement of the COMPARED_FIELDS both records have"""
+    score = name_similarity(tokens_a, tokens_b)
+    compared = [x == y for x, y in zip(fields_a, fields_b) if x and y]
+    if not compared:
+        return score
+    return 0.85 * score + 0.15 * sum(compared) / len(compared)
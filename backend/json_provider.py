@@ -0,0 +1,100 @@
+"""
+JSON serialization - Flask JSON provider and cached student payload fragments
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from student import Student
+
+try:
+    import orjson  # Optional faster encoder
+except ImportError:
+    orjson = None
+
+
+def json_default(obj):
+    """Serialize DynamoDB Decimals and Student records"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, Student):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_json(obj):
+    """Encode obj to compact JSON bytes with sorted keys, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, default=json_default, ensure_ascii=False, sort_keys=True,
+                      separators=(',', ':')).encode('utf-8')
+
+
+class StudentJSONProvider(DefaultJSONProvider):
+    """JSON provider that handles Decimal natively and prefers orjson"""
+
+    default = staticmethod(json_default)
+
+    def dumps(self, obj, **kwargs):
+        # Pretty-printing and other options go through the standard encoder
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return encode_json(obj).decode('utf-8')
+
+
+class StudentFragmentCache:
+    """Caches the encoded JSON bytes of each student record keyed by updated_at
+
+    A list response is then mostly a concatenation of cached fragments;
+    only records whose updated_at changed since the last request are
+    encoded again. Each requested fieldset (fields=) has its own fragments;
+    the least recently used fieldsets are dropped beyond max_fieldsets.
+    """
+
+    def __init__(self, max_fieldsets=8):
+        self.max_fieldsets = max_fieldsets
+        self._fieldsets = OrderedDict()  # fields tuple (None = all) -> {idn: (updated_at, bytes)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _fragments(self, fields):
+        with self._lock:
+            fragments = self._fieldsets.get(fields)
+            if fragments is None:
+                fragments = self._fieldsets[fields] = {}
+                while len(self._fieldsets) > self.max_fieldsets:
+                    self._fieldsets.popitem(last=False)
+            else:
+                self._fieldsets.move_to_end(fields)
+            return fragments
+
+    def encode(self, student, fields=None, _fragments=None):
+        """Return the encoded JSON bytes of a single student"""
+        fragments = self._fragments(fields) if _fragments is None else _fragments
+        entry = fragments.get(student.idn)
+        if entry is not None and entry[0] == student.updated_at:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        fragment = encode_json(student.to_dict(fields))
+        if student.updated_at is not None:  # Without it a change could not be detected
+            with self._lock:  # retain() may be pruning this dict on another thread
+                fragments[student.idn] = (student.updated_at, fragment)
+        return fragment
+
+    def encode_list(self, students, fields=None):
+        """Return the encoded JSON array of students"""
+        fragments = self._fragments(fields)
+        return b'[' + b','.join([self.encode(student, fields, fragments) for student in students]) + b']'
+
+    def retain(self, idns):
+        """Drop fragments of students that are no longer listed (e.g. deleted)"""
+        idns = set(idns)
+        with self._lock:
+            for fragments in self._fieldsets.values():
+                for idn in [idn for idn in fragments if idn not in idns]:
+                    del fragments[idn]
@@ -1,29 +1,153 @@
-from flask import Flask, request, jsonify
+import os
+import sys
+from flask import Blueprint, Flask, current_app, g, request, jsonify
 from flask_cors import CORS
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 from datetime import datetime
-from decimal import Decimal
+from functools import partial
 from zoneinfo import ZoneInfo
 
-app = Flask(__name__)
-CORS(app)
+# Shared backend modules live next to this file; Lambda imports it as backend.main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from student import Student, normalize_submission, parse_fields, projection_args, status_update_args
+from json_provider import StudentJSONProvider, StudentFragmentCache
+from compression import ResponseCompressor
+from rate_limiter import RateLimiter, MemoryBucketStore, DynamoDBBucketStore
+from student_counter import IdnSequence, StudentCounter
+from student_inserter import NameTaken, StudentInserter
+from student_cache import StudentCache, SharedInvalidation
+from student_index import StudentIndex, NameSuggester
+from tenant import DEFAULT_UNIVERSITY_ID, UNIVERSITIES, UNIVERSITY_KEY
+
+api = Blueprint('api', __name__)
 
 # Configuration
-DYNAMODB_TABLE = 'wmu-students'
+DYNAMODB_TABLE = 'university-students'  # university_id (partition) + idn (sort key)
+META_TABLE = 'university-students-meta'  # Counters (student totals, IDN sequences), name reservations
 REGION = 'us-east-1'
 TIMEZONE = ZoneInfo('America/Detroit')  # Eastern Time (Michigan)
 
+# Rate limits per client IP and route: (burst capacity, tokens refilled per second)
+# Expensive routes scan the table (billed per request); cheap ones do not
+RATE_LIMITS = {
+    'expensive': (10, 10 / 60),
+    'cheap': (60, 1.0)
+}
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_TABLE = os.environ.get('RATE_LIMIT_TABLE')  # Share limits across containers
+
+# Seconds the student total is served from this container before re-reading it
+COUNT_CACHE_TTL = int(os.environ.get('COUNT_CACHE_TTL', '60'))
+
+# Warm-container student cache: max records and staleness window in seconds
+STUDENT_CACHE_SIZE = int(os.environ.get('STUDENT_CACHE_SIZE', '5000'))
+STUDENT_CACHE_TTL = int(os.environ.get('STUDENT_CACHE_TTL', '30'))
+
+# /students/suggest: shortest prefix answered, default and max number of names returned
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_LIMIT = 8
+SUGGEST_MAX_LIMIT = 20
+
+# Responses at least this large (bytes) are gzip/brotli compressed when accepted
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+
 # Initialize DynamoDB
 dynamodb = boto3.resource('dynamodb', region_name=REGION)
 table = dynamodb.Table(DYNAMODB_TABLE)
+meta_table = dynamodb.Table(META_TABLE)
+
+rate_limiter = RateLimiter(
+    RATE_LIMITS,
+    store=DynamoDBBucketStore(dynamodb.Table(RATE_LIMIT_TABLE)) if RATE_LIMIT_TABLE else MemoryBucketStore(),
+    enabled=RATE_LIMIT_ENABLED
+)
+
+compressor = ResponseCompressor(min_size=COMPRESS_MIN_SIZE)
+
+def query_students(university_id, fields=None, source=None):
+    """Fetch one university's students (its partition) with pagination handling
+
+    fields limits the attributes read; nama (the list order) and updated_at
+    (so cached JSON fragments can tell when a record changed) are always read.
+    """
+    source = source or table
+    query_args = projection_args(tuple(fields) + ('nama', 'updated_at')) if fields else {}
+    condition = Key(UNIVERSITY_KEY).eq(university_id)
+    response = source.query(KeyConditionExpression=condition, **query_args)
+    students = [Student.from_item(item) for item in response['Items']]
+
+    while 'LastEvaluatedKey' in response:
+        response = source.query(KeyConditionExpression=condition,
+                                ExclusiveStartKey=response['LastEvaluatedKey'], **query_args)
+        students.extend(Student.from_item(item) for item in response['Items'])
+
+    return students
 
-def decimal_to_int(obj):
-    """Convert Decimal to int for JSON serialization"""
-    if isinstance(obj, Decimal):
-        return int(obj)
-    raise TypeError
+def load_student(university_id, idn):
+    """Fetch one student by university and IDN from DynamoDB"""
+    response = table.get_item(Key={UNIVERSITY_KEY: university_id, 'idn': idn})
+    return Student.from_item(response['Item']) if 'Item' in response else None
+
+class Tenant:
+    """One university's counter, IDN sequence, inserter, student cache and encoded JSON
+
+    Every cache is per university, so serving one university never loads
+    or invalidates another's students.
+    """
+
+    def __init__(self, university_id):
+        self.university_id = university_id
+        self.name = UNIVERSITIES[university_id]
+        self.counter = StudentCounter(meta_table, table, university_id, ttl=COUNT_CACHE_TTL)
+        self.sequence = IdnSequence(meta_table, table, university_id)
+        self.inserter = StudentInserter(table, meta_table, self.sequence, university_id)
+        self.cache = StudentCache(partial(query_students, university_id), partial(load_student, university_id),
+                                  max_size=STUDENT_CACHE_SIZE, ttl=STUDENT_CACHE_TTL)
+        # Encoded JSON of each student, reused across /students responses
+        self.fragments = StudentFragmentCache()
+
+    def key(self, idn):
+        return {UNIVERSITY_KEY: self.university_id, 'idn': idn}
+
+# Built up front rather than on first request, so the gunicorn master can warm them all
+tenants = {university_id: Tenant(university_id) for university_id in UNIVERSITIES}
+
+@api.url_value_preprocessor
+def select_university(endpoint, values):
+    """/u/<university_id>/... serves that university, the unprefixed routes the default one"""
+    university_id = (values or {}).pop('university_id', DEFAULT_UNIVERSITY_ID)
+    g.tenant = tenants.get(university_id.lower())
+
+@api.before_request
+def require_university():
+    if g.tenant is None:
+        return jsonify({'status': 'error', 'message': 'Unknown university',
+                        'universities': sorted(tenants)}), 404
+
+def warm_up():
+    """Load every university's cache, index and encoded fragments before serving
+
+    Run in the gunicorn master with preload_app, so every forked worker
+    starts with the same warm caches, shared copy-on-write. The queries use
+    a throwaway client: connections opened here must not be inherited by
+    the workers.
+    """
+    source = boto3.resource('dynamodb', region_name=REGION).Table(DYNAMODB_TABLE)
+    count = 0
+    for tenant in tenants.values():
+        students = query_students(tenant.university_id, source=source)
+        tenant.cache.replace_all(students)
+        tenant.fragments.encode_list(tenant.cache.derived(StudentIndex).query())
+        tenant.cache.derived(NameSuggester)
+        count += len(students)
+    return count
+
+def enable_shared_invalidation():
+    """Share cache invalidations between worker processes (call before forking)"""
+    for tenant in tenants.values():
+        tenant.cache.share_invalidation(SharedInvalidation())
 
 def find_student(nama):
     """
@@ -37,74 +161,50 @@ def find_student(nama):
     Returns: student record or None
     """
     try:
-        # Get all students
-        response = table.scan()
-        students = response['Items']
-
-        # Handle pagination
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            students.extend(response['Items'])
-
-        # Extract firstName (first word) and lastName (last word) from input
-        nama_parts = nama.strip().split()
-
-        if len(nama_parts) >= 2:
-            input_first = nama_parts[0].lower()
-            input_last = nama_parts[-1].lower()
-
-            # PRIORITY 1: Check for firstName + lastName match
-            for student in students:
-                student_name_parts = student.get('nama', '').strip().split()
-                if len(student_name_parts) >= 2:
-                    student_first = student_name_parts[0].lower()
-                    student_last = student_name_parts[-1].lower()
-
-                    # Match if firstName AND lastName both match
-                    if student_first == input_first and student_last == input_last:
-                        return student
-
-        # PRIORITY 2: Fallback to exact match (case-insensitive)
-        for student in students:
-            if student.get('nama', '').lower() == nama.lower():
-                return student
-
-        return None
+        # Served from the warm-container cache (queries only when it is stale)
+        return g.tenant.cache.find_by_name(nama)
 
     except ClientError as e:
         print(f"Error finding student: {e}")
         return None
 
-def get_next_idn():
-    """Get the next IDN number"""
-    try:
-        # Scan to find max IDN
-        response = table.scan(
-            ProjectionExpression='idn'
-        )
+def parse_list_args(args):
+    """Return (filters, sort, descending) from /students query arguments
+
+    filters maps each filter field to its accepted values. Raises
+    ValueError for an unknown sort field or order.
+    """
+    filters = {}
+    for field in StudentIndex.FILTER_FIELDS:
+        values = [value.strip() for arg in args.getlist(field) for value in arg.split(',') if value.strip()]
+        if values:
+            filters[field] = values
 
-        if not response['Items']:
-            return 1
+    sort = args.get('sort', 'nama')
+    if sort not in StudentIndex.SORT_FIELDS:
+        raise ValueError(f"Unknown sort field: {sort} (use one of {', '.join(StudentIndex.SORT_FIELDS)})")
 
-        max_idn = max([int(item['idn']) for item in response['Items']])
-        return max_idn + 1
+    order = args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
 
-    except ClientError as e:
-        print(f"Error getting next IDN: {e}")
-        return 1
+    return filters, sort, order == 'desc'
 
 def update_or_add_student(data):
     """Update existing student or add new one"""
     # Auto-format names to Title Case (Victor Tabuni, Computer Science)
-    nama = data.get('nama', '').strip().title()
-    jurusan = data.get('jurusan', '').strip().title()
-    university = data.get('university', '').strip()
-    year = data.get('year', '').strip()
-    provinsi = data.get('provinsi', '').strip().title()
+    fields = normalize_submission(data)
+    nama = fields['nama']
+    jurusan = fields['jurusan']
+    university = fields['university']
+    year = fields['year']
+    provinsi = fields['provinsi']
 
     if not nama:
         return {'status': 'error', 'message': 'Nama is required'}
 
+    tenant = g.tenant
+
     # Check if student exists
     existing = find_student(nama)
 
@@ -117,81 +217,105 @@ def update_or_add_student(data):
     }
 
     try:
-        if existing:
-            # Update existing student - KEEP the original full name from database
-            idn = int(existing['idn'])
-            original_nama = existing.get('nama')  # Keep original full name
-
-            table.update_item(
-                Key={'idn': idn},
-                UpdateExpression='SET jurusan = :j, university = :u, #y = :yr, provinsi = :p, updated_at = :ua',
-                ExpressionAttributeValues={
-                    ':j': jurusan,
-                    ':u': university,
-                    ':yr': year,
-                    ':p': provinsi,
-                    ':ua': datetime.now(TIMEZONE).isoformat()
-                },
-                ExpressionAttributeNames={
-                    '#y': 'year'  # 'year' is a reserved word in DynamoDB
+        if not existing:
+            # Add new student: the IDN and the name are claimed in one transaction
+            now = datetime.now(TIMEZONE).isoformat()
+            student = Student(None, nama, jurusan, university, year, provinsi, now, now, version=1)
+            try:
+                tenant.inserter.insert(student)
+            except NameTaken as e:
+                # A concurrent submission added this person first: update that record instead
+                existing = load_student(tenant.university_id, e.idn)
+                if existing is None:
+                    return {'status': 'error', 'message': 'Student was changed concurrently, please submit again'}
+            else:
+                tenant.counter.add(1)
+                tenant.cache.put(student)
+
+                response_data['idn'] = student.idn
+                return {
+                    'status': 'added',
+                    'message': f'Successfully added new record for {nama}',
+                    'data': response_data
                 }
-            )
-
-            # Return response with ORIGINAL full name preserved
-            response_data['nama'] = original_nama  # Use database name, not input name
-            response_data['idn'] = idn
-            return {
-                'status': 'updated',
-                'message': f'Successfully updated record for {original_nama}',
-                'data': response_data
-            }
-        else:
-            # Add new student
-            idn = get_next_idn()
-
-            table.put_item(
-                Item={
-                    'idn': idn,
-                    'nama': nama,
-                    'jurusan': jurusan,
-                    'university': university,
-                    'year': year,
-                    'provinsi': provinsi,
-                    'created_at': datetime.now(TIMEZONE).isoformat(),
-                    'updated_at': datetime.now(TIMEZONE).isoformat()
-                }
-            )
 
-            response_data['idn'] = idn
-            return {
-                'status': 'added',
-                'message': f'Successfully added new record for {nama}',
-                'data': response_data
-            }
+        # Update existing student - KEEP the original full name from database
+        idn = existing.idn
+        original_nama = existing.nama  # Keep original full name
+        updated_at = datetime.now(TIMEZONE).isoformat()
+
+        # Keep the derived status / graduation year in sync with year
+        status_set, status_remove, status_values = status_update_args(year, tenant.university_id)
+        update_expression = 'SET ' + ', '.join(
+            ['jurusan = :j', 'university = :u', '#y = :yr', 'provinsi = :p', 'updated_at = :ua'] + status_set)
+        if status_remove:
+            update_expression += ' REMOVE ' + ', '.join(status_remove)
+        # Bump the version so a concurrent edit in the CLI detects this write
+        update_expression += ' ADD version :one'
+
+        response = table.update_item(
+            Key=tenant.key(idn),
+            UpdateExpression=update_expression,
+            # Never recreate a student that was deleted since it was found
+            ConditionExpression='attribute_exists(idn)',
+            ExpressionAttributeValues={
+                ':j': jurusan,
+                ':u': university,
+                ':yr': year,
+                ':p': provinsi,
+                ':ua': updated_at,
+                ':one': 1,
+                **status_values
+            },
+            ExpressionAttributeNames={
+                '#y': 'year',  # 'year' is a reserved word in DynamoDB
+                '#st': 'status'
+            },
+            ReturnValues='ALL_NEW'
+        )
+        tenant.cache.put(Student.from_item(response['Attributes']))
+
+        # Return response with ORIGINAL full name preserved
+        response_data['nama'] = original_nama  # Use database name, not input name
+        response_data['idn'] = idn
+        return {
+            'status': 'updated',
+            'message': f'Successfully updated record for {original_nama}',
+            'data': response_data
+        }
 
     except ClientError as e:
         return {'status': 'error', 'message': f'Database error: {str(e)}'}
     except Exception as e:
         return {'status': 'error', 'message': f'Error: {str(e)}'}
 
-@app.route('/')
+@api.route('/')
+@rate_limiter.limit('cheap')
 def index():
     """Root endpoint - API information"""
     try:
-        # Get total count
-        response = table.scan(Select='COUNT')
-        total = response['Count']
+        # Maintained on writes and cached, so this costs no table reads
+        counter = g.tenant.counter
+        total = counter.get_total()
+        if counter.source != 'exact' and not total:
+            total = None  # Unseeded, or unreadable with no earlier value: unknown, not zero
 
         return jsonify({
             'message': 'WMU Student Update API',
             'database': 'DynamoDB',
             'total_students': total,
+            'total_students_source': counter.source,  # 'exact', 'stale' or 'unseeded'
+            'university': {'id': g.tenant.university_id, 'name': g.tenant.name},
+            'universities': sorted(tenants),
+            'cache': g.tenant.cache.stats(),
             'frontend': 'https://rfldn0.github.io/WMUStudentsUpdate/',
             'endpoints': {
                 '/submit': 'POST - Submit student data (form-data or JSON)',
                 '/api/submit': 'POST - Submit student data (alias)',
-                '/students': 'GET - List all students',
-                '/students/<nama>': 'GET - Get student by name'
+                '/students': 'GET - List students (?provinsi=&jurusan=&year=&university=&sort=&order=&fields=)',
+                '/students/suggest': 'GET - Name suggestions for a prefix (?q=)',
+                '/students/<nama>': 'GET - Get student by name',
+                '/u/<university_id>/...': 'Any route above for one university (unprefixed: the default one)'
             }
         })
     except ClientError as e:
@@ -201,30 +325,33 @@ def index():
             'error': str(e)
         })
 
-@app.route('/students', methods=['GET'])
+@api.route('/students', methods=['GET'])
+@rate_limiter.limit('expensive')
 def list_students():
-    """List all students"""
-    try:
-        response = table.scan()
-        students = response['Items']
+    """List students, optionally filtered, sorted and limited to some fields
 
-        # Handle pagination if there are more items
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            students.extend(response['Items'])
+    ?provinsi=Papua&jurusan=Computer Science (comma-separated values match any)
+    &sort=created_at&order=desc&fields=idn,nama,provinsi
+    """
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        filters, sort, descending = parse_list_args(request.args)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
 
-        # Sort by name
-        students.sort(key=lambda x: x['nama'])
+    try:
+        # Index over the cached snapshot, rebuilt only after the snapshot changes
+        read_fields = fields and fields + tuple(filters) + (sort,)
+        index = g.tenant.cache.derived(StudentIndex, read_fields)
+        students = index.query(filters, sort, descending)
 
-        # Convert Decimal to int for JSON serialization
-        for student in students:
-            student['idn'] = int(student['idn'])
+        # Assemble the payload from cached per-student fragments
+        if not filters:
+            g.tenant.fragments.retain(student.idn for student in students)
+        body = b'{"count":%d,"data":%b,"status":"success"}' % (
+            len(students), g.tenant.fragments.encode_list(students, fields))
 
-        return jsonify({
-            'status': 'success',
-            'count': len(students),
-            'data': students
-        })
+        return current_app.response_class(body, mimetype='application/json')
 
     except ClientError as e:
         return jsonify({
@@ -232,18 +359,42 @@ def list_students():
             'message': str(e)
         }), 500
 
-@app.route('/students/<nama>', methods=['GET'])
+@api.route('/students/suggest', methods=['GET'])
+@rate_limiter.limit('cheap')
+def suggest_students():
+    """Name suggestions for a typed prefix (?q=apr&limit=8), for the submission form"""
+    query = request.args.get('q', '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', SUGGEST_LIMIT)), 1), SUGGEST_MAX_LIMIT)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit must be a number'}), 400
+
+    if len(query) < SUGGEST_MIN_LENGTH:
+        return jsonify({'status': 'success', 'count': 0, 'data': []})
+
+    try:
+        # Built from the warm snapshot, rebuilt only after the data changes
+        suggester = g.tenant.cache.derived(NameSuggester)
+        students = suggester.suggest(query, limit)
+    except ClientError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    return jsonify({
+        'status': 'success',
+        'count': len(students),
+        'data': [student.to_dict(('idn', 'nama', 'jurusan', 'provinsi')) for student in students]
+    })
+
+@api.route('/students/<nama>', methods=['GET'])
+@rate_limiter.limit('expensive')
 def get_student(nama):
     """Get student by name"""
     student = find_student(nama)
 
     if student:
-        # Convert Decimal to int
-        student['idn'] = int(student['idn'])
-
         return jsonify({
             'status': 'success',
-            'data': student
+            'data': student.to_dict()
         })
     else:
         return jsonify({
@@ -251,8 +402,9 @@ def get_student(nama):
             'message': 'Student not found'
         }), 404
 
-@app.route('/submit', methods=['POST'])
-@app.route('/api/submit', methods=['POST'])
+@api.route('/submit', methods=['POST'])
+@api.route('/api/submit', methods=['POST'])
+@rate_limiter.limit('expensive')
 def submit():
     """Handle form and JSON submissions"""
     try:
@@ -263,5 +415,22 @@ def submit():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+def create_app():
+    """Build the Flask app around the module-level DynamoDB state and caches"""
+    app = Flask(__name__)
+    app.json = StudentJSONProvider(app)
+    CORS(app)
+    app.register_blueprint(api)
+    app.register_blueprint(api, url_prefix='/u/<university_id>', name='university')
+
+    @app.after_request
+    def compress_response(response):
+        return compressor(response, request.headers.get('Accept-Encoding'))
+
+    return app
+
+# Lambda (zappa) and gunicorn import this as backend.main:app
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -2,15 +2,19 @@
 MenuSystem - Manages menu navigation
 """
 
+from tenant import UNIVERSITIES
+
 
 class MenuSystem:
     """Manages menu navigation"""
 
-    def __init__(self, manager, viewer, editor, exporter):
+    def __init__(self, manager, viewer, editor, exporter, importer, duplicate_finder):
         self.manager = manager
         self.viewer = viewer
         self.editor = editor
         self.exporter = exporter
+        self.importer = importer
+        self.duplicate_finder = duplicate_finder
 
     def view_menu(self):
         """View submenu"""
@@ -47,10 +51,11 @@ class MenuSystem:
             print("1. Add new student(s)")
             print("2. Edit student (single/batch)")
             print("3. Remove student (single/batch)")
-            print("4. Back to main menu")
+            print("4. Find duplicate records (report / merge plan)")
+            print("5. Back to main menu")
             print("="*60)
 
-            choice = input("\nSelect option (1-4): ").strip()
+            choice = input("\nSelect option (1-5): ").strip()
 
             if choice == '1':
                 self.editor.add_student()
@@ -59,6 +64,8 @@ class MenuSystem:
             elif choice == '3':
                 self.editor.delete_student()
             elif choice == '4':
+                self.duplicate_finder.find_duplicates()
+            elif choice == '5':
                 break
             else:
                 print("[ERROR] Invalid option")
@@ -73,10 +80,12 @@ class MenuSystem:
             print("2. Count by major")
             print("3. Count by province")
             print("4. Count graduated students")
-            print("5. Back to main menu")
+            print("5. Pivot / crosstab (multiple fields)")
+            print("6. Recount total students (full scan)")
+            print("7. Back to main menu")
             print("="*60)
 
-            choice = input("\nSelect option (1-5): ").strip()
+            choice = input("\nSelect option (1-7): ").strip()
 
             if choice == '1':
                 self.manager.count_total()
@@ -85,26 +94,83 @@ class MenuSystem:
             elif choice == '3':
                 self.manager.count_by_field('provinsi', 'Province')
             elif choice == '4':
-                self.manager.count_graduated()
+                self.graduated_menu()
             elif choice == '5':
+                self.pivot_menu()
+            elif choice == '6':
+                self.manager.recount_total()
+            elif choice == '7':
                 break
             else:
                 print("[ERROR] Invalid option")
 
+    def graduated_menu(self):
+        """Graduated report, optionally limited to a graduation year range"""
+        years = input("\nGraduation year range (e.g. 2020-2024, blank for all): ").strip()
+
+        if not years:
+            self.manager.count_graduated()
+            return
+
+        try:
+            parts = [int(part) for part in years.split('-')]
+            from_year, to_year = (parts[0], parts[0]) if len(parts) == 1 else (parts[0], parts[1])
+        except (ValueError, IndexError):
+            print("[ERROR] Invalid year range")
+            return
+
+        self.manager.count_graduated(from_year, to_year)
+
+    def pivot_menu(self):
+        """Pick group-by fields, show the crosstab and optionally export it"""
+        field_map = {
+            '1': ('provinsi', 'Province'),
+            '2': ('jurusan', 'Major'),
+            '3': ('year', 'Year'),
+            '4': ('university', 'University')
+        }
+
+        print("\n=== PIVOT FIELDS ===")
+        for key, (_, label) in field_map.items():
+            print(f"{key}. {label}")
+
+        choices = input("\nSelect fields in order (comma-separated, e.g. 1,2,3): ").strip()
+        selected = [field_map[c.strip()] for c in choices.split(',') if c.strip() in field_map]
+        selected = list(dict.fromkeys(selected))
+
+        if not selected:
+            print("[ERROR] No valid fields selected")
+            return
+
+        fields = [field for field, _ in selected]
+        labels = [label for _, label in selected]
+        pivot = self.manager.pivot(fields, labels)
+
+        export = input("\nExport to CSV? (yes/no): ").strip().lower()
+        if export in ['yes', 'y']:
+            self.exporter.export_pivot(pivot, labels)
+
     def main_menu(self):
         """Main menu"""
         while True:
             print("\n" + "="*60)
             print("WMU STUDENTS - DYNAMODB MANAGER")
+            print(f"University: {UNIVERSITIES.get(self.manager.university_id, self.manager.university_id)}")
             print("="*60)
             print("1. View Data")
             print("2. Manage Students")
             print("3. Analytics & Statistics")
             print("4. Generate CSV Export")
-            print("5. Exit")
+            print("5. Import CSV")
+            if self.manager.offline:
+                print(f"6. Sync offline changes ({self.manager.pending} pending)")
+                print("7. Exit")
+            else:
+                print("6. Exit")
             print("="*60)
 
-            choice = input("\nSelect option (1-5): ").strip()
+            exit_choice = '7' if self.manager.offline else '6'
+            choice = input(f"\nSelect option (1-{exit_choice}): ").strip()
 
             if choice == '1':
                 self.view_menu()
@@ -115,6 +181,13 @@ class MenuSystem:
             elif choice == '4':
                 self.exporter.export_to_csv()
             elif choice == '5':
+                self.importer.import_from_csv()
+            elif choice == '6' and self.manager.offline:
+                self.manager.sync()
+            elif choice == exit_choice:
+                if self.manager.offline and self.manager.pending:
+                    print(f"\n[INFO] {self.manager.pending} offline change(s) are saved in the journal, "
+                          f"sync them in a later session")
                 print("\nGoodbye!")
                 break
             else:
@@ -0,0 +1,482 @@
+"""
+Offline mode - Local edit journal replayed onto a session snapshot, synced in batches
+"""
+
+import json
+import os
+import boto3
+from bisect import bisect_right
+from datetime import datetime
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from adaptive_executor import AdaptiveExecutor
+from student import Student
+from student_manager import StudentManager
+from tenant import DEFAULT_UNIVERSITY_ID
+
+# One journal and snapshot per university
+JOURNAL_FILE = 'offline_journal_{university_id}.jsonl'
+SNAPSHOT_FILE = 'offline_snapshot_{university_id}.json'
+
+# Fail fast when there is no connection instead of retrying for minutes
+PROBE_CONFIG = Config(connect_timeout=3, read_timeout=30, retries={'total_max_attempts': 1})
+
+
+class OfflineJournal:
+    """Append-only JSON Lines log of the writes made while offline
+
+    Each line is one put, update or delete with the updated_at of the
+    record it was based on (None for a student added offline). Lines are
+    flushed and fsynced as they are written, so a crash loses nothing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def entries(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def __len__(self):
+        return len(self.entries())
+
+    def rewrite(self, entries):
+        """Atomically replace the journal with entries (those still to sync)"""
+        if not entries:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        tmp_file = self.path + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        os.replace(tmp_file, self.path)
+
+
+def coalesce(entries):
+    """Merge journal entries into one net action per IDN, in first-touched order
+
+    Returns {idn: action}; an action is {'op', 'base', 'student' | 'changes',
+    'entries'} where base is the updated_at of the first entry (what the
+    server must still hold). Edits to a student added offline fold into its
+    put, and adding then deleting a student cancels out.
+    """
+    plan = {}
+    for entry in entries:
+        idn = entry['idn']
+        action = plan.get(idn)
+
+        if entry['op'] == 'delete':
+            if action is not None and action['op'] == 'put' and action['base'] is None:
+                del plan[idn]  # Never reached the server
+                continue
+            base = action['base'] if action is not None else entry['base']
+            plan[idn] = {'op': 'delete', 'base': base, 'entries': (action or {}).get('entries', 0) + 1}
+            continue
+
+        if action is None:
+            action = plan[idn] = {'op': entry['op'], 'base': entry['base'], 'entries': 0}
+            if entry['op'] == 'update':
+                action['changes'] = {}
+        action['entries'] += 1
+
+        if entry['op'] == 'put':
+            action['op'] = 'put'
+            action['student'] = dict(entry['student'])
+            action.pop('changes', None)
+        elif action['op'] == 'put':
+            action['student'].update(entry['changes'])
+        elif action['op'] == 'update':
+            action['changes'].update(entry['changes'])
+
+    return plan
+
+
+def request_idn(request):
+    """IDN of a BatchWriteItem PutRequest or DeleteRequest"""
+    if 'PutRequest' in request:
+        return int(request['PutRequest']['Item']['idn'])
+    return int(request['DeleteRequest']['Key']['idn'])
+
+
+class SnapshotCounter:
+    """Stands in for StudentCounter offline: the total is the snapshot size"""
+
+    source = 'exact'
+
+    def __init__(self, students):
+        self.students = students
+
+    def get_total(self, refresh=False):
+        return len(self.students)
+
+    def add(self, delta):
+        pass  # The real counter is adjusted when the journal is synced
+
+
+class OfflineManager(StudentManager):
+    """StudentManager that reads a local snapshot and journals its writes
+
+    The snapshot is downloaded when a connection is available (and saved
+    for later offline sessions), then every journal entry is replayed onto
+    it, so the viewer, analytics and editor see the pending edits at once.
+    Writes only append to the journal. sync() pushes the journal.
+
+    Students added offline get provisional negative IDNs, which can never
+    collide with a server IDN; sync() replaces them with IDNs from the
+    university's sequence.
+    """
+
+    offline = True
+
+    def __init__(self, table_name, region, timezone, meta_table_name=None, university_id=DEFAULT_UNIVERSITY_ID,
+                 journal_path=None, snapshot_path=None):
+        super().__init__(table_name, region, timezone, meta_table_name, university_id)
+        self.remote_counter = self.counter
+        self.probe_table = boto3.resource('dynamodb', region_name=region, config=PROBE_CONFIG).Table(table_name)
+        self.journal = OfflineJournal(journal_path or JOURNAL_FILE.format(university_id=university_id))
+        self.snapshot_path = snapshot_path or SNAPSHOT_FILE.format(university_id=university_id)
+        self.students = {}  # idn -> Student, snapshot with the journal applied
+        self.counter = SnapshotCounter(self.students)
+        self._sorted_idns = None
+        self._lowest_idn = 0  # Lowest provisional (negative) IDN handed out
+        self.load()
+
+    # --- Snapshot ---
+
+    def load(self):
+        """Build the snapshot from DynamoDB (or the saved copy) and replay the journal"""
+        try:
+            items = self._download()
+            print(f"[INFO] Offline snapshot: {len(items)} students downloaded")
+        except (BotoCoreError, ClientError) as e:
+            if not os.path.exists(self.snapshot_path):
+                raise RuntimeError(f"No connection and no saved snapshot ({self.snapshot_path}): {e}")
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            items = snapshot['students']
+            print(f"[INFO] No connection, using the snapshot saved at {snapshot['saved_at']}")
+        self._rebuild(items)
+
+    def _rebuild(self, items):
+        self.students.clear()
+        for item in items:
+            student = Student.from_item(item)
+            self.students[student.idn] = student
+        self._lowest_idn = 0
+
+        entries = self.journal.entries()
+        for entry in entries:
+            self._replay(entry)
+        self._sorted_idns = None
+        if entries:
+            print(f"[INFO] {len(entries)} pending offline change(s) applied")
+
+    def _download(self):
+        items = []
+        response = self.probe_table.query(KeyConditionExpression=self.partition())
+        items.extend(response['Items'])
+        while 'LastEvaluatedKey' in response:
+            response = self.probe_table.query(KeyConditionExpression=self.partition(),
+                                              ExclusiveStartKey=response['LastEvaluatedKey'])
+            items.extend(response['Items'])
+        items = [Student.from_item(item).to_item() for item in items]  # Decimal -> int for JSON
+        self._save_snapshot(items)
+        return items
+
+    def _save_snapshot(self, items):
+        tmp_file = self.snapshot_path + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': datetime.now().isoformat(), 'students': items}, f, separators=(',', ':'))
+        os.replace(tmp_file, self.snapshot_path)
+
+    def _replay(self, entry):
+        """Apply one journal entry to the snapshot"""
+        idn = entry['idn']
+        self._lowest_idn = min(self._lowest_idn, idn)  # Never reuse a provisional IDN, even a deleted one
+        if entry['op'] == 'delete':
+            self.students.pop(idn, None)
+        elif entry['op'] == 'put':
+            self.students[idn] = Student.from_item(entry['student'])
+        elif idn in self.students:
+            item = {**self.students[idn].to_item(), **entry['changes'], 'updated_at': entry['at']}
+            self.students[idn] = Student.from_item(item).apply_status()
+        self._sorted_idns = None
+
+    def _record(self, op, idn, **fields):
+        """Journal one write (based on the current snapshot record) and apply it"""
+        current = self.students.get(idn)
+        entry = {'op': op, 'idn': idn, 'base': current.updated_at if current else None,
+                 'at': datetime.now(self.timezone).isoformat(), **fields}
+        self.journal.append(entry)
+        self._replay(entry)
+
+    @property
+    def pending(self):
+        """Number of journal entries not yet synced"""
+        return len(self.journal)
+
+    # --- Reads served from the snapshot ---
+
+    def get_all_students(self, fields=None):
+        return list(self.students.values())
+
+    def iter_students(self, fields=None, filter=None, page_size=None):
+        if self._sorted_idns is None:
+            self._sorted_idns = sorted(self.students)
+        idns = self._sorted_idns
+        students = (self.students[idn] for idn in idns if idn in self.students)
+        return students if filter is None else (student for student in students if matches(filter, student))
+
+    def get_student(self, idn, fields=None):
+        return self.students.get(idn)
+
+    def scan_page(self, limit, start_key=None, fields=None):
+        if self._sorted_idns is None:
+            self._sorted_idns = sorted(self.students)
+        start = bisect_right(self._sorted_idns, start_key['idn']) if start_key else 0
+        idns = self._sorted_idns[start:start + limit]
+        last_key = {'idn': idns[-1]} if start + limit < len(self._sorted_idns) else None
+        return [self.students[idn] for idn in idns], last_key
+
+    def get_students_by_idns(self, idns, fields=None, executor=None):
+        return [self.students[idn] for idn in idns if idn in self.students]
+
+    def search_by_name(self, name):
+        return [student for student in self.students.values() if name in (student.nama or '')]
+
+    def get_next_idn(self):
+        return self.reserve_idns(1)
+
+    def reserve_idns(self, count):
+        # Provisional: below every IDN used so far, replaced by sync() with IDNs from the sequence
+        self._lowest_idn -= count
+        return self._lowest_idn
+
+    def recount_total(self):
+        count = len(self.students)
+        print(f"\nTotal Students: {count} (offline snapshot)")
+        return count
+
+    def iter_graduated(self, from_year=None, to_year=None):
+        return iter(self.get_graduated(from_year, to_year))
+
+    def get_graduated(self, from_year=None, to_year=None):
+        students = [student for student in self.students.values() if student.status == 'graduated'
+                    and (from_year or 0) <= (student.graduation_year or 0) <= (to_year or 9999)]
+        students.sort(key=lambda student: (student.graduation_year or 0, student.idn))
+        return students
+
+    # --- Writes go to the journal ---
+
+    def add_student(self, student):
+        if student.idn is None:
+            student.idn = self.get_next_idn()
+        self._record('put', student.idn, student=self.stamp(student).to_item())
+        return student
+
+    def delete_student(self, idn):
+        self._record('delete', idn)
+
+    def update_fields(self, student, changes):
+        current = self.students.get(student.idn)
+        if current is None or current.updated_at != student.updated_at:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException',
+                                         'Message': 'The student changed in this session'}}, 'UpdateItem')
+        self._record('update', student.idn, changes=changes)
+        return self.students[student.idn]
+
+    def put_students(self, students, executor=None):
+        students = list(students)
+        for student in students:
+            self._record('put', student.idn, student=self.stamp(student).to_item())
+        return len(students), []
+
+    def insert_students(self, students, executor=None):
+        students = list(students)
+        first_idn = self.reserve_idns(len(students)) if students else 0
+        for offset, student in enumerate(students):
+            student.idn = first_idn + offset
+            self._record('put', student.idn, student=self.stamp(student).to_item())
+        return students, [], []
+
+    def delete_students(self, idns, executor=None):
+        idns = list(idns)
+        for idn in idns:
+            self._record('delete', idn)
+        return len(idns), []
+
+    def update_students(self, students, changes, executor=None):
+        updated = []
+        failures = []
+        for student in students:
+            try:
+                updated.append(self.update_fields(student, changes))
+            except ClientError as e:
+                failures.append((student, e))
+        return updated, failures
+
+    # --- Sync ---
+
+    def sync(self, conflicts_path=None):
+        """Push the journal to DynamoDB in coalesced batch writes
+
+        Edits are merged into one write per IDN. Before writing, the current
+        records are read with BatchGetItem; an IDN whose updated_at no
+        longer matches the one the offline edits started from (or that was
+        deleted) is a conflict: it is skipped and saved to conflicts_path
+        for review. Students added offline go through the inserter, which
+        gives them IDNs from the university's sequence in place of their
+        provisional negative ones and reserves their names; an add whose
+        name already belongs to a student is a conflict too.
+        BatchWriteItem has no conditions, so a write landing between the
+        check and the batch can still be overwritten.
+        Entries that fail to write stay in the journal.
+        """
+        entries = self.journal.entries()
+        if not entries:
+            print("\n[INFO] No offline changes to sync")
+            return True
+
+        plan = coalesce(entries)
+        print(f"\nSyncing {len(entries)} journal entries as {len(plan)} write(s)...")
+
+        adds = [idn for idn, action in plan.items() if action['op'] == 'put' and action['base'] is None]
+        try:
+            current = {student.idn: student for student in
+                       StudentManager.get_students_by_idns(self, [idn for idn in plan if idn not in adds])}
+        except (BotoCoreError, ClientError) as e:
+            print(f"[ERROR] Could not reach DynamoDB, nothing synced: {e}")
+            return False
+
+        now = datetime.now(self.timezone).isoformat()
+        requests = {}  # idn written -> BatchWriteItem request
+        sources = {}  # idn written -> journal idn
+        conflicts = []
+        renumbered = {}
+        deleted = 0
+
+        for idn, action in plan.items():
+            if action['op'] == 'put' and action['base'] is None:
+                continue  # Added offline, inserted below
+            server = current.get(idn)
+
+            if server is None:
+                if action['op'] != 'delete':  # A delete of a deleted student is already done
+                    conflicts.append({'idn': idn, 'reason': 'deleted on the server', 'local': action})
+                continue
+
+            if server.updated_at != action['base']:
+                conflicts.append({'idn': idn, 'reason': 'changed on the server',
+                                  'server': server.to_item(), 'local': action})
+                continue
+
+            if action['op'] == 'delete':
+                requests[idn] = {'DeleteRequest': {'Key': self.key(idn)}}
+                deleted += 1
+            else:
+                stored = action['student'] if action['op'] == 'put' else {**server.to_item(), **action['changes']}
+                student = Student.from_item({**stored, 'idn': idn, 'updated_at': now,
+                                             'version': (server.version or 0) + 1})
+                requests[idn] = {'PutRequest': {'Item': self.stamp(student).to_item()}}
+            sources[idn] = idn
+
+        executor = AdaptiveExecutor()
+        # Adds are written together with their name reservations, so they are not batched
+        add_students = [Student.from_item({**plan[idn]['student'], 'version': 1}) for idn in adds]
+        journal_idns = {id(student): idn for student, idn in zip(add_students, adds)}
+        try:
+            inserted, taken, add_failures = StudentManager.insert_students(self, add_students, executor)
+        except (BotoCoreError, ClientError) as e:  # The IDN block could not be reserved
+            print(f"[ERROR] Could not reserve IDNs for the offline adds: {e}")
+            inserted, taken, add_failures = [], [], [(student, e) for student in add_students]
+
+        for student in inserted:
+            renumbered[journal_idns[id(student)]] = student.idn
+        for student, owner_idn in taken:
+            idn = journal_idns[id(student)]
+            conflicts.append({'idn': idn, 'reason': f"name already belongs to IDN {owner_idn}", 'local': plan[idn]})
+
+        failed = executor.batch_write(self.bulk_client, self.table.name, list(requests.values()))
+        failed_idns = {sources[request_idn(request)] for request in failed}
+        failed_idns.update(journal_idns[id(student)] for student, e in add_failures)
+
+        # The maintained total only counts what was written
+        added = len(inserted)
+        deleted -= sum(1 for idn in failed_idns if plan[idn]['op'] == 'delete')
+        if added - deleted:
+            self.remote_counter.add(added - deleted)
+
+        if conflicts:
+            conflicts_path = conflicts_path or f"offline_conflicts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            with open(conflicts_path, 'w', encoding='utf-8') as f:
+                for conflict in conflicts:
+                    f.write(json.dumps(conflict, separators=(',', ':')) + '\n')
+
+        self.journal.rewrite([entry for entry in entries if entry['idn'] in failed_idns])
+
+        written = len(requests) - len(failed) + len(inserted)
+        print(f"[SUCCESS] Wrote {written} of {len(requests) + len(adds)} change(s) "
+              f"({len(entries)} journal entries)")
+        for old, new in renumbered.items():
+            print(f"[INFO] Student added offline as IDN {old} is IDN {new}")
+        if conflicts:
+            print(f"[CONFLICT] {len(conflicts)} student(s) changed on the server since the snapshot or "
+                  f"have a name already in use, their offline edits were NOT applied (see {conflicts_path}):")
+            for conflict in conflicts[:20]:
+                print(f"  IDN {conflict['idn']}: {conflict['reason']}")
+        if failed_idns:
+            print(f"[ERROR] {len(failed_idns)} change(s) could not be written and stay in the journal")
+
+        try:
+            self._rebuild(self._download())  # Fresh snapshot with whatever is still pending
+        except (BotoCoreError, ClientError) as e:
+            print(f"[WARNING] Could not refresh the snapshot, showing the local state: {e}")
+        return not failed_idns and not conflicts
+
+
+# boto3 condition operators evaluated against snapshot records
+COMPARISONS = {
+    '=': lambda value, other: value == other,
+    '<>': lambda value, other: value != other,
+    '<': lambda value, other: value is not None and value < other,
+    '<=': lambda value, other: value is not None and value <= other,
+    '>': lambda value, other: value is not None and value > other,
+    '>=': lambda value, other: value is not None and value >= other,
+    'begins_with': lambda value, other: isinstance(value, str) and value.startswith(other),
+    'contains': lambda value, other: value is not None and other in value,
+}
+
+
+def matches(condition, student):
+    """Evaluate a boto3 Attr condition (a FilterExpression) against a snapshot record"""
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+
+    if operator == 'AND':
+        return all(matches(value, student) for value in values)
+    if operator == 'OR':
+        return any(matches(value, student) for value in values)
+    if operator == 'NOT':
+        return not matches(values[0], student)
+
+    value = student.get(values[0].name)
+    if operator == 'attribute_exists':
+        return value is not None
+    if operator == 'attribute_not_exists':
+        return value is None
+    if operator == 'IN':
+        return value in values[1]
+    if operator == 'BETWEEN':
+        return value is not None and values[1] <= value <= values[2]
+    if operator in COMPARISONS:
+        return COMPARISONS[operator](value, values[1])
+    raise ValueError(f"Filter operator {operator} is not supported offline")
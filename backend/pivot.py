@@ -0,0 +1,123 @@
+"""
+PivotTable - Multi-dimensional group-by counts over student records
+"""
+
+from array import array
+from collections import Counter
+
+
+class PivotTable:
+    """Counts students for every combination of the group-by fields
+
+    The records are read once: each field value is dictionary-encoded to a
+    small integer code per column. Counting then runs over the integer
+    columns into a flat array indexed by the mixed-radix combination of
+    codes (a sparse Counter is used instead when the cube would be huge).
+    Any subset of the fields (a rollup) is derived from the cube without
+    touching the records again.
+    """
+
+    MISSING = 'Not specified'
+    DENSE_LIMIT = 1_000_000  # Max cells for the array-backed cube
+
+    def __init__(self, fields, students):
+        self.fields = tuple(fields)
+        self.values = [[] for _ in self.fields]  # per field: code -> value
+        self.total = 0
+
+        columns = self._encode(students)
+        self.shape = tuple(len(values) for values in self.values)
+        self._strides = self._compute_strides(self.shape)
+        self._counts = self._count(columns)
+
+    def _encode(self, students):
+        """Single pass over the records: dictionary-encode each field"""
+        encoders = [{} for _ in self.fields]
+        columns = [array('I') for _ in self.fields]
+
+        for student in students:
+            self.total += 1
+            for field, encoder, values, column in zip(self.fields, encoders, self.values, columns):
+                value = student.get(field, self.MISSING)
+                code = encoder.get(value)
+                if code is None:
+                    code = encoder[value] = len(values)
+                    values.append(value)
+                column.append(code)
+
+        return columns
+
+    @staticmethod
+    def _compute_strides(shape):
+        strides = []
+        stride = 1
+        for size in reversed(shape):
+            strides.append(stride)
+            stride *= size
+        return tuple(reversed(strides))
+
+    def _count(self, columns):
+        cells = 1
+        for size in self.shape:
+            cells *= size
+
+        counts = array('Q', bytes(8 * cells)) if cells <= self.DENSE_LIMIT else Counter()
+
+        if len(columns) == 1:
+            for code in columns[0]:
+                counts[code] += 1
+            return counts
+
+        for codes in zip(*columns):
+            index = 0
+            for code, stride in zip(codes, self._strides):
+                index += code * stride
+            counts[index] += 1
+        return counts
+
+    def cells(self):
+        """Yield (values_tuple, count) for every non-empty combination"""
+        if isinstance(self._counts, Counter):
+            items = self._counts.items()
+        else:
+            items = ((index, count) for index, count in enumerate(self._counts) if count)
+
+        for index, count in items:
+            key = []
+            for values, stride, size in zip(self.values, self._strides, self.shape):
+                key.append(values[(index // stride) % size])
+            yield tuple(key), count
+
+    def rollup(self, fields):
+        """Counts for a subset of the fields, summed from the cube: {values_tuple: count}"""
+        positions = [self.fields.index(field) for field in fields]
+        totals = Counter()
+        for key, count in self.cells():
+            totals[tuple(key[i] for i in positions)] += count
+        return dict(totals)
+
+    def rows(self):
+        """Non-empty cells sorted by count (descending), then values"""
+        return sorted(self.cells(), key=lambda cell: (-cell[1], [str(v) for v in cell[0]]))
+
+    def print_table(self, labels=None):
+        """Print the crosstab with a subtotal per value of each field"""
+        labels = labels or self.fields
+        widths = [max([len(str(label))] + [len(str(v)) for v in values]) + 2
+                  for label, values in zip(labels, self.values)]
+        line_width = sum(widths) + 8
+
+        print(f"\n=== STUDENTS BY {' x '.join(label.upper() for label in labels)} ===")
+        print("".join(f"{label:<{width}}" for label, width in zip(labels, widths)) + "COUNT")
+        print("="*line_width)
+        for key, count in self.rows():
+            print("".join(f"{str(value):<{width}}" for value, width in zip(key, widths)) + str(count))
+        print("="*line_width)
+
+        if len(self.fields) > 1:
+            for field, label in zip(self.fields, labels):
+                subtotals = sorted(self.rollup([field]).items(), key=lambda x: x[1], reverse=True)
+                print(f"{label}: " + ", ".join(f"{key[0]} ({count})" for key, count in subtotals))
+
+        print(f"\nTotal students: {self.total} | Non-empty groups: {sum(1 for _ in self.cells())}")
+
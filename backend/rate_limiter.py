@@ -0,0 +1,143 @@
+"""
+RateLimiter - Token-bucket admission control per client IP, university and route
+"""
+
+import math
+import threading
+import time
+from functools import wraps
+from botocore.exceptions import ClientError
+from flask import g, jsonify, request
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process (one warm container)"""
+
+    def __init__(self, max_keys=10000):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def consume(self, key, capacity, refill_rate, now):
+        """Take one token; returns (allowed, retry_after_seconds)"""
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / refill_rate
+
+            if len(self._buckets) > self.max_keys:
+                self._prune(capacity, refill_rate, now)
+
+        return allowed, retry_after
+
+    def _prune(self, capacity, refill_rate, now):
+        """Forget buckets that have refilled completely (same as a new client)"""
+        full_after = capacity / refill_rate
+        for key in [k for k, (_, updated) in self._buckets.items() if now - updated >= full_after]:
+            del self._buckets[key]
+
+
+class DynamoDBBucketStore:
+    """Token buckets shared across containers through a DynamoDB table
+
+    The table needs a string partition key named 'bucket'; 'expires_at'
+    can be enabled as its TTL attribute so idle buckets are cleaned up.
+    Buckets are updated with optimistic concurrency on 'updated_at'.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, table):
+        self.table = table
+
+    def consume(self, key, capacity, refill_rate, now):
+        """Take one token; returns (allowed, retry_after_seconds)"""
+        for _ in range(self.MAX_ATTEMPTS):
+            response = self.table.get_item(Key={'bucket': key}, ConsistentRead=True)
+            item = response.get('Item')
+
+            if item:
+                previous = item['updated_at']
+                tokens = min(capacity, float(item['tokens']) + (now - float(previous)) * refill_rate)
+            else:
+                previous = None
+                tokens = capacity
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            condition = 'attribute_not_exists(updated_at)' if previous is None else 'updated_at = :prev'
+            values = {} if previous is None else {':prev': previous}
+
+            try:
+                self.table.put_item(
+                    Item={
+                        'bucket': key,
+                        'tokens': str(tokens),
+                        'updated_at': str(now),
+                        'expires_at': int(now + capacity / refill_rate)
+                    },
+                    ConditionExpression=condition,
+                    **({'ExpressionAttributeValues': values} if values else {})
+                )
+                return allowed, 0 if allowed else (1 - tokens) / refill_rate
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+
+        # Heavy contention on one bucket means the client is hammering us
+        return False, 1 / refill_rate
+
+
+class RateLimiter:
+    """Applies token-bucket limits per client IP, university and route"""
+
+    def __init__(self, limits, store=None, enabled=True):
+        self.limits = limits  # {cost_class: (capacity, refill_per_second)}
+        self.store = store or MemoryBucketStore()
+        self.enabled = enabled
+
+    def limit(self, cost_class):
+        """Decorator for a Flask view using the limit configured for cost_class"""
+        capacity, refill_rate = self.limits[cost_class]
+
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                # Keyed on the view, not request.endpoint: the blueprint is also
+                # mounted under /u/<university_id>, and both mounts must share one
+                # bucket per university. remote_addr is set by the platform (API
+                # Gateway source IP), unlike X-Forwarded-For which the client can forge
+                tenant = getattr(g, 'tenant', None)
+                university_id = tenant.university_id if tenant is not None else '-'
+                key = f"{cost_class}:{view.__name__}:{university_id}:{request.remote_addr}"
+
+                try:
+                    allowed, retry_after = self.store.consume(key, capacity, refill_rate, time.time())
+                except ClientError as e:
+                    # Fail open: a limiter outage must not take the API down
+                    print(f"Rate limiter error: {e}")
+                    allowed, retry_after = True, 0
+
+                if not allowed:
+                    response = jsonify({
+                        'status': 'error',
+                        'message': 'Too many requests, please slow down'
+                    })
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                    return response
+
+                return view(*args, **kwargs)
+            return wrapped
+        return decorator
@@ -0,0 +1,194 @@
+"""
+Student - Compact student record shared by the API and the CLI modules
+"""
+
+import re
+import sys
+from decimal import Decimal
+
+# Year values of students still enrolled; anything else is a graduation semester
+CURRENT_YEARS = ('Freshman', 'Sophomore', 'Junior', 'Senior', '')
+
+# Partition key suffix of the sparse graduated-index (only graduated rows carry it)
+GRADUATED_KEY = 'graduated'
+
+
+class Student:
+    """Student record built once from a DynamoDB item
+
+    DynamoDB returns numbers as Decimal and every attribute as a separate
+    dict entry. Converting once here (idn to int, repeated values interned)
+    keeps every consumer free of per-row conversions and uses __slots__
+    instead of a per-record dict.
+    """
+
+    # version is incremented by every write; edits are conditioned on it.
+    # university_id (partition key) + idn (sort key) identify a student.
+    FIELDS = ('idn', 'nama', 'jurusan', 'university', 'year', 'provinsi',
+              'created_at', 'updated_at', 'status', 'graduation_year', 'version',
+              'university_id', 'alumni_pk')
+
+    # Returned by the API and exported; responses are already scoped to one
+    # university, and alumni_pk only exists for the index
+    PUBLIC_FIELDS = FIELDS[:-2]
+
+    # Low-cardinality values repeated across many records
+    INTERNED_FIELDS = ('jurusan', 'university', 'year', 'provinsi', 'status', 'university_id')
+
+    __slots__ = FIELDS
+
+    def __init__(self, idn, nama=None, jurusan=None, university=None, year=None,
+                 provinsi=None, created_at=None, updated_at=None, status=None,
+                 graduation_year=None, version=None, university_id=None, alumni_pk=None):
+        self.idn = idn
+        self.nama = nama
+        self.jurusan = jurusan
+        self.university = university
+        self.year = year
+        self.provinsi = provinsi
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.status = status
+        self.graduation_year = graduation_year
+        self.version = version
+        self.university_id = university_id
+        self.alumni_pk = alumni_pk
+
+    @classmethod
+    def from_item(cls, item):
+        """Build a Student from a DynamoDB item (the single conversion pass)"""
+        student = cls(int(item['idn']))
+        for field in cls.FIELDS[1:]:
+            value = item.get(field)
+            if isinstance(value, Decimal):
+                value = int(value)
+            elif value is not None and field in cls.INTERNED_FIELDS:
+                value = sys.intern(value)
+            setattr(student, field, value)
+        return student
+
+    def apply_status(self):
+        """Derive status, graduation_year and the alumni index key from year"""
+        self.status, self.graduation_year = derive_status(self.year)
+        self.alumni_pk = graduated_key(self.university_id) if self.status == 'graduated' else None
+        return self
+
+    def get(self, field, default=None):
+        """dict.get-style access, returns default for missing attributes"""
+        value = getattr(self, field, None)
+        return default if value is None else value
+
+    def to_item(self):
+        """Convert to a DynamoDB item, leaving out missing attributes"""
+        return {field: getattr(self, field) for field in self.FIELDS
+                if getattr(self, field) is not None}
+
+    def to_dict(self, fields=None):
+        """Convert to a JSON-serializable dict (stored attributes minus index keys)
+
+        fields limits the output to those public attributes.
+        """
+        return {field: getattr(self, field) for field in fields or self.PUBLIC_FIELDS
+                if getattr(self, field) is not None}
+
+    def __eq__(self, other):
+        if not isinstance(other, Student):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+
+    def __repr__(self):
+        return f"Student(idn={self.idn!r}, nama={self.nama!r})"
+
+
+def normalize_submission(data):
+    """Clean submitted student fields the way the API stores them
+
+    Names, majors and provinces are auto-formatted to Title Case
+    (victor tabuni -> Victor Tabuni); university and year are only stripped.
+    """
+    return {
+        'nama': (data.get('nama') or '').strip().title(),
+        'jurusan': (data.get('jurusan') or '').strip().title(),
+        'university': (data.get('university') or '').strip(),
+        'year': (data.get('year') or '').strip(),
+        'provinsi': (data.get('provinsi') or '').strip().title()
+    }
+
+
+def derive_status(year):
+    """Return (status, graduation_year) for a year value
+
+    'Freshman'..'Senior' (or empty) are current students; any other value is
+    a graduation semester such as 'Spring 2024'. graduation_year is the
+    4-digit year found in it (0 if none), or None for current students.
+    """
+    year = (year or '').strip()
+    if year in CURRENT_YEARS:
+        return 'current', None
+
+    match = re.search(r'\b(19|20)\d{2}\b', year)
+    return 'graduated', int(match.group()) if match else 0
+
+
+def graduated_key(university_id):
+    """graduated-index partition key of a university's graduated students"""
+    return f"{university_id}#{GRADUATED_KEY}"
+
+
+def status_update_args(year, university_id):
+    """UpdateExpression parts that keep the derived status attributes in sync with year
+
+    Returns (set_clauses, remove_clauses, values) to merge into an update_item
+    call; the clauses use the alias #st for 'status' (a DynamoDB reserved word).
+    """
+    status, graduation_year = derive_status(year)
+    if status == 'graduated':
+        return (['#st = :st', 'graduation_year = :gy', 'alumni_pk = :ak'], [],
+                {':st': status, ':gy': graduation_year, ':ak': graduated_key(university_id)})
+    return ['#st = :st'], ['graduation_year', 'alumni_pk'], {':st': status}
+
+
+def name_key(nama):
+    """Return the (first, last) lowercased name tokens used to match students
+
+    "Aprilia Mabel" and "Aprilia Weni Irjani Mabel" share the key
+    ('aprilia', 'mabel'). Single-word names have no key (None).
+    """
+    parts = (nama or '').strip().lower().split()
+    if len(parts) < 2:
+        return None
+    return (parts[0], parts[-1])
+
+
+def parse_fields(text):
+    """Parse a comma-separated fields= parameter into public fields in canonical order
+
+    Returns None for an empty value (all fields); idn is always included.
+    Raises ValueError naming any unknown field.
+    """
+    requested = {field.strip() for field in (text or '').split(',') if field.strip()}
+    if not requested:
+        return None
+    unknown = requested.difference(Student.PUBLIC_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    requested.add('idn')
+    return tuple(field for field in Student.PUBLIC_FIELDS if field in requested)
+
+
+def projection_args(fields):
+    """Build read kwargs that fetch only the given fields (idn is always included)
+
+    Every name goes through an ExpressionAttributeNames alias, so reserved
+    words such as 'year' need no special handling. Returns {} (whole item)
+    when fields is empty.
+    """
+    if not fields:
+        return {}
+
+    names = ['idn'] + [field for field in dict.fromkeys(fields) if field != 'idn']
+    aliases = {f'#f{i}': name for i, name in enumerate(names)}
+    return {
+        'ProjectionExpression': ', '.join(aliases),
+        'ExpressionAttributeNames': aliases
+    }
@@ -0,0 +1,290 @@
+"""
+StudentCache - Warm-container read-through cache of student records
+"""
+
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from student import name_key
+
+
+class SharedInvalidation:
+    """Write notifications shared by forked worker processes
+
+    Create it in the parent before forking (e.g. gunicorn with preload):
+    the generation counter and a ring of the last written IDNs live in
+    shared memory. Each worker's StudentCache compares the generation with
+    the last one it saw and reloads only the IDNs written since; if it fell
+    more than slots writes behind, it drops everything instead.
+    """
+
+    def __init__(self, slots=256):
+        self.slots = slots
+        self._generation = multiprocessing.Value('Q', 0)
+        self._idns = multiprocessing.Array('Q', slots, lock=False)  # Guarded by the generation lock
+
+    @property
+    def generation(self):
+        return self._generation.value
+
+    def publish(self, idn):
+        """Record a write to idn, returns the new generation"""
+        with self._generation.get_lock():
+            generation = self._generation.value
+            self._idns[generation % self.slots] = idn
+            self._generation.value = generation + 1
+            return generation + 1
+
+    def changes_since(self, seen):
+        """Return (generation, idns written after seen), idns is None when too far behind"""
+        with self._generation.get_lock():
+            generation = self._generation.value
+            if generation - seen > self.slots:
+                return generation, None
+            return generation, {self._idns[g % self.slots] for g in range(seen, generation)}
+
+
+class StudentCache:
+    """Bounded LRU cache of Student records with a TTL
+
+    Lookups by IDN go through load_one(idn) on a miss; the full list goes
+    through load_all(fields=None). When the whole table fits in max_size, the loaded
+    list is kept as a complete snapshot, so name lookups (and misses) are
+    answered from memory until the snapshot is ttl seconds old. Writes in
+    this container should call put() or invalidate() so their own
+    results are never stale; writes from other containers or the CLI
+    become visible after at most ttl seconds. Worker processes forked from
+    one parent can share a SharedInvalidation so each other's writes are
+    picked up on the next lookup.
+    """
+
+    def __init__(self, load_all, load_one, max_size=5000, ttl=30):
+        self.load_all = load_all
+        self.load_one = load_one
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._records = OrderedDict()  # idn -> (Student, expires_at), LRU order
+        self._by_name_key = {}  # (first, last) -> set of idns
+        self._by_name = {}  # lowercased full name -> set of idns
+        self._complete_until = 0  # Snapshot of the full table is valid until then
+        self._oversized = False  # The last full load did not fit in max_size
+        self._revision = 0  # Bumped on every change to the cached records
+        self._derived = {}  # build -> (revision, value) built from the snapshot by derived()
+        self._lock = threading.RLock()
+        self.invalidation = None  # Optional SharedInvalidation across processes
+        self._seen_generation = 0
+
+    def share_invalidation(self, invalidation):
+        """Pick up writes published by sibling processes through invalidation"""
+        with self._lock:
+            self.invalidation = invalidation
+            self._seen_generation = invalidation.generation
+
+    def get(self, idn):
+        """Return the student with this IDN (or None), loading it on a miss"""
+        self._sync()
+        with self._lock:
+            entry = self._records.get(idn)
+            if entry is not None and entry[1] > time.monotonic():
+                self._records.move_to_end(idn)
+                self.hits += 1
+                return entry[0]
+            if entry is None and self._snapshot_fresh():
+                self.hits += 1
+                return None
+            self.misses += 1
+
+        student = self.load_one(idn)
+        if student is not None:
+            self.put(student)
+        return student
+
+    def all_students(self, fields=None):
+        """Return every student, from the snapshot when it is fresh
+
+        fields is passed to load_all only when the table is known not to fit
+        in the cache (nothing could be cached anyway); otherwise the full
+        records are loaded so they can serve later requests.
+        """
+        return self._snapshot(fields)[0]
+
+    def derived(self, build, fields=None):
+        """Return build(students), rebuilt only when the cached snapshot changed
+
+        Meant for indexes over the whole table: while the snapshot is fresh
+        and no record changed, the last result of each build is reused. fields is passed
+        on as in all_students() when the table does not fit the cache.
+        """
+        self._sync()
+        with self._lock:
+            entry = self._derived.get(build)
+            if entry is not None and self._snapshot_fresh() and entry[0] == self._revision:
+                self.hits += 1
+                return entry[1]
+
+        students, revision = self._snapshot(fields)
+        value = build(students)
+        if revision is not None:
+            with self._lock:
+                self._derived[build] = (revision, value)
+        return value
+
+    def _snapshot(self, fields=None):
+        """Return (students, revision); revision is None if they are not the cached snapshot"""
+        self._sync()
+        with self._lock:
+            if self._snapshot_fresh():
+                self.hits += 1
+                return [student for student, _ in self._records.values()], self._revision
+            self.misses += 1
+            oversized = self._oversized
+
+        if fields and oversized:
+            return self.load_all(fields), None
+
+        students = self.load_all()
+        return students, self.replace_all(students)
+
+    def replace_all(self, students):
+        """Replace the contents with a full list of students (kept as a snapshot if it fits)
+
+        Returns the snapshot revision, or None when the list did not fit.
+        """
+        with self._lock:
+            self._clear()
+            self._oversized = len(students) > self.max_size
+            if self._oversized:
+                return None
+            expires = time.monotonic() + self.ttl
+            for student in students:
+                self._store(student, expires)
+            self._complete_until = expires
+            return self._revision
+
+    def find_by_name(self, nama):
+        """Find a student by firstName + lastName match, then exact name match"""
+        students = self.all_students()
+
+        with self._lock:
+            if self._snapshot_fresh():
+                key = name_key(nama)
+                idns = self._by_name_key.get(key) if key else None
+                if not idns:
+                    idns = self._by_name.get(nama.lower())
+                return self._records[min(idns)][0] if idns else None
+
+        # Table larger than the cache: search the list we just loaded
+        key = name_key(nama)
+        if key:
+            for student in students:
+                if name_key(student.nama) == key:
+                    return student
+        for student in students:
+            if (student.nama or '').lower() == nama.lower():
+                return student
+        return None
+
+    def put(self, student):
+        """Add or replace a record (e.g. right after this container wrote it)"""
+        with self._lock:
+            self._put(student)
+        self._publish(student.idn)
+
+    def invalidate(self, idn=None):
+        """Drop one record, or everything when idn is None"""
+        with self._lock:
+            if idn is None:
+                self._clear()
+            elif idn in self._records:
+                self._remove(idn)
+        if idn is not None:
+            self._publish(idn)
+
+    def _put(self, student):
+        self._store(student, time.monotonic() + self.ttl)
+        while len(self._records) > self.max_size:
+            idn, _ = next(iter(self._records.items()))
+            self._remove(idn)
+            self._complete_until = 0
+
+    def _publish(self, idn):
+        if self.invalidation is None:
+            return
+        generation = self.invalidation.publish(idn)
+        with self._lock:
+            # Skip our own write only if nothing else was published before it
+            if generation == self._seen_generation + 1:
+                self._seen_generation = generation
+
+    def _sync(self):
+        """Reload records written by sibling processes since the last lookup"""
+        if self.invalidation is None or self.invalidation.generation == self._seen_generation:
+            return
+
+        generation, idns = self.invalidation.changes_since(self._seen_generation)
+        if idns is None:
+            with self._lock:
+                self._clear()
+                self._seen_generation = generation
+            return
+
+        # Only records this cache knows about (or would answer for) need reloading
+        with self._lock:
+            tracked = self._snapshot_fresh()
+            idns = [idn for idn in idns if tracked or idn in self._records]
+        reloaded = [(idn, self.load_one(idn)) for idn in idns]
+
+        with self._lock:
+            for idn, student in reloaded:
+                if idn in self._records:
+                    self._remove(idn)
+                if student is not None:
+                    self._put(student)
+            self._seen_generation = max(self._seen_generation, generation)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'size': len(self._records),
+                'complete': self._snapshot_fresh(),
+                'ttl': self.ttl
+            }
+
+    def _snapshot_fresh(self):
+        return time.monotonic() < self._complete_until
+
+    def _store(self, student, expires):
+        self._revision += 1
+        if student.idn in self._records:
+            self._remove(student.idn)
+        self._records[student.idn] = (student, expires)
+        key = name_key(student.nama)
+        if key:
+            self._by_name_key.setdefault(key, set()).add(student.idn)
+        self._by_name.setdefault((student.nama or '').lower(), set()).add(student.idn)
+
+    def _remove(self, idn):
+        self._revision += 1
+        student, _ = self._records.pop(idn)
+        key = name_key(student.nama)
+        for index, index_key in ((self._by_name_key, key), (self._by_name, (student.nama or '').lower())):
+            idns = index.get(index_key)
+            if idns is not None:
+                idns.discard(idn)
+                if not idns:
+                    del index[index_key]
+
+    def _clear(self):
+        self._revision += 1
+        self._records.clear()
+        self._by_name_key.clear()
+        self._by_name.clear()
+        self._complete_until = 0
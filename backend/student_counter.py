@@ -0,0 +1,205 @@
+"""
+StudentCounter - Exact student total maintained on writes, served from a TTL cache
+IdnSequence - Per-university IDN allocation
+"""
+
+import time
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from tenant import UNIVERSITY_KEY
+
+
+class StudentCounter:
+    """Keeps the total number of one university's students in the meta table
+
+    Writes adjust the counter atomically, so reading the total is a single
+    get_item instead of a COUNT query. Reads are cached per container for
+    ttl seconds. The counter is seeded by recount(), which the migrations,
+    the restore and the CLI's "Recount total students" run; reading never
+    counts the partition itself. When the counter cannot be read or has
+    not been seeded, the last known total is returned (0 if there is none)
+    and source says so.
+    """
+
+    TOTAL_KEY = 'student_total'
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, meta_table, students_table, university_id, ttl=60):
+        self.meta_table = meta_table
+        self.students_table = students_table
+        self.university_id = university_id
+        self.key = {'meta_key': total_key(university_id)}
+        self.ttl = ttl
+        self.source = None  # 'exact', 'stale' (read failed) or 'unseeded'
+        self._total = None
+        self._expires = 0
+
+    def get_total(self, refresh=False):
+        """Return the student total, from cache when fresh"""
+        if not refresh and self._total is not None and time.monotonic() < self._expires:
+            return self._total
+
+        try:
+            item = self._read_exact()
+        except ClientError as e:
+            print(f"[ERROR] Could not read student total: {e}")
+            self.source = 'stale'
+            return self._total or 0
+
+        if item is None:
+            if self.source != 'unseeded':
+                print(f"[WARNING] Student total of {self.university_id} is not seeded, "
+                      f"run 'Recount total students'")
+            self.source = 'unseeded'
+            return self._total or 0
+
+        total = int(item['value'])
+        self.source = 'exact'
+        self._cache(total)
+        return total
+
+    def add(self, delta):
+        """Adjust the total after students were added (+) or deleted (-)"""
+        try:
+            self.meta_table.update_item(
+                Key=self.key,
+                # version tells a running recount that the total moved under it
+                UpdateExpression='ADD #v :d, version :one',
+                # Never create the counter from a delta; it must be seeded by recount
+                ConditionExpression='attribute_exists(meta_key)',
+                ExpressionAttributeNames={'#v': 'value'},
+                ExpressionAttributeValues={':d': delta, ':one': 1}
+            )
+            if self._total is not None:
+                self._total += delta
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"[ERROR] Could not update student total: {e}")
+            self._expires = 0
+
+    def recount(self):
+        """Count the university's students with a paginated COUNT query and reseed the counter
+
+        The seed is conditioned on the counter being unchanged since the
+        count started (no row, or the same version), so an add() landing
+        during the count is never overwritten; the count is then repeated.
+        """
+        query_args = {'KeyConditionExpression': Key(UNIVERSITY_KEY).eq(self.university_id), 'Select': 'COUNT'}
+
+        for _ in range(self.MAX_ATTEMPTS):
+            item = self._read_exact()
+            response = self.students_table.query(**query_args)
+            total = response['Count']
+
+            while 'LastEvaluatedKey' in response:
+                response = self.students_table.query(ExclusiveStartKey=response['LastEvaluatedKey'], **query_args)
+                total += response['Count']
+
+            version = int(item.get('version', 0)) if item else 0
+            if item is None:
+                condition = {'ConditionExpression': 'attribute_not_exists(meta_key)'}
+            elif version:
+                condition = {'ConditionExpression': 'version = :v', 'ExpressionAttributeValues': {':v': version}}
+            else:
+                condition = {'ConditionExpression': 'attribute_exists(meta_key) AND attribute_not_exists(version)'}
+
+            try:
+                self.meta_table.put_item(Item={**self.key, 'value': total, 'version': version + 1}, **condition)
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                continue
+
+            self.source = 'exact'
+            self._cache(total)
+            return total
+
+        raise RuntimeError(f"Student total of {self.university_id} kept changing during the recount")
+
+    def _read_exact(self):
+        """The counter item, or None when it has never been seeded; raises ClientError when the read fails"""
+        return self.meta_table.get_item(Key=self.key, ConsistentRead=True).get('Item')
+
+    def _cache(self, total):
+        self._total = total
+        self._expires = time.monotonic() + self.ttl
+
+
+class IdnSequence:
+    """Hands out IDNs for one university from a counter in the meta table
+
+    Each call is one atomic ADD, so concurrent writers never get the same
+    IDN. An unseeded sequence starts after the highest IDN stored for the
+    university, found with a single descending Query (idn is the sort key).
+    """
+
+    SEQUENCE_KEY = 'idn_sequence'
+
+    def __init__(self, meta_table, students_table, university_id):
+        self.meta_table = meta_table
+        self.students_table = students_table
+        self.university_id = university_id
+        self.key = {'meta_key': sequence_key(university_id)}
+
+    def reserve(self, count=1):
+        """Reserve count consecutive IDNs and return the first"""
+        for _ in range(2):
+            try:
+                response = self.meta_table.update_item(
+                    Key=self.key,
+                    UpdateExpression='ADD #v :n',
+                    ConditionExpression='attribute_exists(meta_key)',
+                    ExpressionAttributeNames={'#v': 'value'},
+                    ExpressionAttributeValues={':n': count},
+                    ReturnValues='UPDATED_NEW'
+                )
+                return int(response['Attributes']['value']) - count + 1
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                self.seed()
+        raise RuntimeError(f"IDN sequence for {self.university_id} could not be seeded")
+
+    def seed(self, value=None):
+        """Start the sequence at value (default: the highest stored IDN), unless already seeded"""
+        if value is None:
+            value = self.highest_stored()
+
+        try:
+            self.meta_table.put_item(Item={**self.key, 'value': value},
+                                     ConditionExpression='attribute_not_exists(meta_key)')
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+    def highest_stored(self):
+        """Highest IDN stored for the university (0 when it has none), one descending Query"""
+        response = self.students_table.query(
+            KeyConditionExpression=Key(UNIVERSITY_KEY).eq(self.university_id),
+            ProjectionExpression='idn',
+            ScanIndexForward=False,
+            Limit=1
+        )
+        return int(response['Items'][0]['idn']) if response['Items'] else 0
+
+    def advance(self, value):
+        """Move the sequence up to value; never moves it back, so used IDNs are not handed out again"""
+        try:
+            self.meta_table.update_item(
+                Key=self.key,
+                UpdateExpression='SET #v = :m',
+                ConditionExpression='attribute_not_exists(meta_key) OR #v < :m',
+                ExpressionAttributeNames={'#v': 'value'},
+                ExpressionAttributeValues={':m': value}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+
+def total_key(university_id):
+    return f"{StudentCounter.TOTAL_KEY}#{university_id}"
+
+
+def sequence_key(university_id):
+    return f"{IdnSequence.SEQUENCE_KEY}#{university_id}"
@@ -4,6 +4,8 @@ StudentEditor - Handles student data editing operations
 
 from botocore.exceptions import ClientError
 from datetime import datetime
+from student import Student
+from student_inserter import NameTaken
 
 
 class StudentEditor:
@@ -28,22 +30,14 @@ class StudentEditor:
             provinsi = input("Province: ").strip().title()
 
             try:
-                new_idn = self.manager.get_next_idn()
-
-                self.manager.table.put_item(
-                    Item={
-                        'idn': new_idn,
-                        'nama': nama,
-                        'jurusan': jurusan,
-                        'university': university,
-                        'year': year,
-                        'provinsi': provinsi,
-                        'created_at': datetime.now(self.manager.timezone).isoformat(),
-                        'updated_at': datetime.now(self.manager.timezone).isoformat()
-                    }
-                )
-
-                print(f"\n[SUCCESS] Added student: {nama} (IDN: {new_idn})")
+                now = datetime.now(self.manager.timezone).isoformat()
+                student = Student(None, nama, jurusan, university, year, provinsi, now, now, version=1)
+
+                self.manager.add_student(student)
+
+                print(f"\n[SUCCESS] Added student: {nama} (IDN: {student.idn})")
+            except NameTaken as e:
+                print(f"[ERROR] {nama} already exists (IDN: {e.idn}); edit that student instead")
             except ClientError as e:
                 print(f"[ERROR] {e}")
 
@@ -70,14 +64,14 @@ class StudentEditor:
         """Edit single student"""
         try:
             idn = int(input("\nEnter student IDN: ").strip())
-            response = self.manager.table.get_item(Key={'idn': idn})
+            student = self.manager.get_student(idn)
 
-            if 'Item' not in response:
+            if student is None:
                 print(f"[ERROR] Student with IDN {idn} not found")
                 return
 
-            student = response['Item']
             self._display_student_info(student)
+            changes = {}
 
             while True:
                 print("\n=== SELECT FIELD TO EDIT ===")
@@ -110,19 +104,43 @@ class StudentEditor:
                     if new_value:
                         if field_key in ['nama', 'jurusan', 'provinsi']:
                             new_value = new_value.title()
-                        student[field_key] = new_value
+                        if new_value == student.get(field_key):
+                            changes.pop(field_key, None)
+                        else:
+                            changes[field_key] = new_value
                         print(f"[SUCCESS] {field_name} updated")
                 else:
                     print("[ERROR] Invalid option")
 
-            student['updated_at'] = datetime.now(self.manager.timezone).isoformat()
-            self.manager.table.put_item(Item=student)
-            print(f"\n[SUCCESS] Student {student['nama']} (IDN: {idn}) updated")
+            if not changes:
+                print("\n[INFO] No changes to save")
+                return
+
+            # Only the changed fields are sent, conditioned on the version read above
+            updated = self.manager.update_fields(student, changes)
+            print(f"\n[SUCCESS] Student {updated.nama} (IDN: {idn}) updated")
 
         except ValueError:
             print("[ERROR] IDN must be a number")
         except ClientError as e:
-            print(f"[ERROR] {e}")
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                self._report_conflict(idn, changes)
+            else:
+                print(f"[ERROR] {e}")
+
+    def _report_conflict(self, idn, changes):
+        """Tell the user their edit was not saved because the student changed meanwhile"""
+        print(f"\n[CONFLICT] Student IDN {idn} was changed or removed by someone else "
+              f"since it was loaded. Your changes were NOT saved.")
+        print("Your changes: " + ", ".join(f"{field} = {value}" for field, value in changes.items()))
+
+        current = self.manager.get_student(idn)
+        if current is None:
+            print("[INFO] The student no longer exists")
+        else:
+            print("\nCurrent record:")
+            self._display_student_info(current)
+            print("\nRe-open the student to apply your changes to the current version.")
 
     def _edit_batch(self):
         """Edit multiple students with same change"""
@@ -140,20 +158,8 @@ class StudentEditor:
             print("[ERROR] No IDNs provided")
             return
 
-        students_to_edit = []
         print(f"\n=== STUDENTS TO BE EDITED ({len(idns)}) ===")
-
-        for idn in idns:
-            try:
-                response = self.manager.table.get_item(Key={'idn': idn})
-                if 'Item' in response:
-                    student = response['Item']
-                    students_to_edit.append(student)
-                    print(f"IDN {idn}: {student.get('nama', 'N/A')}")
-                else:
-                    print(f"IDN {idn}: [NOT FOUND]")
-            except ClientError as e:
-                print(f"IDN {idn}: [ERROR] {e}")
+        students_to_edit = self._fetch_batch(idns)
 
         if not students_to_edit:
             print("[ERROR] No valid students found")
@@ -192,17 +198,20 @@ class StudentEditor:
                 confirm = input(f"\nUpdate {field_name} to '{new_value}' for {len(students_to_edit)} student(s)? (yes/no): ").strip().lower()
 
                 if confirm in ['yes', 'y']:
-                    updated_count = 0
-                    for student in students_to_edit:
-                        try:
-                            student[field_key] = new_value
-                            student['updated_at'] = datetime.now(self.manager.timezone).isoformat()
-                            self.manager.table.put_item(Item=student)
-                            updated_count += 1
-                        except ClientError as e:
-                            print(f"[ERROR] Failed to update IDN {student['idn']}: {e}")
-
-                    print(f"\n[SUCCESS] Updated {updated_count}/{len(students_to_edit)} student(s)")
+                    # Versioned updates run in parallel under adaptive concurrency
+                    updated, failures = self.manager.update_students(students_to_edit, {field_key: new_value})
+
+                    for student, e in failures:
+                        if isinstance(e, ClientError) and e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                            print(f"[CONFLICT] IDN {student.idn} was changed by someone else, skipped")
+                        else:
+                            print(f"[ERROR] Failed to update IDN {student.idn}: {e}")
+
+                    # Later changes in this session apply to the stored versions
+                    by_idn = {student.idn: student for student in updated}
+                    students_to_edit = [by_idn.get(student.idn, student) for student in students_to_edit]
+
+                    print(f"\n[SUCCESS] Updated {len(updated)}/{len(students_to_edit)} student(s)")
             else:
                 print("[ERROR] Invalid option")
 
@@ -225,19 +234,18 @@ class StudentEditor:
         """Delete single student"""
         try:
             idn = int(input("\nEnter student IDN to delete: ").strip())
-            response = self.manager.table.get_item(Key={'idn': idn})
+            student = self.manager.get_student(idn)
 
-            if 'Item' not in response:
+            if student is None:
                 print(f"[ERROR] Student with IDN {idn} not found")
                 return
 
-            student = response['Item']
             self._display_student_info(student)
 
             confirm = input("\nAre you sure you want to delete? (yes/no): ").strip().lower()
 
             if confirm in ['yes', 'y']:
-                self.manager.table.delete_item(Key={'idn': idn})
+                self.manager.delete_student(idn)
                 print(f"[SUCCESS] Deleted student {student.get('nama', 'N/A')} (IDN: {idn})")
             else:
                 print("[INFO] Deletion cancelled")
@@ -263,20 +271,8 @@ class StudentEditor:
             print("[ERROR] No IDNs provided")
             return
 
-        students_to_delete = []
         print(f"\n=== STUDENTS TO BE DELETED ({len(idns)}) ===")
-
-        for idn in idns:
-            try:
-                response = self.manager.table.get_item(Key={'idn': idn})
-                if 'Item' in response:
-                    student = response['Item']
-                    students_to_delete.append(student)
-                    print(f"IDN {idn}: {student.get('nama', 'N/A')}")
-                else:
-                    print(f"IDN {idn}: [NOT FOUND]")
-            except ClientError as e:
-                print(f"IDN {idn}: [ERROR] {e}")
+        students_to_delete = self._fetch_batch(idns, fields=['nama'])
 
         if not students_to_delete:
             print("[ERROR] No valid students found")
@@ -285,22 +281,42 @@ class StudentEditor:
         confirm = input(f"\nDelete {len(students_to_delete)} student(s)? This cannot be undone! (yes/no): ").strip().lower()
 
         if confirm in ['yes', 'y']:
-            deleted_count = 0
+            deleted_count, failed_idns = self.manager.delete_students(student.idn for student in students_to_delete)
+
             for student in students_to_delete:
-                try:
-                    self.manager.table.delete_item(Key={'idn': int(student['idn'])})
-                    print(f"Deleted: {student.get('nama', 'N/A')} (IDN: {student['idn']})")
-                    deleted_count += 1
-                except ClientError as e:
-                    print(f"Failed to delete IDN {student['idn']}: {e}")
+                if student.idn in failed_idns:
+                    print(f"Failed to delete IDN {student.idn}")
+                else:
+                    print(f"Deleted: {student.get('nama', 'N/A')} (IDN: {student.idn})")
+
+            if deleted_count:
+                self.manager.counter.add(-deleted_count)
 
             print(f"\n[SUCCESS] Deleted {deleted_count}/{len(students_to_delete)} student(s)")
         else:
             print("[INFO] Deletion cancelled")
 
+    def _fetch_batch(self, idns, fields=None):
+        """Fetch the listed students with BatchGetItem and print each IDN's status"""
+        try:
+            found = {student.idn: student for student in self.manager.get_students_by_idns(idns, fields)}
+        except ClientError as e:
+            print(f"[ERROR] {e}")
+            return []
+
+        students = []
+        for idn in dict.fromkeys(idns):
+            student = found.get(idn)
+            if student is not None:
+                students.append(student)
+                print(f"IDN {idn}: {student.get('nama', 'N/A')}")
+            else:
+                print(f"IDN {idn}: [NOT FOUND]")
+        return students
+
     def _display_student_info(self, student):
         """Display student information"""
-        print(f"\nIDN: {int(student['idn'])}")
+        print(f"\nIDN: {student.idn}")
         print(f"Name: {student.get('nama', 'N/A')}")
         print(f"Major: {student.get('jurusan', 'N/A')}")
         print(f"University: {student.get('university', 'N/A')}")
@@ -0,0 +1,142 @@
+"""
+StudentIndex - In-memory secondary indexes for filtering, sorting and name suggestions
+"""
+
+from array import array
+from bisect import bisect_left
+
+
+class StudentIndex:
+    """Inverted lists and sorted views over one snapshot of the students
+
+    Each student gets a position in the snapshot. For every filter field,
+    each (case-insensitive) value maps to the set of positions holding it;
+    a query intersects those sets, smallest first. A sorted view is the
+    array of positions in sort order, built once per sort field and reused
+    until the snapshot changes. Small result sets are ordered by their rank
+    in the view, large ones by walking the view.
+    """
+
+    FILTER_FIELDS = ('provinsi', 'jurusan', 'year', 'university')
+    SORT_FIELDS = ('nama', 'idn', 'created_at', 'updated_at') + FILTER_FIELDS
+
+    def __init__(self, students):
+        self.students = list(students)
+        self._postings = {field: {} for field in self.FILTER_FIELDS}  # field -> value -> set of positions
+        self._views = {}  # sort field -> positions in ascending order
+        self._ranks = {}  # sort field -> rank of each position in its view
+
+        for position, student in enumerate(self.students):
+            for field, postings in self._postings.items():
+                value = self.normalize(student.get(field, ''))
+                postings.setdefault(value, set()).add(position)
+
+        self._view('nama')  # The default order is always needed
+
+    def __len__(self):
+        return len(self.students)
+
+    @staticmethod
+    def normalize(value):
+        return str(value).strip().casefold()
+
+    def _view(self, field):
+        """Positions sorted by field (missing values last, ties by IDN)"""
+        view = self._views.get(field)
+        if view is None:
+            def key(position):
+                student = self.students[position]
+                value = getattr(student, field)
+                return (value is None, value if value is not None else '', student.idn)
+
+            view = array('I', sorted(range(len(self.students)), key=key))
+            ranks = array('I', bytes(4 * len(view)))
+            for rank, position in enumerate(view):
+                ranks[position] = rank
+            self._views[field] = view
+            self._ranks[field] = ranks
+        return view
+
+    def match(self, filters):
+        """Positions matching every field filter, or None when there are no filters
+
+        filters maps field -> list of accepted values (any of them matches).
+        """
+        if not filters:
+            return None
+
+        candidates = []
+        for field, values in filters.items():
+            postings = self._postings[field]
+            sets = [postings.get(self.normalize(value), set()) for value in values]
+            candidates.append(sets[0] if len(sets) == 1 else set().union(*sets))
+
+        candidates.sort(key=len)
+        if not candidates[0]:
+            return set()
+        return candidates[0].intersection(*candidates[1:])
+
+    def query(self, filters=None, sort='nama', descending=False):
+        """Return the students matching filters, ordered by sort"""
+        view = self._view(sort)
+        matched = self.match(filters)
+
+        if matched is None:
+            positions = view
+        elif len(matched) * 16 < len(view):
+            ranks = self._ranks[sort]
+            positions = sorted(matched, key=ranks.__getitem__)
+        else:
+            positions = [position for position in view if position in matched]
+
+        students = [self.students[position] for position in positions]
+        if descending:
+            students.reverse()
+        return students
+
+
+class NameSuggester:
+    """Prefix search over student names with a sorted array and bisect
+
+    Every name is stored under its full name and under its first + last
+    name (the key the API matches on), plus every suffix starting at a
+    later word, so "mab" finds "Aprilia Weni Irjani Mabel". Whole-name
+    keys rank before inner-word matches. A lookup costs one binary search
+    plus at most limit steps per array, cheap enough for every keystroke.
+    """
+
+    def __init__(self, students):
+        self.students = [student for student in students if student.nama]
+        primary = []
+        secondary = []
+
+        for position, student in enumerate(self.students):
+            words = self.normalize(student.nama).split()
+            primary.append((' '.join(words), position))
+            if len(words) > 2:
+                primary.append((f"{words[0]} {words[-1]}", position))
+            for start in range(1, len(words)):
+                secondary.append((' '.join(words[start:]), position))
+
+        self._arrays = []
+        for entries in (primary, secondary):
+            entries.sort()
+            self._arrays.append(([key for key, _ in entries], array('I', [position for _, position in entries])))
+
+    @staticmethod
+    def normalize(text):
+        return ' '.join(str(text).casefold().split())
+
+    def suggest(self, prefix, limit=8):
+        """Return up to limit students whose name (or a later word of it) starts with prefix"""
+        prefix = self.normalize(prefix)
+        if not prefix:
+            return []
+
+        found = {}  # position -> None, keeps insertion (rank) order
+        for keys, positions in self._arrays:
+            i = bisect_left(keys, prefix)
+            while i < len(keys) and len(found) < limit and keys[i].startswith(prefix):
+                found.setdefault(positions[i], None)
+                i += 1
+        return [self.students[position] for position in found]
@@ -0,0 +1,134 @@
+"""
+StudentInserter - Race-free inserts with TransactWriteItems
+"""
+
+import random
+import time
+import uuid
+from botocore.exceptions import ClientError
+from student import name_key
+from tenant import UNIVERSITY_KEY
+
+NAME_PREFIX = 'student_name'
+
+
+class NameTaken(Exception):
+    """The student's name is already reserved by the student with this IDN"""
+
+    def __init__(self, idn):
+        super().__init__(f"Name already belongs to IDN {idn}")
+        self.idn = idn
+
+
+class StudentInserter:
+    """Adds students so that concurrent inserts can neither duplicate a person nor share an IDN
+
+    Each insert is one TransactWriteItems call of two puts: the student
+    (conditioned on its IDN being free) and a name reservation in the meta
+    table, keyed by the normalized name the API matches on (conditioned on
+    the name being free). Either both are written or neither is. When the
+    name is taken the insert raises NameTaken with the owner's IDN, so the
+    caller can update that student instead. A reservation left behind by a
+    deleted or renamed student is taken over. An IDN that is already used
+    (rows written outside the sequence) moves the sequence past the stored
+    IDNs and the insert is retried.
+    """
+
+    MAX_ATTEMPTS = 5
+
+    def __init__(self, students_table, meta_table, sequence, university_id):
+        self.students_table = students_table
+        self.meta_table = meta_table
+        self.sequence = sequence
+        self.university_id = university_id
+        # The resource's client (de)serializes plain Python values like the Table API
+        self.client = students_table.meta.client
+
+    def insert(self, student, idn=None):
+        """Store student under idn (default: a new IDN from the sequence) and return it
+
+        Raises NameTaken when another student already holds the name. Safe
+        to call from several threads: requests go through the client.
+        """
+        reservation = {'meta_key': name_reservation_key(self.university_id, student.nama)}
+        stale_idn = None
+
+        for attempt in range(self.MAX_ATTEMPTS):
+            if idn is None:
+                idn = self.sequence.reserve()
+            student.idn = idn
+            student.university_id = self.university_id
+            student.apply_status()
+
+            name_put = {
+                'TableName': self.meta_table.name,
+                'Item': {**reservation, 'idn': student.idn},
+                'ConditionExpression': 'attribute_not_exists(meta_key)'
+            }
+            if stale_idn is not None:
+                name_put['ConditionExpression'] += ' OR idn = :stale'
+                name_put['ExpressionAttributeValues'] = {':stale': stale_idn}
+
+            try:
+                self.client.transact_write_items(
+                    TransactItems=[
+                        {'Put': {'TableName': self.students_table.name, 'Item': student.to_item(),
+                                 'ConditionExpression': 'attribute_not_exists(idn)'}},
+                        {'Put': name_put}
+                    ],
+                    ClientRequestToken=str(uuid.uuid4())  # A retried request is applied once
+                )
+                return student
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'TransactionCanceledException':
+                    raise
+                student_reason, name_reason = cancellation_reasons(e, 2)
+
+            if name_reason == 'ConditionalCheckFailed':
+                owner = self.client.get_item(TableName=self.meta_table.name, Key=reservation,
+                                             ConsistentRead=True).get('Item')
+                if owner is None:
+                    continue  # Released meanwhile
+                owner_idn = int(owner['idn'])
+                if owner_idn == idn and student_reason == 'ConditionalCheckFailed':
+                    return student  # A retried call whose first attempt was applied
+                if self._holds_name(owner_idn, student.nama):
+                    raise NameTaken(owner_idn)
+                stale_idn = owner_idn
+            elif student_reason == 'ConditionalCheckFailed':
+                self.sequence.advance(self.sequence.highest_stored())
+                idn = None
+            elif 'TransactionConflict' in (student_reason, name_reason):
+                # A concurrent insert of the same name is in flight; the next attempt sees its result
+                time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+            else:
+                raise RuntimeError(f"Insert cancelled: {student_reason}, {name_reason}")
+
+        raise RuntimeError(f"Could not insert {student.nama} after {self.MAX_ATTEMPTS} attempts")
+
+    def _holds_name(self, idn, nama):
+        """True when student idn still exists under the same normalized name"""
+        response = self.client.get_item(TableName=self.students_table.name,
+                                        Key={UNIVERSITY_KEY: self.university_id, 'idn': idn},
+                                        ProjectionExpression='nama', ConsistentRead=True)
+        return 'Item' in response and normalized_name(response['Item'].get('nama')) == normalized_name(nama)
+
+
+def normalized_name(nama):
+    """The name the API matches on: first + last word, or the whole name when it is one word"""
+    key = name_key(nama)
+    return ' '.join(key) if key else ' '.join((nama or '').lower().split())
+
+
+def name_reservation_key(university_id, nama):
+    return f"{NAME_PREFIX}#{university_id}#{normalized_name(nama)}"
+
+
+def cancellation_reasons(error, count):
+    """Per-item cancellation codes ('None' when the item was fine) of a TransactionCanceledException"""
+    reasons = [reason.get('Code', 'None') for reason in error.response.get('CancellationReasons', [])]
+    if not reasons:
+        # Older SDKs only list them in the message: "... reasons [ConditionalCheckFailed, None]"
+        message = error.response['Error'].get('Message', '')
+        reasons = [part.strip() for part in message.rpartition('[')[2].rstrip(']').split(',')]
+    return (reasons + ['None'] * count)[:count]
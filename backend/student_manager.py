@@ -3,96 +3,375 @@ StudentManager - Core data operations and DynamoDB interactions
 """
 
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from adaptive_executor import AdaptiveExecutor, BULK_CLIENT_CONFIG, Retry
+from student import Student, graduated_key, projection_args, status_update_args
+from student_counter import IdnSequence, StudentCounter
+from student_inserter import NameTaken, StudentInserter
+from tenant import DEFAULT_UNIVERSITY_ID, UNIVERSITY_KEY
+from pivot import PivotTable
 
 
 class StudentManager:
-    """Manages student data operations in DynamoDB"""
+    """Manages one university's students in DynamoDB
 
-    def __init__(self, table_name, region, timezone):
+    Every read is a Query of the university's partition and every key is
+    built by key(), so an operation costs the size of this university's
+    data, not of the whole table.
+    """
+
+    # Sparse GSI holding only graduated students (alumni_pk + graduation_year)
+    GRADUATED_INDEX = 'graduated-index'
+
+    offline = False  # See offline_journal.OfflineManager
+
+    def __init__(self, table_name, region, timezone, meta_table_name=None, university_id=DEFAULT_UNIVERSITY_ID):
         self.dynamodb = boto3.resource('dynamodb', region_name=region)
         self.table = self.dynamodb.Table(table_name)
+        self.university_id = university_id
+        meta_table = self.dynamodb.Table(meta_table_name or f"{table_name}-meta")
+        self.counter = StudentCounter(meta_table, self.table, university_id)
+        self.sequence = IdnSequence(meta_table, self.table, university_id)
+        self.inserter = StudentInserter(self.table, meta_table, self.sequence, university_id)
         self.timezone = timezone
-        self.current_year_options = ['Freshman', 'Sophomore', 'Junior', 'Senior', '']
+        # Bulk jobs: low-level retries stay short so the executor sees throttling
+        self.bulk_client = boto3.resource('dynamodb', region_name=region, config=BULK_CLIENT_CONFIG).meta.client
 
-    def get_all_students(self):
-        """Fetch all students from DynamoDB with pagination handling"""
-        try:
-            response = self.table.scan()
-            students = response['Items']
+    def key(self, idn):
+        """Primary key of one of this university's students"""
+        return {UNIVERSITY_KEY: self.university_id, 'idn': idn}
+
+    def partition(self):
+        """Query condition selecting this university's students"""
+        return Key(UNIVERSITY_KEY).eq(self.university_id)
 
-            while 'LastEvaluatedKey' in response:
-                response = self.table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-                students.extend(response['Items'])
+    def stamp(self, student):
+        """Place a student in this university and derive its status attributes"""
+        student.university_id = self.university_id
+        return student.apply_status()
 
-            return students
+    def get_all_students(self, fields=None):
+        """Fetch all of the university's students as a list (see iter_students)
+
+        fields limits the attributes read (idn is always included);
+        attributes not fetched are None on the returned records.
+        """
+        try:
+            return list(self.iter_students(fields))
         except ClientError as e:
             print(f"[ERROR] {e}")
             return []
 
+    def iter_students(self, fields=None, filter=None, page_size=None):
+        """Yield the university's students page by page, in IDN order
+
+        Only one page is held at a time, so consumers that reduce as they go
+        use constant memory. The next page is requested in the background
+        while the current one is consumed. fields is pushed down as a
+        projection, filter (a boto3 Attr condition) as a FilterExpression.
+        Raises ClientError mid-iteration when a page cannot be read.
+        """
+        query_args = {'KeyConditionExpression': self.partition(), **projection_args(fields)}
+        if filter is not None:
+            query_args['FilterExpression'] = filter
+        if page_size:
+            query_args['Limit'] = page_size
+        return self._iter_pages(query_args)
+
+    def _iter_pages(self, query_args):
+        """Yield the records of every page of a Query, prefetching the next page"""
+        # Clients are thread-safe (resources are not); the resource's client still takes Attr/Key conditions
+        query = partial(self.table.meta.client.query, TableName=self.table.name, **query_args)
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            page = prefetch.submit(query)
+            while page is not None:
+                response = page.result()
+                last_key = response.get('LastEvaluatedKey')
+                page = prefetch.submit(query, ExclusiveStartKey=last_key) if last_key else None
+                for item in response['Items']:
+                    yield Student.from_item(item)
+
+    def get_student(self, idn, fields=None):
+        """Fetch a single student by IDN, returns None if not found"""
+        response = self.table.get_item(Key=self.key(idn), **projection_args(fields))
+        if 'Item' not in response:
+            return None
+        return Student.from_item(response['Item'])
+
+    def scan_page(self, limit, start_key=None, fields=None):
+        """Read one page of the university's students in IDN (sort key) order
+
+        Returns (students, last_key); pass last_key back as start_key for
+        the next page. last_key is None after the final page.
+        """
+        query_args = projection_args(fields)
+        if start_key:
+            query_args['ExclusiveStartKey'] = start_key
+
+        response = self.table.query(KeyConditionExpression=self.partition(), Limit=limit, **query_args)
+        students = [Student.from_item(item) for item in response['Items']]
+        return students, response.get('LastEvaluatedKey')
+
+    def search_by_name(self, name):
+        """Students whose name contains name (case-sensitive, like DynamoDB contains)"""
+        return list(self.iter_students(filter=Attr('nama').contains(name)))
+
+    def get_students_by_idns(self, idns, fields=None, executor=None):
+        """Fetch several students with BatchGetItem, returned in the order of idns
+
+        Requests of 100 keys run under adaptive concurrency; UnprocessedKeys
+        are retried with backoff.
+        """
+        executor = executor or AdaptiveExecutor()
+        found = {}
+        idns = list(idns)
+        unique = list(dict.fromkeys(idns))  # BatchGetItem rejects duplicate keys
+
+        def fetch(request):
+            response = self.bulk_client.batch_get_item(RequestItems=request)
+            for item in response['Responses'].get(self.table.name, []):
+                student = Student.from_item(item)
+                found[student.idn] = student
+            unprocessed = response.get('UnprocessedKeys')
+            return Retry(unprocessed) if unprocessed else None
+
+        requests = [{self.table.name: {'Keys': [self.key(idn) for idn in unique[start:start + 100]],
+                                       **projection_args(fields)}}
+                    for start in range(0, len(unique), 100)]  # BatchGetItem takes up to 100 keys
+        for _, error in executor.run(fetch, requests):
+            raise error
+
+        return [found[idn] for idn in idns if idn in found]
+
+    def update_fields(self, student, changes):
+        """Write only the changed fields of student, if nobody else wrote it since it was read
+
+        changes maps field -> new value. The update is conditioned on the
+        version that was read and increments it, so a concurrent write makes
+        it fail with ConditionalCheckFailedException instead of being
+        overwritten. Returns the stored student after the update.
+        """
+        names = {}
+        values = {':one': 1, ':ua': datetime.now(self.timezone).isoformat()}
+        set_clauses = ['updated_at = :ua']
+        remove_clauses = []
+
+        for i, (field, value) in enumerate(changes.items()):
+            names[f"#f{i}"] = field
+            values[f":f{i}"] = value
+            set_clauses.append(f"#f{i} = :f{i}")
+
+        # Keep the derived status / graduation year in sync with year
+        if 'year' in changes:
+            status_set, remove_clauses, status_values = status_update_args(changes['year'], self.university_id)
+            set_clauses.extend(status_set)
+            names['#st'] = 'status'
+            values.update(status_values)
+
+        if student.version is None:
+            condition = 'attribute_exists(idn) AND attribute_not_exists(version)'
+        else:
+            condition = 'version = :v'
+            values[':v'] = student.version
+
+        update_expression = 'SET ' + ', '.join(set_clauses)
+        if remove_clauses:
+            update_expression += ' REMOVE ' + ', '.join(remove_clauses)
+        update_expression += ' ADD version :one'
+
+        update_args = {'ExpressionAttributeNames': names} if names else {}
+        # The client, unlike the resource Table, is safe to share across the
+        # executor threads of update_students
+        response = self.bulk_client.update_item(
+            TableName=self.table.name,
+            Key=self.key(student.idn),
+            UpdateExpression=update_expression,
+            ConditionExpression=condition,
+            ExpressionAttributeValues=values,
+            ReturnValues='ALL_NEW',
+            **update_args
+        )
+        return Student.from_item(response['Attributes'])
+
+    def add_student(self, student):
+        """Store a new student under the next IDN and count it in the total
+
+        Raises student_inserter.NameTaken when a student with the same name exists.
+        """
+        self.inserter.insert(student)
+        self.counter.add(1)
+        return student
+
+    def insert_students(self, students, executor=None):
+        """Add many new students through the inserter under adaptive concurrency
+
+        The IDNs come from one block reserved up front; each student is
+        written together with its name reservation, as add_student does.
+        Returns (inserted, taken, failures): taken lists (student, owner_idn)
+        for names that already belong to a student, failures (student,
+        exception) for students that could not be written.
+        """
+        executor = executor or AdaptiveExecutor()
+        students = list(students)
+        if not students:
+            return [], [], []
+
+        first_idn = self.sequence.reserve(len(students))
+        inserted = []
+        taken = []
+
+        def insert(task):
+            offset, student = task
+            try:
+                inserted.append(self.inserter.insert(student, first_idn + offset))
+            except NameTaken as e:
+                taken.append((student, e.idn))
+
+        failures = [(student, e) for (_, student), e in executor.run(insert, enumerate(students))]
+        if inserted:
+            self.counter.add(len(inserted))
+        return inserted, taken, failures
+
+    def delete_student(self, idn):
+        """Delete one student and remove it from the total"""
+        self.table.delete_item(Key=self.key(idn))
+        self.counter.add(-1)
+
+    def put_students(self, students, executor=None):
+        """Write many students with BatchWriteItem under adaptive concurrency
+
+        Returns (written, failed_idns); unprocessed items are retried with
+        backoff by the executor.
+        """
+        executor = executor or AdaptiveExecutor()
+        students = list(students)
+        failed = executor.batch_write(self.bulk_client, self.table.name,
+                                      [{'PutRequest': {'Item': self.stamp(student).to_item()}} for student in students])
+        failed_idns = [int(request['PutRequest']['Item']['idn']) for request in failed]
+        return len(students) - len(failed_idns), failed_idns
+
+    def delete_students(self, idns, executor=None):
+        """Delete many students with BatchWriteItem, returns (deleted, failed_idns)"""
+        executor = executor or AdaptiveExecutor()
+        idns = list(idns)
+        failed = executor.batch_write(self.bulk_client, self.table.name,
+                                      [{'DeleteRequest': {'Key': self.key(idn)}} for idn in idns])
+        failed_idns = [int(request['DeleteRequest']['Key']['idn']) for request in failed]
+        return len(idns) - len(failed_idns), failed_idns
+
+    def update_students(self, students, changes, executor=None):
+        """Apply the same field changes to many students with versioned UpdateItem calls
+
+        Returns (updated_students, failures) where failures is a list of
+        (student, ClientError); conflicts fail with ConditionalCheckFailedException.
+        """
+        executor = executor or AdaptiveExecutor()
+        updated = []
+        failures = executor.run(lambda student: updated.append(self.update_fields(student, changes)), students)
+        return updated, failures
+
     def get_next_idn(self):
-        """Get next available IDN"""
-        try:
-            response = self.table.scan(ProjectionExpression='idn')
-            if response['Items']:
-                return max([int(item['idn']) for item in response['Items']]) + 1
-            return 1
-        except ClientError as e:
-            print(f"[ERROR] {e}")
-            return 1
+        """Reserve the university's next IDN from its sequence"""
+        return self.sequence.reserve()
+
+    def reserve_idns(self, count):
+        """Reserve count consecutive IDNs, returns the first"""
+        return self.sequence.reserve(count)
 
     def count_total(self):
-        """Count total students"""
+        """Count total students from the maintained counter (no table scan)"""
+        count = self.counter.get_total(refresh=True)
+        print(f"\nTotal Students: {count}")
+        return count
+
+    def recount_total(self):
+        """Recount the university's students with a COUNT query and reseed the counter"""
         try:
-            response = self.table.scan(Select='COUNT')
-            count = response['Count']
-            print(f"\nTotal Students: {count}")
+            count = self.counter.recount()
+            print(f"\nTotal Students: {count} (recounted)")
             return count
         except ClientError as e:
             print(f"[ERROR] {e}")
             return 0
 
     def count_by_field(self, field_name, display_name):
-        """Generic count by field method"""
-        students = self.get_all_students()
-
-        field_counts = {}
-        for student in students:
-            value = student.get(field_name, 'Not specified')
-            field_counts[value] = field_counts.get(value, 0) + 1
+        """Generic count by field method (streamed: only the counts are kept)"""
+        field_counts = Counter()
+        try:
+            for student in self.iter_students(fields=[field_name]):
+                field_counts[student.get(field_name, 'Not specified')] += 1
+        except ClientError as e:
+            print(f"[ERROR] {e}")
+            return {}
 
         print(f"\n=== STUDENTS BY {display_name.upper()} ===")
-        for value, count in sorted(field_counts.items(), key=lambda x: x[1], reverse=True):
+        for value, count in field_counts.most_common():
             print(f"{value}: {count}")
 
         print(f"\nTotal {display_name}: {len(field_counts)}")
-        return field_counts
+        return dict(field_counts)
 
-    def count_graduated(self):
-        """Count graduated vs current students"""
-        students = self.get_all_students()
+    def pivot(self, fields, labels=None):
+        """Count students by every combination of fields (crosstab) in one streamed pass"""
+        try:
+            pivot = PivotTable(fields, self.iter_students(fields=fields))
+        except ClientError as e:
+            print(f"[ERROR] {e}")
+            return PivotTable(fields, [])
+        pivot.print_table(labels)
+        return pivot
 
-        graduated = []
-        current_students = []
+    def get_graduated(self, from_year=None, to_year=None):
+        """List of graduated students, ordered by graduation year (see iter_graduated)"""
+        try:
+            return list(self.iter_graduated(from_year, to_year))
+        except ClientError as e:
+            print(f"[ERROR] {e}")
+            return []
 
-        for student in students:
-            year = student.get('year', '').strip()
-            if year and year not in self.current_year_options:
-                graduated.append(student)
-            else:
-                current_students.append(student)
+    def iter_graduated(self, from_year=None, to_year=None):
+        """Yield graduated students page by page from the sparse graduated index
 
-        print("\n=== STUDENT STATUS BREAKDOWN ===")
-        print(f"Total Students: {len(students)}")
-        print(f"Graduated Students: {len(graduated)}")
-        print(f"Current Students: {len(current_students)}")
-
-        if graduated:
-            print("\n=== GRADUATED STUDENTS ===")
-            print(f"{'IDN':<6} {'NAME':<30} {'GRADUATION':<20}")
-            print("="*60)
-            for student in sorted(graduated, key=lambda x: x.get('year', '')):
-                print(f"{int(student['idn']):<6} "
+        Only graduated students are in the index, so this reads just those
+        rows instead of scanning the table. The year range is inclusive.
+        """
+        condition = Key('alumni_pk').eq(graduated_key(self.university_id))
+        if from_year is not None or to_year is not None:
+            condition = condition & Key('graduation_year').between(from_year or 0, to_year or 9999)
+        return self._iter_pages({'IndexName': self.GRADUATED_INDEX, 'KeyConditionExpression': condition})
+
+    def count_graduated(self, from_year=None, to_year=None):
+        """Count graduated vs current students (index query + maintained total, no scan)
+
+        Graduated students are printed as their pages arrive and only counted,
+        so the breakdown follows the list.
+        """
+        graduated = 0
+        try:
+            for student in self.iter_graduated(from_year, to_year):
+                if not graduated:
+                    print("\n=== GRADUATED STUDENTS ===")
+                    print(f"{'IDN':<6} {'NAME':<30} {'GRADUATION':<20}")
+                    print("="*60)
+                graduated += 1
+                print(f"{student.idn:<6} "
                       f"{student.get('nama', 'N/A'):<30} "
                       f"{student.get('year', 'N/A'):<20}")
+        except ClientError as e:
+            print(f"[ERROR] {e}")
+            return
+
+        total = self.counter.get_total(refresh=True)
+
+        print("\n=== STUDENT STATUS BREAKDOWN ===")
+        print(f"Total Students: {total}")
+        if from_year is None and to_year is None:
+            print(f"Graduated Students: {graduated}")
+            print(f"Current Students: {total - graduated}")
+        else:
+            print(f"Graduated Students ({from_year or 'any'}-{to_year or 'any'}): {graduated}")
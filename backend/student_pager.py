@@ -0,0 +1,111 @@
+"""
+StudentPager - Interactive paging over students, fetching pages on demand
+"""
+
+
+class ScanPageSource:
+    """Pages in storage (IDN sort key) order, one Query request per page
+
+    Only the start key of each visited page is remembered, so going back
+    re-reads that page instead of keeping earlier pages in memory.
+    """
+
+    def __init__(self, manager, page_size, fields=None):
+        self.manager = manager
+        self.page_size = page_size
+        self.fields = fields
+        self._start_keys = [None]  # ExclusiveStartKey of each known page
+        self._last_page = None  # Index of the final page once reached
+
+    def page_count(self):
+        """Number of pages, or None while the end has not been reached"""
+        return None if self._last_page is None else self._last_page + 1
+
+    def get_page(self, number):
+        """Return the students on page number (0-based), [] past the end"""
+        # Walk forward through pages never visited (only their keys are kept)
+        while number >= len(self._start_keys):
+            if self._last_page is not None:
+                return []
+            self._read(len(self._start_keys) - 1)
+
+        if self._last_page is not None and number > self._last_page:
+            return []
+        return self._read(number)
+
+    def _read(self, number):
+        students, last_key = self.manager.scan_page(self.page_size, self._start_keys[number], self.fields)
+
+        if last_key is None:
+            self._last_page = number
+        elif number + 1 == len(self._start_keys):
+            self._start_keys.append(last_key)
+
+        # A full final page can be followed by an empty one
+        if not students and number > 0 and last_key is None:
+            self._last_page = number - 1
+
+        return students
+
+
+class IdnPageSource:
+    """Pages over a precomputed order of IDNs, one BatchGetItem per page"""
+
+    def __init__(self, manager, idns, page_size, fields=None):
+        self.manager = manager
+        self.idns = idns
+        self.page_size = page_size
+        self.fields = fields
+
+    def page_count(self):
+        return max(1, -(-len(self.idns) // self.page_size))
+
+    def get_page(self, number):
+        start = number * self.page_size
+        return self.manager.get_students_by_idns(self.idns[start:start + self.page_size], self.fields)
+
+
+class StudentPager:
+    """Shows one page at a time with next/previous/jump navigation"""
+
+    def __init__(self, source, render):
+        self.source = source
+        self.render = render  # render(students, page_number, page_count)
+
+    def run(self):
+        """Navigation loop; only the visible page is held in memory"""
+        page = 0
+
+        while True:
+            students = self.source.get_page(page)
+            if not students and page > 0:
+                print("[INFO] No more students")
+                # Reading past the end has found the last page; go there in one step
+                page_count = self.source.page_count()
+                page = page_count - 1 if page_count is not None else page - 1
+                continue
+
+            page_count = self.source.page_count()
+            self.render(students, page, page_count)
+
+            if page_count is not None and page_count <= 1:
+                return
+
+            command = input("\n[n]ext, [p]revious, page number to jump, [q]uit: ").strip().lower()
+
+            if command in ['q', '']:
+                return
+            elif command == 'n':
+                page += 1
+            elif command == 'p':
+                if page == 0:
+                    print("[INFO] Already on the first page")
+                page = max(0, page - 1)
+            elif command.isdigit() and int(command) >= 1:
+                target = int(command) - 1
+                if page_count is not None and target >= page_count:
+                    print(f"[ERROR] Page must be between 1 and {page_count}")
+                else:
+                    page = target
+            else:
+                print("[ERROR] Invalid option")
@@ -2,43 +2,64 @@
 StudentViewer - Handles student data viewing operations
 """
 
+import sys
 from boto3.dynamodb.conditions import Attr
 from botocore.exceptions import ClientError
 from datetime import datetime, timedelta
+from student_pager import StudentPager, ScanPageSource, IdnPageSource
 
 
 class StudentViewer:
     """Handles student data viewing operations"""
 
+    # Attributes shown by the list views (updated_at is needed for sorting)
+    TABLE_FIELDS = ['nama', 'jurusan', 'university', 'year', 'provinsi', 'updated_at']
+    RECENT_FIELDS = ['nama', 'jurusan', 'year', 'provinsi', 'updated_at']
+
+    PAGE_SIZE = 25
+
     def __init__(self, manager):
         self.manager = manager
 
     def view_all(self):
-        """View all students with sorting options"""
+        """View all students page by page with sorting options"""
         print("\n=== SORT BY ===")
-        print("1. Last changed")
-        print("2. First name")
-        print("3. ID")
+        print("1. ID (default, one read per page)")
+        print("2. Last changed (reads every student's timestamp first)")
+        print("3. First name (reads every student's name first)")
 
-        sort_choice = input("\nSelect sorting option (1-3): ").strip()
-        students = self.manager.get_all_students()
+        sort_choice = input("\nSelect sorting option (1-3, Enter for 1): ").strip() or '1'
 
-        if not students:
-            print("[INFO] No students found")
-            return
+        try:
+            if sort_choice not in ('2', '3'):
+                # IDN is the sort key, so storage order is ID order: no full read
+                source = ScanPageSource(self.manager, self.PAGE_SIZE, self.TABLE_FIELDS)
+                sort_label = "ID"
+            else:
+                # Sorting needs every key, so read just idn + the sort attribute;
+                # the displayed rows are then fetched one page at a time
+                if sort_choice == '2':
+                    keys = self.manager.get_all_students(fields=['updated_at'])
+                    keys.sort(key=lambda x: x.updated_at or '', reverse=True)
+                    sort_label = "Last Changed"
+                else:
+                    keys = self.manager.get_all_students(fields=['nama'])
+                    keys.sort(key=lambda x: (x.nama or '').lower())
+                    sort_label = "Name (A-Z)"
+
+                if not keys:
+                    print("[INFO] No students found")
+                    return
 
-        # Sort based on choice
-        if sort_choice == '1':
-            students.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
-            sort_label = "Last Changed"
-        elif sort_choice == '2':
-            students.sort(key=lambda x: x.get('nama', '').lower())
-            sort_label = "Name (A-Z)"
-        else:
-            students.sort(key=lambda x: int(x['idn']))
-            sort_label = "ID"
+                source = IdnPageSource(self.manager, [student.idn for student in keys],
+                                       self.PAGE_SIZE, self.TABLE_FIELDS)
+                del keys
 
-        self._display_students_table(students, f"Sorted by: {sort_label}")
+            title = f"Sorted by: {sort_label}"
+            StudentPager(source, lambda students, page, pages:
+                         self._display_students_table(students, title, page, pages)).run()
+        except ClientError as e:
+            print(f"[ERROR] {e}")
 
     def view_recent_changes(self):
         """View recently changed students"""
@@ -66,25 +87,31 @@ class StudentViewer:
             print("[ERROR] Invalid option")
             return
 
-        students = self.manager.get_all_students()
         cutoff_time = datetime.now(self.manager.timezone) - timedelta(days=days)
+        # Pushed-down pre-filter on the ISO date prefix (a day early, so any UTC offset is covered);
+        # the exact cutoff is checked below. Only the recent records are kept.
+        since = Attr('updated_at').gte((cutoff_time - timedelta(days=1)).strftime('%Y-%m-%d'))
 
         recent_students = []
-        for student in students:
-            updated_at_str = student.get('updated_at', '')
-            if updated_at_str and 'T' in updated_at_str:
-                try:
-                    timestamp_part = updated_at_str.split('+')[0].split('-')[0] if '+' in updated_at_str else updated_at_str
-                    updated_at = datetime.fromisoformat(timestamp_part.replace('Z', ''))
-                    if updated_at.tzinfo is None:
-                        updated_at = updated_at.replace(tzinfo=self.manager.timezone)
-                    if updated_at >= cutoff_time:
-                        recent_students.append(student)
-                except:
-                    pass
+        try:
+            for student in self.manager.iter_students(fields=self.RECENT_FIELDS, filter=since):
+                updated_at_str = student.updated_at or ''
+                if updated_at_str and 'T' in updated_at_str:
+                    try:
+                        timestamp_part = updated_at_str.split('+')[0].split('-')[0] if '+' in updated_at_str else updated_at_str
+                        updated_at = datetime.fromisoformat(timestamp_part.replace('Z', ''))
+                        if updated_at.tzinfo is None:
+                            updated_at = updated_at.replace(tzinfo=self.manager.timezone)
+                        if updated_at >= cutoff_time:
+                            recent_students.append(student)
+                    except:
+                        pass
+        except ClientError as e:
+            print(f"[ERROR] {e}")
+            return
 
         if recent_students:
-            recent_students.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
+            recent_students.sort(key=lambda x: x.updated_at or '', reverse=True)
             print(f"\n{'='*130}")
             print(f"Recent changes in the last {days} day(s) - {len(recent_students)} student(s)")
             print(f"{'='*130}")
@@ -92,7 +119,7 @@ class StudentViewer:
             print("="*130)
 
             for student in recent_students:
-                print(f"{int(student['idn']):<6} "
+                print(f"{student.idn:<6} "
                       f"{student.get('nama', 'N/A'):<25} "
                       f"{student.get('jurusan', 'N/A'):<20} "
                       f"{student.get('year', 'N/A'):<10} "
@@ -105,8 +132,7 @@ class StudentViewer:
     def search_student(self, name):
         """Search student by name"""
         try:
-            response = self.manager.table.scan(FilterExpression=Attr('nama').contains(name))
-            students = response['Items']
+            students = self.manager.search_by_name(name)
 
             if students:
                 print(f"\n=== FOUND {len(students)} STUDENT(S) ===")
@@ -117,29 +143,36 @@ class StudentViewer:
         except ClientError as e:
             print(f"[ERROR] {e}")
 
-    def _display_students_table(self, students, title=""):
-        """Display students in table format"""
-        print(f"\n{'='*120}")
+    def _display_students_table(self, students, title="", page=None, page_count=None):
+        """Display students in table format (one buffered write per page)"""
+        lines = [f"\n{'='*120}"]
         if title:
-            print(title)
-            print(f"{'='*120}")
-        print(f"{'IDN':<6} {'NAMA':<25} {'JURUSAN':<20} {'UNIVERSITY':<30} {'YEAR':<10} {'PROVINSI':<15}")
-        print("="*120)
+            lines.append(title)
+            lines.append(f"{'='*120}")
+        lines.append(f"{'IDN':<6} {'NAMA':<25} {'JURUSAN':<20} {'UNIVERSITY':<30} {'YEAR':<10} {'PROVINSI':<15}")
+        lines.append("="*120)
 
         for student in students:
-            print(f"{int(student['idn']):<6} "
-                  f"{student.get('nama', 'N/A'):<25} "
-                  f"{student.get('jurusan', 'N/A'):<20} "
-                  f"{student.get('university', 'N/A'):<30} "
-                  f"{student.get('year', 'N/A'):<10} "
-                  f"{student.get('provinsi', 'N/A'):<15}")
+            lines.append(f"{student.idn:<6} "
+                         f"{student.get('nama', 'N/A'):<25} "
+                         f"{student.get('jurusan', 'N/A'):<20} "
+                         f"{student.get('university', 'N/A'):<30} "
+                         f"{student.get('year', 'N/A'):<10} "
+                         f"{student.get('provinsi', 'N/A'):<15}")
+
+        lines.append("="*120)
+        if page is None:
+            lines.append(f"Total: {len(students)} students")
+        else:
+            pages = f" of {page_count}" if page_count else ""
+            lines.append(f"Page {page + 1}{pages} | Total: {self.manager.counter.get_total()} students")
 
-        print("="*120)
-        print(f"Total: {len(students)} students")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def _display_student_details(self, student):
         """Display detailed student information"""
-        print(f"\nIDN: {int(student['idn'])}")
+        print(f"\nIDN: {student.idn}")
         print(f"Name: {student.get('nama', 'N/A')}")
         print(f"Major: {student.get('jurusan', 'N/A')}")
         print(f"University: {student.get('university', 'N/A')}")
@@ -0,0 +1,39 @@
+"""
+Tenants - Universities whose students share the students table
+"""
+
+import os
+
+# Key and index names: every student row lives in its university's partition
+UNIVERSITY_KEY = 'university_id'
+
+
+def parse_universities(text):
+    """Parse "wmu=Western Michigan University,umich=University of Michigan" into {id: name}"""
+    universities = {}
+    for part in (text or '').split(','):
+        university_id, _, name = part.partition('=')
+        if university_id.strip():
+            universities[university_id.strip().lower()] = name.strip() or university_id.strip()
+    return universities
+
+
+# Hosted universities: university_id -> display name
+UNIVERSITIES = parse_universities(os.environ.get('UNIVERSITIES', 'wmu=Western Michigan University'))
+DEFAULT_UNIVERSITY_ID = os.environ.get('DEFAULT_UNIVERSITY_ID', next(iter(UNIVERSITIES)))
+
+
+def resolve_university(name, aliases=None, default=DEFAULT_UNIVERSITY_ID):
+    """Return the university_id for a free-text university name
+
+    Matches (case-insensitively) a name in aliases (extra {casefolded
+    name: id} pairs, so several names can share an id), then an id or
+    display name in UNIVERSITIES; anything else belongs to default.
+    """
+    wanted = (name or '').strip().casefold()
+    if aliases and wanted in aliases:
+        return aliases[wanted]
+    for university_id, display_name in UNIVERSITIES.items():
+        if wanted in (university_id.casefold(), display_name.casefold()):
+            return university_id
+    return default
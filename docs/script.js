@@ -3,6 +3,9 @@ const messageDiv = document.getElementById('message');
 const submitBtn = document.getElementById('submitBtn');
 const yearSelect = document.getElementById('yearSelect');
 const yearCustom = document.getElementById('yearCustom');
+const namaInput = document.getElementById('nama');
+const nameSuggestions = document.getElementById('nameSuggestions');
+const nameHint = document.getElementById('nameHint');
 
 // Backend API URL (AWS Lambda)
 const API_URL = 'https://qkfsddvd8j.execute-api.us-east-1.amazonaws.com/production';
@@ -28,6 +31,80 @@ yearCustom.addEventListener('input', function() {
 // Initialize year field on page load
 toggleYearInput();
 
+// Name suggestions: show existing records while typing (debounced)
+const SUGGEST_DELAY_MS = 250;
+const suggestCache = new Map();
+let suggestTimer = null;
+let suggestController = null;
+
+function updateNameHint(suggestions) {
+    const typed = namaInput.value.trim().toLowerCase();
+    const match = suggestions.find(s => s.nama.toLowerCase() === typed);
+
+    if (match) {
+        nameHint.className = 'hint match';
+        nameHint.textContent = `Existing record found (${match.jurusan || 'no major'}) - submitting will update it.`;
+    } else if (suggestions.length > 0) {
+        nameHint.className = 'hint';
+        nameHint.textContent = 'Already submitted before? Pick your name from the list to update your record.';
+    } else {
+        nameHint.className = 'hint';
+        nameHint.textContent = '';
+    }
+}
+
+function showSuggestions(suggestions) {
+    nameSuggestions.innerHTML = '';
+    suggestions.forEach(s => {
+        const option = document.createElement('option');
+        option.value = s.nama;
+        nameSuggestions.appendChild(option);
+    });
+    updateNameHint(suggestions);
+}
+
+async function fetchSuggestions(query) {
+    const key = query.toLowerCase();
+    if (suggestCache.has(key)) {
+        showSuggestions(suggestCache.get(key));
+        return;
+    }
+
+    // Only the latest keystroke's request matters
+    if (suggestController) {
+        suggestController.abort();
+    }
+    suggestController = new AbortController();
+
+    try {
+        const response = await fetch(`${API_URL}/students/suggest?q=${encodeURIComponent(query)}`, {
+            signal: suggestController.signal
+        });
+        if (!response.ok) {
+            return;
+        }
+        const result = await response.json();
+        suggestCache.set(key, result.data);
+        showSuggestions(result.data);
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.error('Suggest error:', error);
+        }
+    }
+}
+
+namaInput.addEventListener('input', () => {
+    clearTimeout(suggestTimer);
+    const query = namaInput.value.trim();
+
+    if (query.length < 2) {
+        showSuggestions([]);
+        return;
+    }
+
+    suggestTimer = setTimeout(() => fetchSuggestions(query), SUGGEST_DELAY_MS);
+});
+
 form.addEventListener('submit', async (e) => {
     e.preventDefault();
 
@@ -57,6 +134,8 @@ form.addEventListener('submit', async (e) => {
             messageDiv.classList.add('success');
             messageDiv.textContent = result.message;
             form.reset(); // Clear form for new entry
+            showSuggestions([]);
+            suggestCache.clear(); // The new record should show up in suggestions
             // Restore default university value
             document.getElementById('university').value = 'Western Michigan University';
             toggleYearInput(); // Reset year field
@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration for running the API outside Lambda
+Usage: gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) and the student cache
+is warmed there before forking, so workers start warm and share those
+pages copy-on-write. Writes in one worker are announced to the others
+through a shared invalidation ring (see student_cache.SharedInvalidation).
+"""
+
+import gc
+import multiprocessing
+import os
+
+# gevent must patch the standard library before anything else is imported
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+wsgi_app = 'backend.main:app'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))  # gthread only
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '200'))  # gevent only
+preload_app = True
+timeout = 30
+keepalive = 5
+
+# Rate limits are per process with the in-memory store; set RATE_LIMIT_TABLE
+# to enforce them across workers.
+
+
+def when_ready(server):
+    """Runs in the master after the app is preloaded and before workers fork"""
+    from backend import main
+
+    main.enable_shared_invalidation()
+    try:
+        count = main.warm_up()
+        server.log.info("Warmed student cache with %d students", count)
+    except Exception as e:
+        server.log.warning("Cache warmup failed, workers will load on demand: %s", e)
+
+    # Keep the garbage collector from touching (and un-sharing) the warm objects
+    gc.freeze()
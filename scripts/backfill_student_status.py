@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Backfill derived status attributes (status, graduation_year, alumni_pk)
+Run this once after adding the graduated-index to an existing table
+
+The updates of each scanned page run on the adaptive executor, which
+raises or lowers the number of requests in flight based on throttling
+and latency. Each update is conditioned on the row still existing with
+the year that was scanned; rows deleted or edited meanwhile are skipped.
+"""
+
+import os
+import sys
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from adaptive_executor import AdaptiveExecutor, BULK_CLIENT_CONFIG
+from student import Student, projection_args, status_update_args
+from tenant import UNIVERSITY_KEY
+
+# Configuration
+DYNAMODB_TABLE = 'university-students'
+REGION = 'us-east-1'
+TIMEZONE = ZoneInfo('America/Detroit')
+
+def needs_update(student):
+    """True when the stored derived attributes do not match the year"""
+    expected = Student(student.idn, year=student.year, university_id=student.university_id).apply_status()
+    return (student.status, student.graduation_year, student.alumni_pk) != \
+        (expected.status, expected.graduation_year, expected.alumni_pk)
+
+def update_status(client, student):
+    """Rewrite the derived attributes of one student from its year
+
+    Returns False when the student was deleted or its year changed since
+    the scan (the writer of the new year already derived its status).
+    """
+    status_set, status_remove, status_values = status_update_args(student.year, student.university_id)
+    update_expression = 'SET ' + ', '.join(status_set + ['updated_at = :ua'])
+    if status_remove:
+        update_expression += ' REMOVE ' + ', '.join(status_remove)
+    update_expression += ' ADD version :one'
+
+    year_unchanged = Attr('year').not_exists() if student.year is None else Attr('year').eq(student.year)
+    try:
+        client.update_item(
+            TableName=DYNAMODB_TABLE,
+            Key={UNIVERSITY_KEY: student.university_id, 'idn': student.idn},
+            UpdateExpression=update_expression,
+            ConditionExpression=Attr('idn').exists() & year_unchanged,
+            ExpressionAttributeNames={'#st': 'status'},
+            ExpressionAttributeValues={**status_values, ':ua': datetime.now(TIMEZONE).isoformat(), ':one': 1}
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+    return True
+
+def backfill():
+    """Scan only the attributes involved and update rows that are out of date"""
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, config=BULK_CLIENT_CONFIG)
+    table = dynamodb.Table(DYNAMODB_TABLE)
+    # Resources are not thread-safe; the executor's workers share the (thread-safe) client
+    client = dynamodb.meta.client
+    executor = AdaptiveExecutor()
+
+    scan_args = projection_args([UNIVERSITY_KEY, 'year', 'status', 'graduation_year', 'alumni_pk'])
+    scanned = 0
+    updated = 0
+    failed = 0
+    skipped = []  # Appended to from the worker threads
+
+    response = table.scan(**scan_args)
+    while True:
+        scanned += len(response['Items'])
+        stale = [student for student in map(Student.from_item, response['Items']) if needs_update(student)]
+        skipped_before = len(skipped)
+
+        def update(student):
+            if not update_status(client, student):
+                skipped.append(student.idn)
+
+        failures = executor.run(update, stale)
+        for student, e in failures:
+            print(f"[ERROR] IDN {student.idn}: {e}")
+        updated += len(stale) - len(failures) - (len(skipped) - skipped_before)
+        failed += len(failures)
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **scan_args)
+
+    stats = executor.stats()
+    print("-" * 60)
+    print(f"Scanned: {scanned}")
+    print(f"Updated: {updated}")
+    print(f"Skipped (deleted or edited meanwhile): {len(skipped)}")
+    print(f"Failed: {failed}")
+    print(f"Requests: {stats['requests']}, throttled: {stats['throttles']}, peak concurrency: {stats['peak']}")
+
+if __name__ == '__main__':
+    print("="*60)
+    print("Backfill Student Status")
+    print("="*60)
+    print(f"Table Name: {DYNAMODB_TABLE}")
+    print(f"Region: {REGION}")
+    print("="*60)
+
+    confirm = input("\nBackfill status attributes? (yes/no): ")
+
+    if confirm.lower() == 'yes':
+        backfill()
+    else:
+        print("Cancelled.")
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Back up the students table to compressed local files and restore it
+
+backup:  parallel segmented Scan into gzip-compressed JSON Lines files
+         (typed DynamoDB JSON, so numbers and timestamps round-trip exactly)
+         plus a manifest.json with item counts and SHA-256 checksums
+restore: verify the checksums, then write the items of all files back
+         with BatchWriteItem calls through one bounded pipeline, and
+         recount each restored university's total and IDN sequence
+
+Both run on the adaptive executor, which raises or lowers the number of
+requests in flight based on throttling and latency.
+
+Usage:
+    python scripts/backup_table.py backup [--segments 8] [--out backups/NAME]
+    python scripts/backup_table.py restore backups/NAME [--max-concurrency 32] [--table NAME]
+        [--meta-table NAME]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import boto3
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from adaptive_executor import AdaptiveExecutor, BATCH_WRITE_SIZE, BULK_CLIENT_CONFIG, Continue, Retry
+from student_counter import IdnSequence, StudentCounter
+from tenant import UNIVERSITY_KEY
+
+# Configuration
+DYNAMODB_TABLE = 'university-students'
+META_TABLE = 'university-students-meta'
+REGION = 'us-east-1'
+BACKUP_DIR = 'backups'
+MANIFEST_FILE = 'manifest.json'
+ITEMS_PER_FILE = 50000  # A segment rolls over to a new file after this many items
+
+
+class Progress:
+    """Thread-safe item/byte totals with a throughput line"""
+
+    def __init__(self, label):
+        self.label = label
+        self.items = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._last_report = 0
+
+    def add(self, items, nbytes):
+        with self._lock:
+            self.items += items
+            self.bytes += nbytes
+            now = time.perf_counter()
+            if now - self._last_report >= 1:
+                self._last_report = now
+                print(self.line())
+
+    def line(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.label}: {self.items} items, {self.bytes / 1e6:.1f} MB "
+                f"({self.items / elapsed:.0f} items/s, {self.bytes / 1e6 / elapsed:.2f} MB/s)")
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SegmentScan:
+    """One scan segment: pages are read one at a time into rolling gzip JSONL files"""
+
+    def __init__(self, client, table_name, out_dir, segment, total_segments, progress):
+        self.client = client
+        self.out_dir = out_dir
+        self.segment = segment
+        self.progress = progress
+        self.scan_args = {'TableName': table_name, 'Segment': segment, 'TotalSegments': total_segments}
+        self.files = []
+        self.out = None
+
+    def _open_part(self):
+        name = f"segment-{self.segment:03d}-{len(self.files):04d}.jsonl.gz"
+        self.files.append({'file': name, 'items': 0})
+        return gzip.open(os.path.join(self.out_dir, name), 'wb', compresslevel=6)
+
+    def scan_page(self):
+        """Scan and write the next page; Continue(self) while pages remain"""
+        response = self.client.scan(**self.scan_args)
+        nbytes = 0
+        for item in response['Items']:
+            if self.out is None or self.files[-1]['items'] >= ITEMS_PER_FILE:
+                if self.out is not None:
+                    self.out.close()
+                self.out = self._open_part()
+            line = json.dumps(item, separators=(',', ':')).encode('utf-8') + b'\n'
+            self.out.write(line)
+            self.files[-1]['items'] += 1
+            nbytes += len(line)
+        self.progress.add(len(response['Items']), nbytes)
+
+        if 'LastEvaluatedKey' in response:
+            self.scan_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            return Continue(self)
+        self.close()
+        return None
+
+    def close(self):
+        if self.out is not None:
+            self.out.close()
+            self.out = None
+
+    def manifest_entries(self):
+        for entry in self.files:
+            path = os.path.join(self.out_dir, entry['file'])
+            entry['bytes'] = os.path.getsize(path)
+            entry['sha256'] = sha256_file(path)
+        return self.files
+
+
+def backup(table_name, out_dir, segments):
+    """Parallel segmented scan of the table into out_dir"""
+    client = boto3.client('dynamodb', region_name=REGION, config=BULK_CLIENT_CONFIG)  # clients are thread-safe
+    description = client.describe_table(TableName=table_name)['Table']
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f"\nBacking up {table_name} to {out_dir} with {segments} segments...")
+    print("-" * 60)
+
+    progress = Progress('Backed up')
+    scans = [SegmentScan(client, table_name, out_dir, segment, segments, progress) for segment in range(segments)]
+    # Pages of one segment run one after another (Continue), segments in parallel
+    executor = AdaptiveExecutor(initial=segments, max_limit=segments)
+    failures = executor.run(SegmentScan.scan_page, scans)
+    for scan in scans:
+        scan.close()
+    if failures:
+        for scan, e in failures:
+            print(f"❌ Failed segment {scan.segment}: {e}")
+        print("⚠️  Backup incomplete, no manifest written.")
+        return False
+
+    files = [entry for scan in scans for entry in scan.manifest_entries()]
+    manifest = {
+        'table': table_name,
+        'region': REGION,
+        'created_at': datetime.now().isoformat(),
+        'key_schema': description['KeySchema'],
+        'segments': segments,
+        'item_count': sum(entry['items'] for entry in files),
+        'uncompressed_bytes': progress.bytes,
+        'files': files
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print("-" * 60)
+    print(progress.line())
+    print(f"Files: {len(files)} ({sum(entry['bytes'] for entry in files) / 1e6:.1f} MB compressed)")
+    print(f"✅ Backup complete: {os.path.join(out_dir, MANIFEST_FILE)}")
+    return True
+
+
+def load_manifest(backup_dir):
+    """Read the manifest and check every file against its checksum"""
+    with open(os.path.join(backup_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    bad = [entry['file'] for entry in manifest['files']
+           if not os.path.exists(os.path.join(backup_dir, entry['file']))
+           or sha256_file(os.path.join(backup_dir, entry['file'])) != entry['sha256']]
+    return manifest, bad
+
+
+class RestoreBatch:
+    """Up to 25 put requests read from one backup file"""
+
+    def __init__(self, file, requests, nbytes):
+        self.file = file
+        self.requests = requests
+        self.nbytes = nbytes
+
+
+def read_batches(backup_dir, files, universities):
+    """Yield the RestoreBatches of every file in turn, adding each item's university to universities
+
+    Lines are read only as the executor asks for the next batch, so at most
+    the batches in flight are held in memory.
+    """
+    for entry in files:
+        with gzip.open(os.path.join(backup_dir, entry['file']), 'rb') as f:
+            requests = []
+            nbytes = 0
+            for line in f:
+                item = json.loads(line)
+                universities.add(item[UNIVERSITY_KEY]['S'])
+                requests.append({'PutRequest': {'Item': item}})
+                nbytes += len(line)
+                if len(requests) == BATCH_WRITE_SIZE:
+                    yield RestoreBatch(entry['file'], requests, nbytes)
+                    requests = []
+                    nbytes = 0
+            if requests:
+                yield RestoreBatch(entry['file'], requests, nbytes)
+
+
+def restore(backup_dir, table_name, meta_table_name, max_concurrency):
+    """Verify the backup, write every file back under adaptive concurrency, then reseed the meta table"""
+    manifest, bad = load_manifest(backup_dir)
+    if bad:
+        print(f"❌ Checksum mismatch or missing files: {', '.join(bad)}")
+        return False
+
+    table_name = table_name or manifest['table']
+    client = boto3.client('dynamodb', region_name=REGION, config=BULK_CLIENT_CONFIG)
+    executor = AdaptiveExecutor(max_limit=max_concurrency)
+
+    print(f"\nRestoring {manifest['item_count']} items from {backup_dir} into {table_name} "
+          f"(up to {max_concurrency} requests in flight)...")
+    print("-" * 60)
+
+    progress = Progress('Restored')
+
+    def write(batch):
+        response = client.batch_write_item(RequestItems={table_name: batch.requests})
+        unprocessed = response.get('UnprocessedItems', {}).get(table_name, [])
+        progress.add(len(batch.requests) - len(unprocessed), batch.nbytes)
+        return Retry(RestoreBatch(batch.file, unprocessed, 0)) if unprocessed else None
+
+    # One pipeline over the batches of all files: the next file is read
+    # while the last batches of the previous one are still in flight
+    universities = set()
+    try:
+        failures = executor.run(write, read_batches(backup_dir, manifest['files'], universities))
+    except Exception as e:
+        print(f"[ERROR] Could not read the backup: {e}")
+        return False
+
+    unwritten = {}
+    for batch, e in failures:
+        unwritten[batch.file] = unwritten.get(batch.file, 0) + len(batch.requests)
+    for file, count in unwritten.items():
+        print(f"❌ {count} items of {file} were not written")
+
+    stats = executor.stats()
+    print("-" * 60)
+    print(progress.line())
+    print(f"Requests: {stats['requests']}, throttled: {stats['throttles']}, peak concurrency: {stats['peak']}")
+
+    reseed_meta(table_name, meta_table_name, universities)
+
+    if unwritten:
+        print(f"⚠️  Restore incomplete, failed files: {', '.join(sorted(unwritten))}")
+        return False
+
+    print("✅ Restore complete!")
+    return True
+
+
+def reseed_meta(table_name, meta_table_name, universities):
+    """Recount the total and move the IDN sequence past the stored IDNs of every restored university"""
+    dynamodb = boto3.resource('dynamodb', region_name=REGION)
+    table = dynamodb.Table(table_name)
+    meta_table = dynamodb.Table(meta_table_name)
+
+    for university_id in sorted(universities):
+        try:
+            total = StudentCounter(meta_table, table, university_id).recount()
+            sequence = IdnSequence(meta_table, table, university_id)
+            highest = sequence.highest_stored()
+            sequence.advance(highest)
+            print(f"Reseeded {university_id}: total {total}, next IDN after {highest}")
+        except ClientError as e:
+            print(f"[ERROR] Could not reseed {university_id}: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Back up or restore the students table')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    backup_parser = commands.add_parser('backup', help='scan the table into compressed files')
+    backup_parser.add_argument('--table', default=DYNAMODB_TABLE)
+    backup_parser.add_argument('--segments', type=int, default=8, help='parallel scan segments (default 8)')
+    backup_parser.add_argument('--out', help=f"output directory (default {BACKUP_DIR}/<table>_<timestamp>)")
+
+    restore_parser = commands.add_parser('restore', help='write a backup back into a table')
+    restore_parser.add_argument('backup_dir')
+    restore_parser.add_argument('--table', help='target table (default: the table in the manifest)')
+    restore_parser.add_argument('--meta-table', default=META_TABLE,
+                                help=f"meta table holding the totals and IDN sequences (default {META_TABLE})")
+    restore_parser.add_argument('--max-concurrency', type=int, default=32,
+                                help='upper bound on BatchWriteItem requests in flight (default 32)')
+
+    args = parser.parse_args()
+
+    print("="*60)
+    print("DynamoDB Backup / Restore")
+    print("="*60)
+
+    if args.command == 'backup':
+        out_dir = args.out or os.path.join(BACKUP_DIR, f"{args.table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        sys.exit(0 if backup(args.table, out_dir, args.segments) else 1)
+    else:
+        confirm = input(f"\nRestore {args.backup_dir} into {args.table or 'the original table'}? "
+                        f"Existing items with the same key are overwritten (yes/no): ")
+        if confirm.lower() == 'yes':
+            sys.exit(0 if restore(args.backup_dir, args.table, args.meta_table, args.max_concurrency) else 1)
+        print("Cancelled.")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory and conversion cost of Student records vs raw boto3 dicts
+Usage: python scripts/benchmark_student_memory.py [record_count]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from student import Student
+
+MAJORS = ['Computer Science', 'Mechanical Engineering', 'Nursing', 'Accounting', 'Aviation']
+PROVINCES = ['Papua', 'Papua Barat', 'Papua Tengah', 'Papua Selatan']
+YEARS = ['Freshman', 'Sophomore', 'Junior', 'Senior', 'Spring 2024']
+
+
+def fresh(value):
+    """Copy a string the way the boto3 deserializer does (one object per item)"""
+    return value.encode().decode()
+
+
+def make_items(count):
+    """Build items shaped like a boto3 scan page"""
+    items = []
+    for i in range(count):
+        items.append({
+            'idn': Decimal(i + 1),
+            'nama': f"Student Number {i + 1}",
+            'jurusan': fresh(MAJORS[i % len(MAJORS)]),
+            'university': fresh('Western Michigan University'),
+            'year': fresh(YEARS[i % len(YEARS)]),
+            'provinsi': fresh(PROVINCES[i % len(PROVINCES)]),
+            'created_at': f"2025-10-{(i % 28) + 1:02d}T08:00:00-04:00",
+            'updated_at': f"2025-10-{(i % 28) + 1:02d}T09:30:00-04:00"
+        })
+    return items
+
+
+def measure(build):
+    """Return (result, bytes allocated, seconds) for build()"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print("="*60)
+    print(f"Student record benchmark ({count} records)")
+    print("="*60)
+
+    dicts, dict_bytes, _ = measure(lambda: make_items(count))
+    students, student_bytes, convert_time = measure(lambda: [Student.from_item(item) for item in make_items(count)])
+
+    print(f"Raw dict records:   {dict_bytes / 1024 / 1024:8.2f} MB ({dict_bytes / count:6.0f} B/record)")
+    print(f"Student records:    {student_bytes / 1024 / 1024:8.2f} MB ({student_bytes / count:6.0f} B/record)")
+    print(f"Memory saved:       {(1 - student_bytes / dict_bytes) * 100:8.1f} %")
+    print(f"Build + convert:    {convert_time:8.3f} s (once per fetch)")
+
+    # Hot path: sort by ID then render every row, as the viewer does
+    start = time.perf_counter()
+    for item in sorted(dicts, key=lambda x: int(x['idn'])):
+        f"{int(item['idn']):<6} {item.get('nama', 'N/A'):<25}"
+    dict_render = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for student in sorted(students, key=lambda x: x.idn):
+        f"{student.idn:<6} {student.get('nama', 'N/A'):<25}"
+    student_render = time.perf_counter() - start
+
+    print(f"Sort + render dict: {dict_render:8.3f} s")
+    print(f"Sort + render obj:  {student_render:8.3f} s")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,47 @@
 """
 Create DynamoDB table for WMU Students
 Run this once to set up the table
+
+Students are keyed by university_id (partition key) and idn (sort key), so
+each university's students form one partition that is read with Query.
+An existing single-key table is copied over with migrate_to_university_keys.py.
 """
 
+import os
+import sys
 import boto3
 from botocore.exceptions import ClientError
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from student_counter import IdnSequence, StudentCounter
+from tenant import UNIVERSITIES, UNIVERSITY_KEY
+
 # DynamoDB configuration
-TABLE_NAME = 'wmu-students'
+TABLE_NAME = 'university-students'
+META_TABLE_NAME = 'university-students-meta'
+RATE_LIMIT_TABLE_NAME = 'wmu-rate-limits'
 REGION = 'us-east-1'
 
+# Sparse index: only graduated students carry alumni_pk ("<university_id>#graduated"),
+# so only they are indexed, one index partition per university
+GRADUATED_INDEX = {
+    'IndexName': 'graduated-index',
+    'KeySchema': [
+        {
+            'AttributeName': 'alumni_pk',
+            'KeyType': 'HASH'
+        },
+        {
+            'AttributeName': 'graduation_year',
+            'KeyType': 'RANGE'
+        }
+    ],
+    'Projection': {
+        'ProjectionType': 'INCLUDE',
+        'NonKeyAttributes': ['nama', 'year']
+    }
+}
+
 def create_table():
     """Create DynamoDB table"""
     dynamodb = boto3.resource('dynamodb', region_name=REGION)
@@ -20,11 +52,19 @@ def create_table():
             TableName=TABLE_NAME,
             KeySchema=[
                 {
-                    'AttributeName': 'idn',
+                    'AttributeName': UNIVERSITY_KEY,
                     'KeyType': 'HASH'  # Partition key
+                },
+                {
+                    'AttributeName': 'idn',
+                    'KeyType': 'RANGE'  # Sort key, IDNs are per university
                 }
             ],
             AttributeDefinitions=[
+                {
+                    'AttributeName': UNIVERSITY_KEY,
+                    'AttributeType': 'S'  # String
+                },
                 {
                     'AttributeName': 'idn',
                     'AttributeType': 'N'  # Number
@@ -32,6 +72,14 @@ def create_table():
                 {
                     'AttributeName': 'nama',
                     'AttributeType': 'S'  # String
+                },
+                {
+                    'AttributeName': 'alumni_pk',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'graduation_year',
+                    'AttributeType': 'N'
                 }
             ],
             GlobalSecondaryIndexes=[
@@ -39,15 +87,20 @@ def create_table():
                     'IndexName': 'nama-index',
                     'KeySchema': [
                         {
-                            'AttributeName': 'nama',
+                            'AttributeName': UNIVERSITY_KEY,
                             'KeyType': 'HASH'
+                        },
+                        {
+                            'AttributeName': 'nama',
+                            'KeyType': 'RANGE'
                         }
                     ],
                     'Projection': {
                         'ProjectionType': 'ALL'
                     }
                     # No ProvisionedThroughput for PAY_PER_REQUEST billing mode
-                }
+                },
+                GRADUATED_INDEX
             ],
             BillingMode='PAY_PER_REQUEST',  # On-demand pricing (no provisioned capacity)
             Tags=[
@@ -80,6 +133,122 @@ def create_table():
             response = dynamodb_client.describe_table(TableName=TABLE_NAME)
             print(f"Table status: {response['Table']['TableStatus']}")
             print(f"Item count: {response['Table']['ItemCount']}")
+
+            index_names = [index['IndexName'] for index in response['Table'].get('GlobalSecondaryIndexes', [])]
+            if GRADUATED_INDEX['IndexName'] not in index_names:
+                add_graduated_index()
+        else:
+            print(f"\n[ERROR] Error creating table: {e}")
+            raise
+
+def add_graduated_index():
+    """Add the sparse graduated-index to an existing table (run backfill_student_status.py after)"""
+    dynamodb_client = boto3.client('dynamodb', region_name=REGION)
+
+    try:
+        dynamodb_client.update_table(
+            TableName=TABLE_NAME,
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'alumni_pk',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'graduation_year',
+                    'AttributeType': 'N'
+                }
+            ],
+            GlobalSecondaryIndexUpdates=[
+                {
+                    'Create': GRADUATED_INDEX
+                }
+            ]
+        )
+        print(f"\n[SUCCESS] Index '{GRADUATED_INDEX['IndexName']}' is being created on '{TABLE_NAME}'")
+    except ClientError as e:
+        if 'already exists' in str(e):
+            print(f"\n[WARNING] Index '{GRADUATED_INDEX['IndexName']}' already exists!")
+        else:
+            print(f"\n[ERROR] Error adding index: {e}")
+            raise
+
+def create_meta_table():
+    """Create table holding per-university counters (student totals, IDN sequences) and name reservations"""
+    dynamodb = boto3.resource('dynamodb', region_name=REGION)
+
+    try:
+        table = dynamodb.create_table(
+            TableName=META_TABLE_NAME,
+            KeySchema=[
+                {
+                    'AttributeName': 'meta_key',
+                    'KeyType': 'HASH'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'meta_key',
+                    'AttributeType': 'S'
+                }
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+        print(f"Creating table '{META_TABLE_NAME}'...")
+        table.wait_until_exists()
+
+        # Seed each university's total and IDN sequence so they are exact from the start
+        student_table = dynamodb.Table(TABLE_NAME)
+        totals = {}
+        for university_id in UNIVERSITIES:
+            totals[university_id] = StudentCounter(table, student_table, university_id).recount()
+            IdnSequence(table, student_table, university_id).seed()
+
+        print(f"\n[SUCCESS] Table '{META_TABLE_NAME}' created successfully! (student totals: {totals})")
+
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print(f"\n[WARNING] Table '{META_TABLE_NAME}' already exists!")
+        else:
+            print(f"\n[ERROR] Error creating table: {e}")
+            raise
+
+def create_rate_limit_table():
+    """Create table holding shared API rate-limit buckets (set RATE_LIMIT_TABLE to use it)"""
+    dynamodb = boto3.resource('dynamodb', region_name=REGION)
+
+    try:
+        table = dynamodb.create_table(
+            TableName=RATE_LIMIT_TABLE_NAME,
+            KeySchema=[
+                {
+                    'AttributeName': 'bucket',
+                    'KeyType': 'HASH'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'bucket',
+                    'AttributeType': 'S'
+                }
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+        print(f"Creating table '{RATE_LIMIT_TABLE_NAME}'...")
+        table.wait_until_exists()
+
+        # Let DynamoDB delete idle buckets
+        dynamodb.meta.client.update_time_to_live(
+            TableName=RATE_LIMIT_TABLE_NAME,
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'expires_at'}
+        )
+
+        print(f"\n[SUCCESS] Table '{RATE_LIMIT_TABLE_NAME}' created successfully!")
+
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print(f"\n[WARNING] Table '{RATE_LIMIT_TABLE_NAME}' already exists!")
         else:
             print(f"\n[ERROR] Error creating table: {e}")
             raise
@@ -97,5 +266,10 @@ if __name__ == '__main__':
 
     if confirm.lower() == 'yes':
         create_table()
+        create_meta_table()
+
+        shared_limits = input("\nCreate shared rate-limit table for multi-container limits? (yes/no): ")
+        if shared_limits.lower() == 'yes':
+            create_rate_limit_table()
     else:
         print("Cancelled.")
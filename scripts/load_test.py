@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Load test the Flask API (backend.main.app) with a mix of routes
+
+By default the app runs in-process on a threaded local server backed by
+an in-memory DynamoDB stand-in (moto), so no AWS resources are touched:
+
+    python scripts/load_test.py --concurrency 16 --duration 30
+    python scripts/load_test.py --rate 200 --mix submit=1,students=2,student=7
+
+--endpoint uses DynamoDB Local instead (java -jar DynamoDBLocal.jar), and
+--url skips the local server to test an already running deployment.
+Throughput and p50/p95/p99 latency are reported per route and saved as
+JSON (--out) so runs can be compared.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+# Configuration
+DEFAULT_MIX = 'submit=1,students=2,student=7'
+REGION = 'us-east-1'
+MAJORS = ['Computer Science', 'Nursing', 'Accountancy', 'Aviation', 'Public Health']
+PROVINCES = ['Papua', 'Papua Barat', 'Papua Tengah', 'Papua Selatan']
+YEARS = ['Freshman', 'Sophomore', 'Junior', 'Senior', 'Spring 2024', 'Fall 2023']
+
+
+def parse_mix(text):
+    """'submit=1,students=2' -> {'submit': 1.0, 'students': 2.0}"""
+    mix = {}
+    for part in text.split(','):
+        route, _, weight = part.partition('=')
+        if route.strip() not in ('submit', 'students', 'student'):
+            raise ValueError(f"Unknown route in mix: {route}")
+        mix[route.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def random_name(rng, index):
+    return f"{rng.choice(['Victor', 'Aprilia', 'Yohanes', 'Maria', 'Natalis'])} Load{index}"
+
+
+def seed_students(count):
+    """Create the tables in the stand-in and fill them with count students"""
+    import boto3
+    import create_dynamodb_table
+    from student import Student
+    from tenant import DEFAULT_UNIVERSITY_ID
+
+    create_dynamodb_table.create_table()
+    table = boto3.resource('dynamodb', region_name=REGION).Table(create_dynamodb_table.TABLE_NAME)
+    rng = random.Random(1)
+    now = datetime.now().isoformat()
+
+    with table.batch_writer() as batch:
+        for idn in range(1, count + 1):
+            student = Student(idn, random_name(rng, idn), rng.choice(MAJORS), 'Western Michigan University',
+                              rng.choice(YEARS), rng.choice(PROVINCES), now, now, version=1,
+                              university_id=DEFAULT_UNIVERSITY_ID)
+            batch.put_item(Item=student.apply_status().to_item())
+
+    create_dynamodb_table.create_meta_table()  # Seeds the student total and IDN sequence from the table
+
+
+def start_local_server(args):
+    """Start backend.main.app on a threaded local server, return its base URL"""
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'  # Measure the service, not the limiter
+
+    if args.endpoint:
+        os.environ['AWS_ENDPOINT_URL_DYNAMODB'] = args.endpoint  # boto3 >= 1.28
+    else:
+        try:
+            from moto import mock_aws
+        except ImportError:
+            sys.exit("moto is required for the in-memory stand-in (pip install moto), "
+                     "or pass --endpoint for DynamoDB Local")
+        mock_aws().start()
+
+    seed_students(args.seed)
+
+    from werkzeug.serving import make_server
+    from backend.main import app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # No per-request access log
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def fetch_names(base_url, limit=500):
+    """Names for /students/<nama> requests, taken from the API itself"""
+    with urllib.request.urlopen(f"{base_url}/students", timeout=60) as response:
+        data = json.loads(response.read())['data']
+    return [student['nama'] for student in data[:limit]] or ['Victor Load1']
+
+
+def build_request(route, base_url, names, rng, counter):
+    """Return (route_label, urllib Request) for one request of the given route"""
+    if route == 'students':
+        return '/students', urllib.request.Request(f"{base_url}/students")
+
+    if route == 'student':
+        nama = rng.choice(names)
+        return '/students/<nama>', urllib.request.Request(f"{base_url}/students/{urllib.parse.quote(nama)}")
+
+    # Half the submissions update an existing student, half add a new one
+    nama = rng.choice(names) if rng.random() < 0.5 else random_name(rng, next(counter))
+    body = json.dumps({
+        'nama': nama,
+        'jurusan': rng.choice(MAJORS),
+        'university': 'Western Michigan University',
+        'year': rng.choice(YEARS),
+        'provinsi': rng.choice(PROVINCES)
+    }).encode('utf-8')
+    return '/submit', urllib.request.Request(f"{base_url}/submit", data=body,
+                                             headers={'Content-Type': 'application/json'})
+
+
+class Recorder:
+    """Collects per-route latencies and errors from all workers"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, latency, ok):
+        with self._lock:
+            self.latencies.setdefault(route, []).append(latency)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def summary(self, elapsed):
+        results = {}
+        for route, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            results[route] = {
+                'requests': len(latencies),
+                'errors': self.errors.get(route, 0),
+                'throughput_rps': round(len(latencies) / elapsed, 2),
+                'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+                'max_ms': round(latencies[-1] * 1000, 2)
+            }
+        return results
+
+
+def worker(worker_id, args, base_url, names, mix, recorder, deadline, counter):
+    """Send requests until the deadline
+
+    With --rate the worker follows a fixed schedule (open loop) and latency
+    is measured from the scheduled send time, so a stalled server shows up
+    as queueing delay instead of silently lowering the request rate.
+    """
+    rng = random.Random(args.seed_random + worker_id)
+    routes = list(mix)
+    weights = [mix[route] for route in routes]
+    interval = args.concurrency / args.rate if args.rate else 0
+    next_send = time.perf_counter() + (interval * worker_id / args.concurrency)
+
+    while True:
+        if interval:
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            start = next_send
+            next_send += interval
+        else:
+            start = time.perf_counter()
+
+        if start >= deadline:
+            return
+
+        route, req = build_request(rng.choices(routes, weights)[0], base_url, names, rng, counter)
+        ok = True
+        try:
+            with urllib.request.urlopen(req, timeout=args.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            ok = e.code == 404 and route == '/students/<nama>'  # Unknown names are expected
+        except (urllib.error.URLError, OSError):
+            ok = False
+
+        recorder.record(route, time.perf_counter() - start, ok)
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    server = None
+
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        base_url, server = start_local_server(args)
+
+    names = fetch_names(base_url)
+    recorder = Recorder()
+    counter = itertools.count(10**6)  # Suffixes of new names (next() is atomic in CPython)
+
+    print(f"Target: {base_url}")
+    print(f"Mix: {mix} | Concurrency: {args.concurrency} | "
+          f"Rate: {args.rate or 'unlimited'} req/s | Duration: {args.duration}s")
+    print("-" * 60)
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    threads = [threading.Thread(target=worker, args=(i, args, base_url, names, mix, recorder, deadline, counter))
+               for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if server:
+        server.shutdown()
+
+    results = recorder.summary(elapsed)
+    total = sum(r['requests'] for r in results.values())
+
+    print(f"{'ROUTE':<18} {'REQS':>7} {'ERR':>5} {'RPS':>8} {'P50':>8} {'P95':>8} {'P99':>8} {'MAX':>8}")
+    print("=" * 76)
+    for route, r in results.items():
+        print(f"{route:<18} {r['requests']:>7} {r['errors']:>5} {r['throughput_rps']:>8} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8}")
+    print("=" * 76)
+    print(f"Total: {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), latencies in ms")
+
+    report = {
+        'started_at': datetime.now().isoformat(),
+        'target': args.url or ('dynamodb-local' if args.endpoint else 'moto'),
+        'config': {
+            'mix': mix,
+            'concurrency': args.concurrency,
+            'rate': args.rate,
+            'duration': args.duration,
+            'seed_students': None if args.url else args.seed
+        },
+        'elapsed_s': round(elapsed, 2),
+        'total_requests': total,
+        'throughput_rps': round(total / elapsed, 2),
+        'routes': results
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.out}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test the WMU Students API')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"route weights (default {DEFAULT_MIX})")
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients (default 8)')
+    parser.add_argument('--rate', type=float, default=0, help='total requests/s (default 0 = as fast as possible)')
+    parser.add_argument('--duration', type=float, default=20, help='seconds to run (default 20)')
+    parser.add_argument('--seed', type=int, default=1000, help='students created in the local stand-in')
+    parser.add_argument('--seed-random', type=int, default=42, help='random seed for the request mix')
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout in seconds')
+    parser.add_argument('--port', type=int, default=0, help='local server port (default: any free port)')
+    parser.add_argument('--endpoint', help='DynamoDB Local endpoint, e.g. http://localhost:8000')
+    parser.add_argument('--url', help='test a running API instead of a local server')
+    parser.add_argument('--out', default=f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        help='JSON results file')
+    run(parser.parse_args())
@@ -2,99 +2,295 @@
 """
 Migrate data from SQLite to DynamoDB
 Run this once after creating the DynamoDB table
+
+Rows are read from SQLite in chunks and written as 25-item BatchWriteItem
+calls by the adaptive executor, which raises or lowers the number of
+requests in flight based on throttling and latency. The next chunk is
+read while the previous one is still being written, so there is no pause
+between chunks; only the batches in flight are held in memory. The
+checkpoint moves past a chunk once it and every chunk before it are
+written, so an interrupted run resumes where it stopped:
+python scripts/migrate_to_dynamodb.py [--max-concurrency 32] [--chunk-size 1000]
 """
 
+import argparse
 import boto3
-import sqlite3
+import hashlib
+import json
 import os
-from decimal import Decimal
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from adaptive_executor import AdaptiveExecutor, BULK_CLIENT_CONFIG, Retry, batches
+from student import Student, projection_args
+from student_counter import IdnSequence, StudentCounter
+from tenant import UNIVERSITY_KEY, resolve_university
+
 # Configuration
 SQLITE_DB = os.path.join('backend', 'students.db')
-DYNAMODB_TABLE = 'wmu-students'
+DYNAMODB_TABLE = 'university-students'
+META_TABLE = 'university-students-meta'
 REGION = 'us-east-1'
+CHECKPOINT_FILE = 'migration_checkpoint.json'
+
+# Attributes compared by the checksum verification
+CHECKSUM_FIELDS = ('idn', 'nama', 'jurusan', 'university', 'year', 'provinsi', UNIVERSITY_KEY)
+TIMESTAMP_FIELDS = ('created_at', 'updated_at')
 
-def get_sqlite_students():
-    """Get all students from SQLite"""
+def count_sqlite_students(after_idn=0):
+    """Count SQLite rows still to migrate"""
+    conn = sqlite3.connect(SQLITE_DB)
+    count = conn.execute('SELECT COUNT(*) FROM students WHERE idn > ?', (after_idn,)).fetchone()[0]
+    conn.close()
+    return count
+
+def iter_sqlite_chunks(chunk_size, after_idn=0):
+    """Yield lists of SQLite rows (as dicts) in IDN order, chunk_size at a time"""
     conn = sqlite3.connect(SQLITE_DB)
     conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
 
-    cursor.execute('SELECT * FROM students ORDER BY idn')
-    students = [dict(row) for row in cursor.fetchall()]
+    try:
+        while True:
+            rows = conn.execute('SELECT * FROM students WHERE idn > ? ORDER BY idn LIMIT ?',
+                                (after_idn, chunk_size)).fetchall()
+            if not rows:
+                return
+            chunk = [dict(row) for row in rows]
+            after_idn = chunk[-1]['idn']
+            yield chunk
+    finally:
+        conn.close()
 
-    conn.close()
-    return students
+def to_item(student):
+    """Convert a SQLite row to a DynamoDB item"""
+    # DynamoDB doesn't support empty strings, convert to 'Not specified'
+    university = student.get('university') or 'Not specified'
+    return Student(
+        idn=student['idn'],
+        nama=student['nama'] or 'Unknown',
+        jurusan=student.get('jurusan') or 'Not specified',
+        university=university,
+        year=student.get('year') or 'Not specified',
+        provinsi=student.get('provinsi') or 'Not specified',
+        created_at=student.get('created_at') or datetime.now().isoformat(),
+        updated_at=student.get('updated_at') or datetime.now().isoformat(),
+        university_id=resolve_university(university)
+    ).apply_status().to_item()
 
-def migrate_to_dynamodb(students):
-    """Migrate students to DynamoDB"""
-    dynamodb = boto3.resource('dynamodb', region_name=REGION)
-    table = dynamodb.Table(DYNAMODB_TABLE)
+def load_checkpoint():
+    """Return the IDN up to which every row is known to be migrated"""
+    if not os.path.exists(CHECKPOINT_FILE):
+        return 0
+    with open(CHECKPOINT_FILE) as f:
+        return json.load(f)['last_idn']
+
+def save_checkpoint(last_idn):
+    """Atomically record the migrated watermark"""
+    tmp_file = CHECKPOINT_FILE + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump({'last_idn': last_idn, 'saved_at': datetime.now().isoformat()}, f)
+    os.replace(tmp_file, CHECKPOINT_FILE)
+
+class ChunkBatch:
+    """Up to 25 put requests of one SQLite chunk"""
+
+    def __init__(self, chunk, requests):
+        self.chunk = chunk
+        self.requests = requests
+
+class Watermark:
+    """Tracks the batches of each chunk in flight and checkpoints completed chunks in order
+
+    A chunk completes when all of its batches are written. The checkpoint
+    only moves past a chunk when every chunk before it has completed too,
+    so rows below it are known to be migrated whatever order batches
+    finish in.
+    """
+
+    def __init__(self, after_idn, total):
+        self.last_idn = after_idn
+        self.total = total
+        self.successful = 0
+        self.start = time.perf_counter()
+        self._chunks = OrderedDict()  # chunk number -> [batches left, last IDN], in read order
+        self._lock = threading.Lock()
+
+    def add_chunk(self, number, batch_count, last_idn):
+        with self._lock:
+            self._chunks[number] = [batch_count, last_idn]
+
+    def written(self, batch, count, complete, executor):
+        """Record count rows of batch as written; complete when none are left to retry"""
+        with self._lock:
+            self.successful += count
+            if not complete:
+                return
+            self._chunks[batch.chunk][0] -= 1
+
+            advanced = False
+            while self._chunks and next(iter(self._chunks.values()))[0] == 0:
+                _, (_, self.last_idn) = self._chunks.popitem(last=False)
+                advanced = True
+            if advanced:
+                save_checkpoint(self.last_idn)
+                elapsed = time.perf_counter() - self.start
+                print(f"Migrated {self.successful}/{self.total} rows ({self.successful / elapsed:.0f} rows/s, "
+                      f"concurrency {executor.stats()['limit']})")
+
+def iter_batches(chunk_size, after_idn, watermark):
+    """Yield the ChunkBatches of every SQLite chunk, registering each chunk before its batches"""
+    for number, chunk in enumerate(iter_sqlite_chunks(chunk_size, after_idn)):
+        chunk_batches = list(batches({'PutRequest': {'Item': to_item(student)}} for student in chunk))
+        watermark.add_chunk(number, len(chunk_batches), chunk[-1]['idn'])
+        for requests in chunk_batches:
+            yield ChunkBatch(number, requests)
 
-    successful = 0
-    failed = 0
+def migrate_to_dynamodb(max_concurrency, chunk_size):
+    """Migrate students to DynamoDB under adaptive concurrency, resuming from the checkpoint"""
+    after_idn = load_checkpoint()
+    total = count_sqlite_students(after_idn)
+    client = boto3.resource('dynamodb', region_name=REGION, config=BULK_CLIENT_CONFIG).meta.client
+    executor = AdaptiveExecutor(max_limit=max_concurrency)
+    watermark = Watermark(after_idn, total)
 
-    print(f"\nMigrating {len(students)} students to DynamoDB...")
+    if after_idn:
+        print(f"\nResuming after IDN {after_idn} (checkpoint {CHECKPOINT_FILE})")
+    print(f"\nMigrating {total} students to DynamoDB (up to {max_concurrency} requests in flight)...")
     print("-" * 60)
 
-    for student in students:
-        try:
-            # Convert to DynamoDB format
-            # DynamoDB doesn't support empty strings, convert to None
-            item = {
-                'idn': student['idn'],
-                'nama': student['nama'] or 'Unknown',
-                'jurusan': student.get('jurusan') or 'Not specified',
-                'university': student.get('university') or 'Not specified',
-                'year': student.get('year') or 'Not specified',
-                'provinsi': student.get('provinsi') or 'Not specified',
-                'created_at': student.get('created_at') or datetime.now().isoformat(),
-                'updated_at': student.get('updated_at') or datetime.now().isoformat()
-            }
-
-            # Put item to DynamoDB
-            table.put_item(Item=item)
-
-            print(f"✅ Migrated: {student['nama']} (IDN: {student['idn']})")
-            successful += 1
+    def write(batch):
+        response = client.batch_write_item(RequestItems={DYNAMODB_TABLE: batch.requests})
+        unprocessed = response.get('UnprocessedItems', {}).get(DYNAMODB_TABLE, [])
+        watermark.written(batch, len(batch.requests) - len(unprocessed), not unprocessed, executor)
+        return Retry(ChunkBatch(batch.chunk, unprocessed)) if unprocessed else None
 
-        except Exception as e:
-            print(f"❌ Failed: {student['nama']} - {e}")
-            failed += 1
+    start = time.perf_counter()
+    try:
+        failures = executor.run(write, iter_batches(chunk_size, after_idn, watermark))
+    except Exception as e:
+        # Reading SQLite failed; batches already written stay behind the checkpoint
+        print(f"❌ Failed reading after IDN {watermark.last_idn}: {e}")
+        failures = [(None, e)]
+
+    failed = sum(len(batch.requests) for batch, _ in failures if batch is not None)
+    for batch, e in failures[:20]:
+        if batch is not None:
+            print(f"❌ Not written: IDN {batch.requests[0]['PutRequest']['Item']['idn']}"
+                  f"{f' (+{len(batch.requests) - 1} more)' if len(batch.requests) > 1 else ''}: {e}")
 
+    elapsed = time.perf_counter() - start
+    stats = executor.stats()
+    successful = watermark.successful
     print("-" * 60)
-    print(f"\n✅ Migration complete!")
+    print(f"\n✅ Migration complete!" if not failures else "\n⚠️  Migration incomplete!")
     print(f"Successful: {successful}")
-    print(f"Failed: {failed}")
+    print(f"Failed rows: {failed}")
+    print(f"Elapsed: {elapsed:.1f}s ({successful / elapsed if elapsed else 0:.0f} rows/s)")
+    print(f"Requests: {stats['requests']}, throttled: {stats['throttles']}, "
+          f"peak concurrency: {stats['peak']}")
+
+    if failures:
+        print(f"Re-run the script to resume after IDN {watermark.last_idn}.")
+    elif os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+
+    return not failures
+
+def checksum(item):
+    """Checksum of the migrated data attributes of one row (timestamps compared separately)"""
+    canonical = json.dumps({field: str(item.get(field, '')) for field in CHECKSUM_FIELDS}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).digest()
+
+def format_keys(keys, limit=20):
+    """University/IDN pairs for a report line"""
+    shown = ', '.join(f"{university_id}/{idn}" for university_id, idn in keys[:limit])
+    return shown + (' ...' if len(keys) > limit else '')
 
 def verify_migration():
-    """Verify data in DynamoDB"""
+    """Verify data in DynamoDB: exact counts plus per-row checksums"""
     dynamodb = boto3.resource('dynamodb', region_name=REGION)
     table = dynamodb.Table(DYNAMODB_TABLE)
 
-    # Get table item count
-    response = table.scan(Select='COUNT')
-    count = response['Count']
+    # Paginated scan of just the compared attributes
+    scan_args = projection_args(CHECKSUM_FIELDS + TIMESTAMP_FIELDS)
+    target = {}  # (university_id, idn) -> (checksum, created_at, updated_at)
+    per_university = {}  # university_id -> (students, highest IDN)
+    response = table.scan(**scan_args)
+    while True:
+        for item in response['Items']:
+            item['idn'] = int(item['idn'])
+            target[(item[UNIVERSITY_KEY], item['idn'])] = (checksum(item),) + tuple(item.get(field) for field in TIMESTAMP_FIELDS)
+            count, max_idn = per_university.get(item[UNIVERSITY_KEY], (0, 0))
+            per_university[item[UNIVERSITY_KEY]] = (count + 1, max(max_idn, item['idn']))
+        if 'LastEvaluatedKey' not in response:
+            break
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **scan_args)
 
-    print(f"\n📊 Verification:")
-    print(f"Items in DynamoDB: {count}")
+    source_count = 0
+    source_universities = set()  # Only these are compared; the table may hold other universities
+    missing = []
+    mismatched = []
+    for chunk in iter_sqlite_chunks(1000):
+        for student in chunk:
+            source_count += 1
+            item = to_item(student)
+            key = (item[UNIVERSITY_KEY], student['idn'])
+            source_universities.add(key[0])
+            stored = target.get(key)
+            if stored is None:
+                missing.append(key)
+                continue
 
-    # Get SQLite count
-    conn = sqlite3.connect(SQLITE_DB)
-    cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(*) FROM students')
-    sqlite_count = cursor.fetchone()[0]
-    conn.close()
+            # Timestamps missing in SQLite were generated during migration
+            timestamps_match = all(not student.get(field) or student[field] == value
+                                   for field, value in zip(TIMESTAMP_FIELDS, stored[1:]))
+            if stored[0] != checksum(item) or not timestamps_match:
+                mismatched.append(key)
 
-    print(f"Items in SQLite: {sqlite_count}")
+    target_count = sum(per_university[university_id][0]
+                       for university_id in source_universities if university_id in per_university)
 
-    if count == sqlite_count:
-        print("✅ Counts match! Migration successful.")
+    print(f"\n📊 Verification:")
+    print(f"Items in DynamoDB: {target_count} (universities {', '.join(sorted(source_universities))})")
+    print(f"Items in SQLite: {source_count}")
+    print(f"Missing in DynamoDB: {len(missing)}")
+    print(f"Checksum mismatches: {len(mismatched)}")
+
+    if missing:
+        print(f"  Missing: {format_keys(missing)}")
+    if mismatched:
+        print(f"  Mismatched: {format_keys(mismatched)}")
+
+    if target_count == source_count and not missing and not mismatched:
+        print("✅ Counts and checksums match! Migration successful.")
+    elif not missing and not mismatched:
+        print(f"⚠️  DynamoDB has {target_count - source_count} rows of these universities that are not in SQLite.")
     else:
-        print(f"⚠️  Count mismatch! {sqlite_count - count} items missing.")
+        print("⚠️  Verification failed.")
+
+    # Seed each university's maintained total and move its IDN sequence past the migrated IDNs
+    meta_table = dynamodb.Table(META_TABLE)
+    for university_id, (count, max_idn) in per_university.items():
+        print(f"  {university_id}: {count} students, highest IDN {max_idn}")
+        try:
+            StudentCounter(meta_table, table, university_id).recount()
+            IdnSequence(meta_table, table, university_id).advance(max_idn)
+        except Exception as e:
+            print(f"[WARNING] Could not update meta for {university_id}: {e}")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrate students from SQLite to DynamoDB')
+    parser.add_argument('--max-concurrency', type=int, default=32,
+                        help='upper bound on BatchWriteItem requests in flight (default 32)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='rows read from SQLite per chunk (default 1000)')
+    parser.add_argument('--verify-only', action='store_true', help='only compare SQLite and DynamoDB')
+    args = parser.parse_args()
+
     print("="*60)
     print("SQLite to DynamoDB Migration")
     print("="*60)
@@ -104,15 +300,18 @@ if __name__ == '__main__':
         print(f"❌ SQLite database not found: {SQLITE_DB}")
         exit(1)
 
-    # Get students from SQLite
-    students = get_sqlite_students()
-    print(f"Found {len(students)} students in SQLite")
+    if args.verify_only:
+        verify_migration()
+        exit(0)
+
+    remaining = count_sqlite_students(load_checkpoint())
+    print(f"Found {remaining} students to migrate in SQLite")
 
     # Confirm migration
-    confirm = input(f"\nMigrate {len(students)} students to DynamoDB? (yes/no): ")
+    confirm = input(f"\nMigrate {remaining} students to DynamoDB? (yes/no): ")
 
     if confirm.lower() == 'yes':
-        migrate_to_dynamodb(students)
-        verify_migration()
+        if migrate_to_dynamodb(args.max_concurrency, args.chunk_size):
+            verify_migration()
     else:
         print("Cancelled.")
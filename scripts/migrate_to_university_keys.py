@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Copy students from the single-key table (idn) into the university-keyed table
+
+Every row gets a university_id from its free-text university (matched
+against the hosted universities, see backend/tenant.py; --map adds more
+names), its alumni_pk is rewritten for the per-university graduated-index,
+and each university's student total and IDN sequence are seeded in the meta
+table. IDNs are kept: they were unique table-wide, so they are unique within
+each university. The source table is only read.
+
+Create the new tables first (scripts/create_dynamodb_table.py), then:
+    python scripts/migrate_to_university_keys.py [--source wmu-students] [--dry-run]
+        [--map "University of Michigan=umich" --map "UMich=umich"] [--default wmu] [--max-concurrency 32]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from adaptive_executor import AdaptiveExecutor, BULK_CLIENT_CONFIG
+from student import Student
+from student_counter import IdnSequence, StudentCounter
+from tenant import DEFAULT_UNIVERSITY_ID, UNIVERSITIES, resolve_university
+
+# Configuration
+SOURCE_TABLE = 'wmu-students'
+TARGET_TABLE = 'university-students'
+META_TABLE = 'university-students-meta'
+REGION = 'us-east-1'
+
+
+def convert(item, aliases, default):
+    """Return the item keyed for the new table"""
+    student = Student.from_item(item)
+    student.university_id = resolve_university(student.university, aliases, default)
+    return student.apply_status()
+
+
+def migrate(source_name, aliases, default, max_concurrency, dry_run):
+    """Scan the source page by page and write each page to the target"""
+    dynamodb = boto3.resource('dynamodb', region_name=REGION)
+    source = dynamodb.Table(source_name)
+    client = boto3.resource('dynamodb', region_name=REGION, config=BULK_CLIENT_CONFIG).meta.client
+    executor = AdaptiveExecutor(max_limit=max_concurrency)
+
+    per_university = Counter()
+    max_idn = {}
+    defaulted = Counter()  # University names that fell back to the default
+    scanned = 0
+    failed = 0
+    start = time.perf_counter()
+
+    scan_args = {}
+    while True:
+        response = source.scan(**scan_args)
+        students = [convert(item, aliases, default) for item in response['Items']]
+        scanned += len(students)
+
+        for student in students:
+            per_university[student.university_id] += 1
+            max_idn[student.university_id] = max(max_idn.get(student.university_id, 0), student.idn)
+            if student.university_id == default and resolve_university(student.university, aliases, None) is None:
+                defaulted[student.university or '(empty)'] += 1
+
+        if not dry_run and students:
+            unwritten = executor.batch_write(client, TARGET_TABLE,
+                                             [{'PutRequest': {'Item': student.to_item()}} for student in students])
+            failed += len(unwritten)
+            for request in unwritten[:20]:
+                print(f"❌ Not written: IDN {request['PutRequest']['Item']['idn']}")
+
+        elapsed = time.perf_counter() - start
+        print(f"{'Checked' if dry_run else 'Copied'} {scanned} rows ({scanned / elapsed:.0f} rows/s)")
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    print("-" * 60)
+    print(f"{'UNIVERSITY':<20} {'STUDENTS':>10} {'MAX IDN':>10}")
+    for university_id, count in per_university.most_common():
+        note = '' if university_id in UNIVERSITIES else '  (not in UNIVERSITIES, add it to serve it)'
+        print(f"{university_id:<20} {count:>10} {max_idn[university_id]:>10}{note}")
+
+    if defaulted:
+        print(f"\nRows with an unmatched university, placed in '{default}' (use --map to change):")
+        for name, count in defaulted.most_common(20):
+            print(f"  {name}: {count}")
+
+    if dry_run:
+        print("\n[INFO] Dry run only, nothing written")
+        return True
+
+    seed_meta(dynamodb, per_university, max_idn)
+
+    stats = executor.stats()
+    print(f"\nRequests: {stats['requests']}, throttled: {stats['throttles']}, peak concurrency: {stats['peak']}")
+    if failed:
+        print(f"⚠️  {failed} rows were not written; re-run the script (writes are idempotent)")
+        return False
+    print(f"✅ Copied {scanned} students into {TARGET_TABLE}")
+    return True
+
+
+def seed_meta(dynamodb, per_university, max_idn):
+    """Recount every university's total and move its IDN sequence past the copied IDNs"""
+    meta_table = dynamodb.Table(META_TABLE)
+    target = dynamodb.Table(TARGET_TABLE)
+
+    for university_id in per_university:
+        total = StudentCounter(meta_table, target, university_id).recount()
+        IdnSequence(meta_table, target, university_id).advance(max_idn[university_id])
+        print(f"Seeded {university_id}: total {total}, next IDN after {max_idn[university_id]}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Copy students into the university-keyed table')
+    parser.add_argument('--source', default=SOURCE_TABLE, help=f"single-key table to copy (default {SOURCE_TABLE})")
+    parser.add_argument('--map', action='append', default=[], metavar='NAME=ID',
+                        help='extra university name -> university_id (repeatable; several names may share an id)')
+    parser.add_argument('--default', default=DEFAULT_UNIVERSITY_ID,
+                        help=f"university_id of rows whose university matches nothing (default {DEFAULT_UNIVERSITY_ID})")
+    parser.add_argument('--max-concurrency', type=int, default=32,
+                        help='upper bound on BatchWriteItem requests in flight (default 32)')
+    parser.add_argument('--dry-run', action='store_true', help='only report how rows would be assigned')
+    args = parser.parse_args()
+
+    # --map takes NAME=ID; the id is after the last '='. Several names may map to one id,
+    # and an id also matches itself
+    aliases = {}
+    for name, _, university_id in (text.rpartition('=') for text in args.map):
+        university_id = university_id.strip().lower()
+        aliases[name.strip().casefold()] = university_id
+        aliases.setdefault(university_id.casefold(), university_id)
+
+    print("="*60)
+    print("Migrate to University Keys")
+    print("="*60)
+    print(f"Source: {args.source}")
+    print(f"Target: {TARGET_TABLE} (meta: {META_TABLE})")
+    print(f"Region: {REGION}")
+    print("="*60)
+
+    if args.dry_run:
+        migrate(args.source, aliases, args.default, args.max_concurrency, True)
+        sys.exit(0)
+
+    confirm = input(f"\nCopy {args.source} into {TARGET_TABLE}? (yes/no): ")
+    if confirm.lower() == 'yes':
+        sys.exit(0 if migrate(args.source, aliases, args.default, args.max_concurrency, False) else 1)
+    print("Cancelled.")
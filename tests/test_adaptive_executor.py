@@ -0,0 +1,59 @@
+import threading
+
+from adaptive_executor import AdaptiveExecutor, Continue, Retry, batches
+
+
+def test_batches():
+    assert list(batches(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batches([], 3)) == []
+
+
+def test_generator_is_read_only_as_slots_free_up():
+    executor = AdaptiveExecutor(initial=2, max_limit=2)
+    lock = threading.Lock()
+    state = {'read': 0, 'done': 0, 'ahead': 0}
+
+    def tasks():
+        for i in range(20):
+            with lock:
+                state['read'] += 1
+                state['ahead'] = max(state['ahead'], state['read'] - state['done'])
+            yield i
+
+    def work(task):
+        with lock:
+            state['done'] += 1
+
+    assert executor.run(work, tasks()) == []
+    assert state['done'] == 20
+    assert state['ahead'] <= 2
+
+
+def test_retry_and_continue():
+    executor = AdaptiveExecutor(backoff_base=0.001)
+    seen = []
+    lock = threading.Lock()
+
+    def work(task):
+        with lock:
+            seen.append(task)
+        if task == 'throttled':
+            return Retry('rest')
+        if task == 'page1':
+            return Continue('page2')
+        return None
+
+    assert executor.run(work, ['throttled', 'page1']) == []
+    assert sorted(seen) == ['page1', 'page2', 'rest', 'throttled']
+    assert executor.stats()['throttles'] == 1
+
+
+def test_failures_are_returned():
+    executor = AdaptiveExecutor()
+
+    def work(task):
+        if task % 2:
+            raise ValueError(task)
+
+    failures = executor.run(work, range(4))
+    assert sorted(task for task, _ in failures) == [1, 3]
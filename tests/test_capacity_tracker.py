@@ -0,0 +1,98 @@
+import threading
+from types import SimpleNamespace
+
+from capacity_tracker import CapacityTracker
+
+QUERY = SimpleNamespace(name='Query')
+
+
+class FakeManager:
+    """Methods that make (fake) DynamoDB calls through the tracker"""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def _query(self):
+        self.tracker._record_call({'Count': 2, 'ScannedCount': 3, 'ConsumedCapacity': {'CapacityUnits': 0.5}},
+                                  QUERY)
+        return [1, 2]
+
+    def count(self):
+        return len(self._query())
+
+    def _pages(self, pages):
+        for _ in range(pages):
+            yield from self._query()
+
+    def iter_students(self, pages=2):
+        return self._pages(pages)  # Not a generator function itself
+
+    def iter_generator(self, pages=2):
+        yield from self._pages(pages)
+
+
+def test_plain_method_is_measured(capsys):
+    tracker = CapacityTracker()
+    manager = tracker.instrument(FakeManager(tracker))
+
+    assert manager.count() == 2
+    assert tracker.session_usage.calls['Query'] == 1
+    assert 'FakeManager.count' in capsys.readouterr().out
+
+
+def test_generator_results_are_measured_until_iteration_ends(capsys):
+    tracker = CapacityTracker()
+    manager = tracker.instrument(FakeManager(tracker))
+
+    students = manager.iter_students(pages=3)
+    assert tracker.session_usage.calls['Query'] == 0  # Nothing read before iterating
+    assert list(students) == [1, 2] * 3
+    assert list(manager.iter_generator(pages=3)) == [1, 2] * 3
+
+    usage = tracker.session_usage
+    assert usage.calls['Query'] == 6
+    assert usage.scanned == 18 and usage.returned == 12
+    assert usage.read_units == 3.0
+    out = capsys.readouterr().out
+    assert out.count('[TIMINGS]') == 2
+
+
+def test_generator_closed_early_is_reported(capsys):
+    tracker = CapacityTracker()
+    manager = tracker.instrument(FakeManager(tracker))
+
+    students = manager.iter_students(pages=5)
+    next(students)
+    students.close()
+
+    assert tracker.session_usage.calls['Query'] == 1
+    assert capsys.readouterr().out.count('[TIMINGS]') == 1
+
+
+def test_nested_calls_count_in_the_outer_action(capsys):
+    tracker = CapacityTracker()
+    manager = tracker.instrument(FakeManager(tracker))
+
+    with tracker.measure('outer'):
+        manager.count()
+        list(manager.iter_students())
+
+    assert tracker.session_usage.calls['Query'] == 3
+    assert capsys.readouterr().out.count('[TIMINGS]') == 1
+
+
+def test_calls_on_worker_threads_count_in_the_running_action(capsys):
+    tracker = CapacityTracker()
+    manager = tracker.instrument(FakeManager(tracker))
+
+    with tracker.measure('outer'):
+        workers = [threading.Thread(target=lambda: [manager.count() for _ in range(50)]) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert tracker._current is not None
+
+    assert tracker._current is None
+    assert tracker.session_usage.calls['Query'] == 400
+    assert capsys.readouterr().out.count('[TIMINGS]') == 1
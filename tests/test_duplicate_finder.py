@@ -0,0 +1,107 @@
+import pytest
+
+from duplicate_finder import (block_key, find_clusters, jaro_winkler, merge_plan, name_similarity,
+                              name_tokens, normalize, similarity, soundex)
+from student import Student
+
+
+@pytest.mark.parametrize('word, code', [
+    ('Mabel', 'M140'), ('Mabell', 'M140'), ('Robert', 'R163'), ('Rupert', 'R163'),
+    ('Ashcraft', 'A261'), ('Tymczak', 'T522'), ('Pfister', 'P236'), ('Lee', 'L000'),
+])
+def test_soundex(word, code):
+    assert soundex(word) == code
+
+
+def test_jaro_winkler_reference_values():
+    assert jaro_winkler('martha', 'marhta') == pytest.approx(0.9611, abs=1e-4)
+    assert jaro_winkler('dwayne', 'duane') == pytest.approx(0.84, abs=1e-4)
+    assert jaro_winkler('dixon', 'dicksonx') == pytest.approx(0.8133, abs=1e-4)
+    assert jaro_winkler('same', 'same') == 1.0
+    assert jaro_winkler('abc', '') == 0.0
+    assert jaro_winkler('abc', 'xyz') == 0.0
+
+
+def test_name_tokens_and_normalize():
+    assert name_tokens('Aprilia W. Mabel') == ('aprilia', 'w', 'mabel')
+    assert name_tokens('  Élodie  Kogoyá ') == ('elodie', 'kogoya')
+    assert name_tokens(None) == ()
+    assert normalize('  Papua   Barat ') == 'papua barat'
+    assert normalize('Not specified') == ''
+    assert normalize(None) == ''
+
+
+def test_block_keys():
+    assert block_key(('aprilia', 'mabel')) == block_key(('anton', 'mabell')) == 'M140'
+    assert block_key(('aprilia', 'mabel'), 'exact') == 'mabel'
+
+
+def test_name_similarity():
+    same_person = name_similarity(name_tokens('Aprilia Mabel'), name_tokens('Aprilia W. Mabel'))
+    relatives = name_similarity(name_tokens('Maria Wenda'), name_tokens('Yohanes Wenda'))
+
+    assert same_person == pytest.approx(0.98)
+    assert relatives == pytest.approx(0.779, abs=1e-3)
+    assert name_similarity(('a', 'b'), ('a', 'b')) == 1.0
+
+
+def test_field_agreement_adjusts_the_score():
+    tokens = name_tokens('Aprilia Mabel'), name_tokens('Aprilia W. Mabel')
+    agree = similarity(tokens[0], ('informatika', ''), tokens[1], ('informatika', 'wmu'))
+    disagree = similarity(tokens[0], ('informatika',), tokens[1], ('biologi',))
+    unknown = similarity(tokens[0], ('',), tokens[1], ('biologi',))
+
+    assert agree > unknown > disagree
+    assert unknown == pytest.approx(0.98)
+
+
+def student(idn, nama, jurusan='Informatika', updated_at=None, **fields):
+    return Student(idn, nama=nama, jurusan=jurusan, updated_at=updated_at, **fields)
+
+
+def test_find_clusters_groups_spelling_variants():
+    students = [
+        student(1, 'Aprilia Mabel'),
+        student(2, 'Aprilia W. Mabell'),
+        student(3, 'Maria Wenda'),
+        student(4, 'Yohanes Wenda'),
+        student(5, 'Benny Kogoya'),
+        student(6, None),
+    ]
+
+    clusters, stats = find_clusters(students, workers=1)
+
+    assert [[member.idn for member in members] for members, _, _ in clusters] == [[1, 2]]
+    assert stats['pairs'] == 1
+    assert stats['blocks'] == 2  # Mabel/Mabell and Wenda; Kogoya is alone
+
+
+def test_exact_blocking_misses_spelling_variants():
+    clusters, _ = find_clusters([student(1, 'Aprilia Mabel'), student(2, 'Aprilia Mabell')],
+                                blocking='exact', workers=1)
+
+    assert clusters == []
+
+
+def test_merge_plan_removes_only_direct_matches():
+    a, b, c = student(1, 'A B', jurusan=None), student(2, 'A B', updated_at='2024-01'), student(3, 'A C')
+    clusters = [([a, b, c], 0.9, [(1, 2, 0.95), (2, 3, 0.9)])]
+
+    [(keep, remove, review, fills)] = merge_plan(clusters)
+
+    assert keep is a
+    assert remove == [b]
+    assert review == [c]
+    assert fills == {'jurusan': 'Informatika'}
+
+
+def test_merge_plan_fills_from_the_most_recent_record():
+    keep = student(1, 'A B', jurusan='Not specified')
+    older = student(2, 'A B', jurusan='Biologi', updated_at='2023-05-01', provinsi='Papua')
+    newer = student(3, 'A B', jurusan='Informatika', updated_at='2024-05-01')
+    clusters = [([keep, older, newer], 0.95, [(1, 2, 0.95), (1, 3, 0.95)])]
+
+    [(_, remove, review, fills)] = merge_plan(clusters)
+
+    assert remove == [older, newer] and review == []
+    assert fills == {'jurusan': 'Informatika', 'provinsi': 'Papua'}
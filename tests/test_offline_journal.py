@@ -0,0 +1,71 @@
+from boto3.dynamodb.conditions import Attr
+
+from offline_journal import coalesce, matches, request_idn
+from student import Student
+
+
+def put(idn, base=None, **student):
+    return {'op': 'put', 'idn': idn, 'base': base, 'student': {'idn': idn, **student}}
+
+
+def update(idn, base, **changes):
+    return {'op': 'update', 'idn': idn, 'base': base, 'changes': changes}
+
+
+def delete(idn, base):
+    return {'op': 'delete', 'idn': idn, 'base': base}
+
+
+def test_updates_merge_and_keep_the_first_base():
+    plan = coalesce([update(7, 't1', year='2020'), update(7, 't2', provinsi='Papua', year='2021')])
+
+    assert plan == {7: {'op': 'update', 'base': 't1', 'changes': {'year': '2021', 'provinsi': 'Papua'},
+                        'entries': 2}}
+
+
+def test_edits_fold_into_an_offline_add():
+    plan = coalesce([put(-1, nama='Maria Wenda'), update(-1, 't', year='2022')])
+
+    assert plan[-1]['op'] == 'put'
+    assert plan[-1]['base'] is None
+    assert plan[-1]['student'] == {'idn': -1, 'nama': 'Maria Wenda', 'year': '2022'}
+    assert plan[-1]['entries'] == 2
+
+
+def test_add_then_delete_cancels_out():
+    assert coalesce([put(-1, nama='A B'), update(-1, 't', year='2020'), delete(-1, 't')]) == {}
+
+
+def test_delete_of_a_server_student_keeps_the_first_base():
+    plan = coalesce([update(3, 't1', year='2020'), delete(3, 't2')])
+
+    assert plan == {3: {'op': 'delete', 'base': 't1', 'entries': 2}}
+
+
+def test_put_replaces_pending_changes():
+    plan = coalesce([update(5, 't1', year='2020'), put(5, 't2', nama='New Name')])
+
+    assert plan[5]['op'] == 'put'
+    assert plan[5]['base'] == 't1'
+    assert 'changes' not in plan[5]
+
+
+def test_actions_keep_first_touched_order():
+    plan = coalesce([update(9, 't'), put(-1), update(2, 't'), update(9, 't')])
+
+    assert list(plan) == [9, -1, 2]
+
+
+def test_request_idn():
+    assert request_idn({'PutRequest': {'Item': {'idn': 4}}}) == 4
+    assert request_idn({'DeleteRequest': {'Key': {'university_id': 'wmu', 'idn': 5}}}) == 5
+
+
+def test_matches_evaluates_conditions_offline():
+    student = Student(1, nama='Maria Wenda', year='2020', provinsi='Papua')
+
+    assert matches(Attr('provinsi').eq('Papua') & Attr('year').between('2019', '2021'), student)
+    assert matches(Attr('provinsi').eq('Jawa') | Attr('jurusan').not_exists(), student)
+    assert matches(Attr('nama').contains('Wenda') & ~Attr('year').is_in(['2021']), student)
+    assert not matches(Attr('year').gt('2020'), student)
+    assert not matches(Attr('jurusan').begins_with('Inf'), student)
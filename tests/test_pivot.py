@@ -0,0 +1,60 @@
+from collections import Counter
+
+from pivot import PivotTable
+
+STUDENTS = [
+    {'jurusan': 'Informatika', 'year': 2020, 'provinsi': 'Papua'},
+    {'jurusan': 'Informatika', 'year': 2020, 'provinsi': 'Papua'},
+    {'jurusan': 'Informatika', 'year': 2021},
+    {'jurusan': 'Biologi', 'year': 2020, 'provinsi': 'Papua Barat'},
+    {'jurusan': 'Biologi', 'year': 2022, 'provinsi': 'Papua'},
+]
+
+
+def expected(fields):
+    return dict(Counter(tuple(s.get(f, PivotTable.MISSING) for f in fields) for s in STUDENTS))
+
+
+def test_cells_match_a_direct_group_by():
+    fields = ('jurusan', 'year', 'provinsi')
+    pivot = PivotTable(fields, iter(STUDENTS))
+
+    assert dict(pivot.cells()) == expected(fields)
+    assert pivot.total == len(STUDENTS)
+    assert pivot.shape == (2, 3, 3)
+
+
+def test_missing_values_are_grouped_as_not_specified():
+    pivot = PivotTable(['provinsi'], STUDENTS)
+
+    assert dict(pivot.cells())[(PivotTable.MISSING,)] == 1
+
+
+def test_rollup_sums_the_cube():
+    pivot = PivotTable(['jurusan', 'year', 'provinsi'], STUDENTS)
+
+    assert pivot.rollup(['year']) == expected(['year'])
+    assert pivot.rollup(['provinsi', 'jurusan']) == expected(['provinsi', 'jurusan'])
+    assert sum(pivot.rollup([]).values()) == len(STUDENTS)
+
+
+def test_rows_sorted_by_count_then_values():
+    rows = PivotTable(['jurusan', 'year'], STUDENTS).rows()
+
+    assert rows[0] == (('Informatika', 2020), 2)
+    assert [key for key, _ in rows[1:]] == [('Biologi', 2020), ('Biologi', 2022), ('Informatika', 2021)]
+
+
+def test_sparse_cube_gives_the_same_counts(monkeypatch):
+    monkeypatch.setattr(PivotTable, 'DENSE_LIMIT', 1)
+    pivot = PivotTable(['jurusan', 'year', 'provinsi'], STUDENTS)
+
+    assert isinstance(pivot._counts, Counter)
+    assert dict(pivot.cells()) == expected(['jurusan', 'year', 'provinsi'])
+
+
+def test_no_students():
+    pivot = PivotTable(['jurusan', 'year'], [])
+
+    assert pivot.total == 0
+    assert list(pivot.cells()) == []
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import Blueprint, Flask, g
+
+from rate_limiter import MemoryBucketStore, RateLimiter
+
+
+def test_burst_up_to_capacity_then_refused():
+    store = MemoryBucketStore()
+    results = [store.consume('k', 3, 1.0, 100.0) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(1.0)
+
+
+def test_refill_is_proportional_to_elapsed_time():
+    store = MemoryBucketStore()
+    for _ in range(2):
+        store.consume('k', 2, 0.5, 0.0)
+
+    assert store.consume('k', 2, 0.5, 1.0) == (False, pytest.approx(1.0))
+    assert store.consume('k', 2, 0.5, 2.0)[0] is True
+
+
+def test_refill_never_exceeds_capacity():
+    store = MemoryBucketStore()
+    store.consume('k', 2, 1.0, 0.0)
+
+    allowed = [store.consume('k', 2, 1.0, 1000.0)[0] for _ in range(3)]
+    assert allowed == [True, True, False]
+
+
+def test_keys_are_independent():
+    store = MemoryBucketStore()
+    store.consume('a', 1, 1.0, 0.0)
+
+    assert store.consume('a', 1, 1.0, 0.0)[0] is False
+    assert store.consume('b', 1, 1.0, 0.0)[0] is True
+
+
+def test_prune_forgets_only_refilled_buckets():
+    store = MemoryBucketStore(max_keys=2)
+    store.consume('old', 1, 1.0, 0.0)
+    store.consume('recent', 1, 1.0, 9.5)
+    store.consume('new', 1, 1.0, 10.0)
+
+    assert set(store._buckets) == {'recent', 'new'}
+
+
+def make_app(limiter):
+    """An app mounting one blueprint twice, like backend/main.py"""
+    app = Flask(__name__)
+    api = Blueprint('api', __name__)
+
+    @api.url_value_preprocessor
+    def select_university(endpoint, values):
+        g.tenant = SimpleNamespace(university_id=(values or {}).pop('university_id', 'wmu'))
+
+    @api.route('/students')
+    @limiter.limit('read')
+    def students():
+        return 'ok'
+
+    app.register_blueprint(api)
+    app.register_blueprint(api, url_prefix='/u/<university_id>', name='university')
+    return app
+
+
+def test_both_mounts_share_one_bucket_per_university():
+    app = make_app(RateLimiter({'read': (2, 0.001)}))
+    client = app.test_client()
+
+    assert client.get('/students').status_code == 200
+    assert client.get('/u/wmu/students').status_code == 200
+    response = client.get('/students')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+    # Another university has its own bucket
+    assert client.get('/u/umich/students').status_code == 200
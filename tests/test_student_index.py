@@ -0,0 +1,76 @@
+import pytest
+
+from student import Student
+from student_index import NameSuggester, StudentIndex
+
+STUDENTS = [
+    Student(1, nama='Yohanes Wenda', jurusan='Informatika', year='2021', provinsi='Papua',
+            updated_at='2024-03-01'),
+    Student(2, nama='aprilia Weni Irjani Mabel', jurusan='Biologi', year='2020', provinsi='Papua Barat',
+            updated_at='2024-01-15'),
+    Student(3, nama='Maria Wenda', jurusan='Informatika', year='2020', provinsi='papua'),
+    Student(4, nama='Benny Kogoya', jurusan='Teknik Sipil', year='2022', updated_at='2024-02-10'),
+    Student(5, nama='Anton Mabel', jurusan='Informatika', year='2021', provinsi='Papua',
+            updated_at='2024-03-01'),
+]
+
+
+@pytest.fixture
+def index():
+    return StudentIndex(STUDENTS)
+
+
+def idns(students):
+    return [student.idn for student in students]
+
+
+def test_default_order_is_by_name(index):
+    # Plain string order, as /students always sorted
+    assert idns(index.query()) == [5, 4, 3, 1, 2]
+
+
+def test_filters_are_case_insensitive_and_intersected(index):
+    assert idns(index.query({'provinsi': ['PAPUA']})) == [5, 3, 1]
+    assert idns(index.query({'provinsi': ['papua'], 'year': ['2021']})) == [5, 1]
+
+
+def test_values_of_one_field_are_alternatives(index):
+    assert idns(index.query({'jurusan': ['Biologi', 'Teknik Sipil']}, sort='idn')) == [2, 4]
+
+
+def test_no_match(index):
+    assert index.query({'jurusan': ['Kedokteran']}) == []
+    assert index.query({'jurusan': ['Informatika'], 'year': ['2022']}) == []
+
+
+def test_missing_values_sort_last_and_ties_by_idn(index):
+    assert idns(index.query(sort='updated_at')) == [2, 4, 1, 5, 3]
+    assert idns(index.query(sort='updated_at', descending=True)) == [3, 5, 1, 4, 2]
+
+
+def test_small_and_large_matches_give_the_same_order():
+    students = [Student(i, nama=f"Student {800 - i:03d}", year=str(2000 + i % 50)) for i in range(800)]
+    index = StudentIndex(students)
+
+    small = index.query({'year': ['2003']})  # 16 of 800: ordered by rank
+    large = index.query({'year': [str(year) for year in range(2000, 2040)]})  # Walks the view
+
+    assert len(small) == 16 and len(large) == 640
+    assert idns(small) == sorted(idns(small), reverse=True)
+    assert idns(large) == sorted(idns(large), reverse=True)
+
+
+def test_suggest_whole_names_before_inner_words():
+    suggester = NameSuggester(STUDENTS + [Student(6, nama=None)])
+
+    assert idns(suggester.suggest('mab')) == [2, 5]
+    assert idns(suggester.suggest('aprilia mab')) == [2]  # First + last name key
+    assert idns(suggester.suggest('  WENDA ')) == [1, 3]
+
+
+def test_suggest_limit_and_empty_prefix():
+    suggester = NameSuggester(STUDENTS)
+
+    assert len(suggester.suggest('a', limit=1)) == 1
+    assert suggester.suggest('') == []
+    assert suggester.suggest('zzz') == []
@@ -0,0 +1,87 @@
+import builtins
+
+from student_pager import IdnPageSource, ScanPageSource, StudentPager
+
+
+class FakeManager:
+    """scan_page over IDNs 1..count, like a Query with Limit"""
+
+    def __init__(self, count):
+        self.idns = list(range(1, count + 1))
+        self.reads = 0
+
+    def scan_page(self, limit, start_key=None, fields=None):
+        self.reads += 1
+        start = 0 if start_key is None else self.idns.index(start_key['idn']) + 1
+        page = self.idns[start:start + limit]
+        # DynamoDB returns a LastEvaluatedKey whenever Limit was reached, even at the end
+        last_key = {'idn': page[-1]} if len(page) == limit else None
+        return page, last_key
+
+    def get_students_by_idns(self, idns, fields=None):
+        return list(idns)
+
+
+def test_pages_in_order_without_knowing_the_count():
+    source = ScanPageSource(FakeManager(7), 3)
+
+    assert source.get_page(0) == [1, 2, 3]
+    assert source.page_count() is None
+    assert source.get_page(1) == [4, 5, 6]
+    assert source.get_page(2) == [7]
+    assert source.page_count() == 3
+
+
+def test_full_final_page_is_followed_by_the_end():
+    source = ScanPageSource(FakeManager(6), 3)
+
+    assert source.get_page(1) == [4, 5, 6]
+    assert source.page_count() is None  # Limit reached, more may follow
+    assert source.get_page(2) == []
+    assert source.page_count() == 2
+    assert source.get_page(5) == []
+
+
+def test_jump_walks_forward_and_going_back_rereads_one_page():
+    manager = FakeManager(10)
+    source = ScanPageSource(manager, 2)
+
+    assert source.get_page(3) == [7, 8]
+    assert manager.reads == 4
+    assert source.get_page(1) == [3, 4]
+    assert manager.reads == 5
+
+
+def test_jump_past_the_end():
+    source = ScanPageSource(FakeManager(4), 3)
+
+    assert source.get_page(9) == []
+    assert source.page_count() == 2
+
+
+def test_empty_partition():
+    source = ScanPageSource(FakeManager(0), 3)
+
+    assert source.get_page(0) == []
+    assert source.page_count() == 1
+
+
+def test_idn_pages():
+    source = IdnPageSource(FakeManager(0), [5, 3, 9, 1, 2], 2)
+
+    assert source.page_count() == 3
+    assert source.get_page(1) == [9, 1]
+    assert source.get_page(3) == []
+    assert IdnPageSource(FakeManager(0), [], 2).page_count() == 1
+
+
+def test_jump_past_the_end_lands_on_the_last_page(monkeypatch, capsys):
+    commands = iter(['1000', 'q'])
+    monkeypatch.setattr(builtins, 'input', lambda prompt='': next(commands))
+    shown = []
+
+    StudentPager(ScanPageSource(FakeManager(7), 3),
+                 lambda students, page, count: shown.append((page, students))).run()
+
+    assert shown == [(0, [1, 2, 3]), (2, [7])]
+    assert capsys.readouterr().out.count('No more students') == 1